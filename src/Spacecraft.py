@@ -3,7 +3,11 @@ Spacecraft Class
 '''
 
 # Python Standard Libraries
-
+import bisect
+import functools
+import logging
+import os
+import tempfile
 
 # Third-party Libraries
 import numpy             as np
@@ -11,24 +15,108 @@ import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
 
 # User-defined Libraries
-import planetary_data   as pd
-import orbit_calcs      as oc
-import plotting_tools   as pt
+import planetary_data    as pd
+import orbit_calcs       as oc
+import numerical_tools   as nt
+import plotting_tools    as pt
+import propagation_cache as pc
+import central_body      as cbd
+import state_history     as sh
+import storage           as st
+import patched_conics    as pcs
+import atmosphere        as at
+
+REFERENCE_TIME = '2000-01-01T07:00:00'
+
+# Row of a checkpoint sample file: time and state
+CHECKPOINT_ROW = np.dtype( ( np.float64, 7 ) )
+
+# Perturbations batch_rates evaluates in worker processes
+WORKER_PERTS = ( 'J2', 'ATM' )
+
+logger = logging.getLogger( __name__ )
 
 def null_config():
     return {
-        'cb'          : pd.earth,
-        'coes'        : [],
-        'state'       : [],
-        'tspan'       : '1',
-        'propagator'  : 'RK45',
-        'atol'        : 1e-6,
-        'rtol'        : 1e-6,
-        'propagate'   : True,
-        'orbit_perts' : {}
+        'cb'                  : pd.earth,
+        'coes'                : [],
+        'state'               : [],
+        'tspan'               : '1',
+        'propagator'          : 'RK45',
+        'formulation'         : 'cowell',
+        'rectify_tol'         : 1e-2,
+        'sundman_power'       : 1.0,
+        'stm'                 : False,
+        't_eval'              : None,
+        'epoch'               : REFERENCE_TIME,
+        'cache'               : False,
+        'cache_dir'           : pc.DEFAULT_CACHE_DIR,
+        'cache_size'          : 2**30,
+        'atol'                : 1e-6,
+        'rtol'                : 1e-6,
+        'dt'                  : None,
+        'mass'                : 1000.0,
+        'Cd'                  : 2.2,
+        'area'                : 1.0,
+        'propagate'           : True,
+        'orbit_perts'         : {},
+        'maneuvers'           : [],
+        'checkpoint_file'     : None,
+        'checkpoint_interval' : 86400.0,
+        'storage'             : {},
+        'patched_conic_args'  : {},
+        'mcpi_args'           : {},
+        'executor'            : None
     }
 
-REFERENCE_TIME = '2000-01-01T07:00:00'
+def checkpoint_data_file( filename ):
+    '''
+    Returns the sample file of a checkpoint, or None if there is none
+    '''
+    try:
+        with np.load( filename ) as data:
+            name = str( data[ 'data' ] )
+    except ( FileNotFoundError, OSError, KeyError, ValueError ):
+        return None
+
+    return os.path.join( os.path.dirname( os.path.abspath( filename ) ), name )
+
+def J2_acceleration( state, cb ):
+    '''
+    Returns the perturbing gravitational acceleration vector (p) due to
+    J2 of a central_body.CentralBody. Also accepts stacked states
+    (shape: [N, 6]), returning shape [N, 3]
+    '''
+    r_vec = state[ ..., :3 ]
+    z     = state[ ..., 2 ]
+    r2    = np.sum( r_vec * r_vec, axis = -1 )
+
+    # p = 3/2 J2 mu R^2 / r^5 * [ x t, y t, z ( t - 2 ) ], t = 5 z^2 / r^2 - 1
+    k = cb.J2_coeff / ( r2 * r2 * np.sqrt( r2 ) )
+    t = 5 * z**2 / r2 - 1
+
+    p = ( k * t )[ ..., None ] * r_vec
+    p[ ..., 2 ] -= 2 * k * z
+
+    return p
+
+def batch_rates( times, states, cb, perts, ballistic_coeff = None ):
+    '''
+    State rates of stacked states (shape: [N, 6]) under the gravity of a
+    central_body.CentralBody and the perturbations named in perts (any of
+    WORKER_PERTS). It only needs these constants, not a Spacecraft, so
+    it is cheap to send to worker processes (Spacecraft.node_rates)
+    '''
+    r = states[ :, :3 ]
+    a = -cb.mu * r / np.linalg.norm( r, axis = 1, keepdims = True )**3
+
+    if 'J2' in perts:
+        a += J2_acceleration( states, cb )
+
+    if 'ATM' in perts:
+        a += at.drag_acceleration( states, cb, ballistic_coeff )
+
+    return np.hstack( ( states[ :, 3: ], a ) )
 
 class Spacecraft:
 
@@ -40,17 +128,17 @@ class Spacecraft:
         for key in config.keys():
             self.config[ key ] = config[ key ]
         
-        # Central body
-        self.cb = self.config[ 'cb' ]
+        # Central body, with its force model constants precomputed once
+        self.cb = cbd.central_body( self.config[ 'cb' ] )
 
         # Classical orbital elements to state vector
         if self.config[ 'coes' ]:
-            self.config[ 'state' ] = oc.sv_from_coe( self.config[ 'coes' ], self.cb[ 'mu' ] )
+            self.config[ 'state' ] = oc.sv_from_coe( self.config[ 'coes' ], self.cb.mu )
 
         # tspan as a str should be the number of orbit periods
         if type( self.config[ 'tspan' ] ) == str:
             self.config[ 'tspan' ] = float( self.config[ 'tspan' ] ) * \
-                    oc.period_from_sv( self.config[ 'state' ], self.cb[ 'mu' ] )
+                    oc.period_from_sv( self.config[ 'state' ], self.cb.mu )
 
         # Set initial status for calculations
         self.altitudes_calculated = False
@@ -65,37 +153,188 @@ class Spacecraft:
         self.orbit_perts = self.config[ 'orbit_perts' ]
         self.assign_orbit_perturbations_functions()
 
+        # Drag: ballistic coefficient Cd A / m (m^2/kg)
+        self.ballistic_coeff = at.ballistic_coefficient(
+            self.config[ 'Cd' ], self.config[ 'area' ], self.config[ 'mass' ] )
+
+        if self.orbit_perts.get( 'ATM' ) and 'atmosphere' not in self.cb:
+            raise ValueError( 'No atmosphere model for central body: %s' % self.cb.name )
+
+        if self.config[ 'formulation' ] == 'patched_conic':
+            pcs.check_central_body( self.cb )
+
+        # How state histories are stored (see storage.null_policy)
+        self.storage = st.storage_policy( self.config[ 'storage' ] )
+
+        # Impulsive maneuver plan, sorted by time, and the trajectory
+        # segments between maneuvers
+        self.maneuvers = sorted(
+            ( self.make_maneuver( **maneuver ) for maneuver in self.config[ 'maneuvers' ] ),
+            key = lambda maneuver: maneuver[ 'time' ] )
+        self.segments  = []
+        self.history   = sh.StateHistory( dtype = self.storage[ 'dtype' ] )
+        self.last_step = None
+
+        # Checkpoint file -> { 'data' : sample file, 'rows' : samples saved
+        # there, None once the history was truncated below them }
+        self.checkpoint_data = {}
+
         # Propagates the orbit
         if self.config[ 'propagate' ]:
             self.propagate_orbit()
 
-    def diffy_q( self, t, states):
+    def __getstate__( self ):
+        '''
+        Spacecraft are pickled without the executor of node_rates, which
+        cannot be pickled
+        '''
+        state = self.__dict__.copy()
+        state[ 'config' ] = dict( self.config, executor = None )
+
+        return state
 
-        # Unpack states
-        x, y, z, vx, vy, vz = states
+    def diffy_q( self, t, states ):
 
-        states_dot = np.zeros( 6 )
+        states_dot = np.empty( 6 )
 
         # Position vector and its norm
-        r     = np.array( [ x, y, z ] ) 
-        rnorm = np.linalg.norm( r )
-
-        # Velocity vector
-        v = np.array( [vx , vy, vz] )
+        r     = states[ :3 ]
+        rnorm = np.sqrt( r @ r )
 
         # Acceleration vector
-        a = - self.cb[ 'mu' ] * r / rnorm**3
+        a = -self.cb.mu / rnorm**3 * r
 
         # Include perturbations, if any
         for pert in self.orbit_perts_funcs:
             a += pert( states )
 
         # State vector rates
-        states_dot[ :3 ]  = v
+        states_dot[ :3 ]  = states[ 3:6 ]
         states_dot[ 3:6 ] = a
 
         return states_dot
     
+    def diffy_q_encke( self, t, dstates ):
+        '''
+        Encke formulation: rates of the deviation from the osculating
+        Kepler reference orbit set at the last rectification
+        '''
+        # Reference state from the analytic two-body solution
+        ref_state = self.osc_reference( t - self.osc_time )
+        states    = ref_state + dstates
+
+        # Scalar arithmetic, cheaper than numpy for 3-vectors
+        x0, y0, z0 = ref_state[ :3 ].tolist()
+        dx, dy, dz = dstates[ :3 ].tolist()
+        x,  y,  z  = x0 + dx, y0 + dy, z0 + dz
+
+        # Difference of the two-body terms without cancellation (Curtis Eq. 12.10)
+        q = ( dx * ( x + x0 ) + dy * ( y + y0 ) + dz * ( z + z0 ) ) / ( x * x + y * y + z * z )
+        F = q * ( 3 - 3 * q + q * q ) / ( 1 + ( 1 - q )**1.5 )
+        k = self.cb.mu / ( x0 * x0 + y0 * y0 + z0 * z0 )**1.5
+        a = np.array( [ k * ( F * x - dx ), k * ( F * y - dy ), k * ( F * z - dz ) ] )
+
+        # Include perturbations, if any
+        for pert in self.orbit_perts_funcs:
+            a += pert( states )
+
+        return np.concatenate( ( dstates[ 3:6 ], a ) )
+
+    def diffy_q_sundman( self, s, states ):
+        '''
+        Sundman-regularized equations of motion, dt/ds = r^n, with time
+        carried as a seventh state
+        '''
+        r_n = np.linalg.norm( states[ :3 ] ) ** self.config[ 'sundman_power' ]
+
+        states_dot       = np.zeros( 7 )
+        states_dot[ :6 ] = r_n * self.diffy_q( states[ 6 ], states[ :6 ] )
+        states_dot[ 6 ]  = r_n
+
+        return states_dot
+
+    def diffy_q_stm( self, t, states ):
+        '''
+        State rates together with the variational equations dPhi/dt = A Phi
+        '''
+        states_dot        = np.zeros( 42 )
+        states_dot[ :6 ]  = self.diffy_q( t, states[ :6 ] )
+
+        # Two-body gravity gradient
+        r     = states[ :3 ]
+        rnorm = np.linalg.norm( r )
+        G     = self.cb.mu / rnorm**3 * ( 3 * np.outer( r, r ) / rnorm**2 - np.eye( 3 ) )
+
+        for jac in self.orbit_perts_jacobians:
+            G += jac( states[ :6 ] )
+
+        # A = [ [ 0, I ], [ G, 0 ] ], so A Phi only needs the row blocks of Phi
+        stm     = states[ 6: ].reshape( 6, 6 )
+        stm_dot = states_dot[ 6: ].reshape( 6, 6 )
+        stm_dot[ :3 ] = stm[ 3: ]
+        stm_dot[ 3: ] = G @ stm[ :3 ]
+
+        return states_dot
+
+    def diffy_q_batch( self, t, states ):
+        '''
+        Rates for N stacked state vectors flattened into shape [6N], so that
+        many trajectories share a single solve_ivp call
+        '''
+        states     = states.reshape( -1, 6 )
+        states_dot = np.empty_like( states )
+
+        r     = states[ :, :3 ]
+        rnorm = np.linalg.norm( r, axis = 1, keepdims = True )
+        a     = -self.cb.mu * r / rnorm**3
+
+        for pert in self.orbit_perts_funcs:
+            a += pert( states )
+
+        states_dot[ :, :3 ] = states[ :, 3: ]
+        states_dot[ :, 3: ] = a
+
+        return states_dot.ravel()
+
+    def accelerations( self, r ):
+        '''
+        Gravitational acceleration of positions (shape: [..., 3]), for
+        the symplectic propagators, which only admit position-dependent
+        forces
+        '''
+        r2 = np.sum( r * r, axis = -1 )
+        a  = ( -self.cb.mu / ( r2 * np.sqrt( r2 ) ) )[ ..., None ] * r
+
+        for pert in self.orbit_perts_funcs:
+            a += pert( r )
+
+        return a
+
+    def diffy_q_stm_batch( self, t, states ):
+        '''
+        Batched variational equations: N stacked blocks of [ state, Phi ]
+        flattened into shape [42N]
+        '''
+        states     = states.reshape( -1, 42 )
+        states_dot = np.empty_like( states )
+
+        states_dot[ :, :6 ] = self.diffy_q_batch( t, states[ :, :6 ] ).reshape( -1, 6 )
+
+        r     = states[ :, :3 ]
+        rnorm = np.linalg.norm( r, axis = 1 )[ :, None, None ]
+        G     = self.cb.mu / rnorm**3 * \
+            ( 3 * r[ :, :, None ] * r[ :, None, : ] / rnorm**2 - np.eye( 3 ) )
+
+        for jac in self.orbit_perts_jacobians:
+            G += jac( states[ :, :6 ] )
+
+        stm     = states[ :, 6: ].reshape( -1, 6, 6 )
+        stm_dot = states_dot[ :, 6: ].reshape( -1, 6, 6 )
+        stm_dot[ :, :3 ] = stm[ :, 3: ]
+        stm_dot[ :, 3: ] = G @ stm[ :, :3 ]
+
+        return states_dot.ravel()
+
     def assign_orbit_perturbations_functions( self ):
 
         self.orbit_perts_funcs_map = {
@@ -105,17 +344,140 @@ class Spacecraft:
             '3body' : self.calc_third_body_perts
         }
 
-        self.orbit_perts_funcs = []
+        # Partials of the perturbing accelerations w.r.t. position, for the STM
+        self.orbit_perts_jacobians_map = {
+            'J2' : self.calc_J2_jacobian
+        }
+
+        self.orbit_perts_funcs     = []
+        self.orbit_perts_jacobians = []
 
         for key, value in self.config[ 'orbit_perts' ].items():
             if value: # Only add the function if the perturbation is set to True
                 self.orbit_perts_funcs.append(
                     self.orbit_perts_funcs_map[ key ]
                 )
+                if key in self.orbit_perts_jacobians_map:
+                    self.orbit_perts_jacobians.append(
+                        self.orbit_perts_jacobians_map[ key ]
+                    )
 
     def propagate_orbit( self ):
 
-        print( 'Propagating orbit...' )
+        # Continue an interrupted run rather than overwrite its checkpoint
+        checkpoint = self.config[ 'checkpoint_file' ]
+        if checkpoint and os.path.exists( checkpoint ):
+            logger.info( 'Resuming from %s', checkpoint )
+            self.resume()
+            return
+
+        self.truncate_history( 0 )
+        self.segments  = []
+        self.last_step = None
+
+        # Maneuver plans are propagated segment by segment
+        if self.maneuvers:
+            self.propagate_segments()
+            return
+
+        # Results carrying an STM or patched conic legs are not cached
+        use_cache = self.config[ 'cache' ] and not self.config[ 'stm' ] and \
+            self.config[ 'formulation' ] != 'patched_conic'
+
+        if use_cache:
+            try:
+                key = pc.config_key( self.config, self.state0 )
+            except ValueError as error:
+                logger.warning( 'Not caching: %s', error )
+                use_cache = False
+
+        if use_cache:
+            cache = pc.PropagationCache( self.config[ 'cache_dir' ], self.config[ 'cache_size' ] )
+            hit   = cache.load( key )
+
+            if hit is not None:
+                self.times, self.states = hit
+                self.ode_sol = None
+                self.apply_storage_policy()
+                return
+
+        logger.info( 'Propagating orbit...' )
+
+        self.formulations_map = {
+            'cowell'        : self.propagate_cowell,
+            'encke'         : self.propagate_encke,
+            'sundman'       : self.propagate_sundman,
+            'patched_conic' : self.propagate_patched_conic
+        }
+
+        if self.config[ 'stm' ] and self.config[ 'formulation' ] != 'cowell':
+            raise ValueError( 'STM propagation requires the cowell formulation' )
+
+        self.formulations_map[ self.config[ 'formulation' ] ]()
+
+        if use_cache:
+            cache.store( key, self.times, self.states )
+
+        self.apply_storage_policy()
+
+    def apply_storage_policy( self ):
+        '''
+        Decimates, converts and compacts the stored history according to
+        config[ 'storage' ]
+        '''
+        # Restart state of extend, kept at full precision
+        self.end_state = np.array( self.states[ -1 ], dtype = np.float64 )
+
+        self.times, self.states = st.apply_policy( self.times, self.states, self.storage )
+        self.n_steps = self.states.shape[ 0 ]
+
+        if hasattr( self, 'stms' ):
+            self.stms = self.stms.astype( self.storage[ 'dtype' ], copy = False )
+
+        if self.storage[ 'contiguous' ]:
+            self.ode_sol = None
+
+    def output_times( self, t0, t1 ):
+        '''
+        Returns the solver output times within [ t0, t1 ]: config[ 't_eval' ]
+        if given, else the storage cadence, else None (every solver step)
+        '''
+        if self.config[ 't_eval' ] is not None:
+            t_eval = np.asarray( self.config[ 't_eval' ], dtype = float )
+            return t_eval[ ( t_eval >= t0 ) & ( t_eval <= t1 ) ]
+
+        if self.storage[ 'cadence' ] is not None:
+            return st.cadence_times( t0, t1, self.storage[ 'cadence' ] )
+
+        return None
+
+    def propagate_cowell( self ):
+
+        if self.config[ 'stm' ]:
+            self.propagate_stm()
+            return
+
+        # Chunked propagation with periodic checkpoints
+        if self.config[ 'checkpoint_file' ]:
+            self.history.append( [ 0.0 ], self.state0[ None, : ] )
+            self.advance( self.config[ 'tspan' ] )
+            return
+
+        if self.config[ 'propagator' ] in nt.SYMPLECTIC_WEIGHTS:
+            self.times, self.states = self.propagate_symplectic(
+                self.state0, 0, self.config[ 'tspan' ],
+                self.output_times( 0, self.config[ 'tspan' ] ) )
+            self.ode_sol = None
+            self.n_steps = self.states.shape[ 0 ]
+            return
+
+        if self.config[ 'propagator' ] == 'MCPI':
+            self.times, self.states = self.propagate_mcpi(
+                self.state0, 0, self.config[ 'tspan' ],
+                self.output_times( 0, self.config[ 'tspan' ] ) )
+            self.ode_sol = None
+            self.n_steps = self.states.shape[ 0 ]
+            return
 
         self.ode_sol = solve_ivp(
             fun    = self.diffy_q,
@@ -123,25 +485,746 @@ class Spacecraft:
             y0     = self.config[ 'state' ],
             method = self.config[ 'propagator' ],
             rtol   = self.config[ 'rtol' ],
-            atol   = self.config[ 'atol' ]
+            atol   = self.config[ 'atol' ],
+            t_eval = self.output_times( 0, self.config[ 'tspan' ] )
         )
 
         self.states  = self.ode_sol.y.T
         self.times   = self.ode_sol.t
         self.n_steps = self.states.shape[ 0 ]
 
+    def check_stm_partials( self ):
+        '''
+        Raises a ValueError if an enabled perturbation has no analytic
+        partials, which the variational equations would silently leave out
+        '''
+        for key, value in self.orbit_perts.items():
+            if value and key not in self.orbit_perts_jacobians_map:
+                raise ValueError( 'No analytic partials for perturbation: %s' % key )
+
+    def propagate_stm( self ):
+        '''
+        Integrates the variational equations alongside the state.
+
+        config[ 'stm' ] = 'history' stores every STM in self.stms
+        (shape: [steps, 6, 6]); 'final' keeps only self.stm and releases
+        the STM rows of the solver output.
+        '''
+        self.check_stm_partials()
+
+        self.ode_sol = solve_ivp(
+            fun    = self.diffy_q_stm,
+            t_span = ( 0, self.config[ 'tspan' ]),
+            y0     = np.concatenate( ( self.state0, np.eye( 6 ).ravel() ) ),
+            method = self.config[ 'propagator' ],
+            rtol   = self.config[ 'rtol' ],
+            atol   = self.config[ 'atol' ],
+            t_eval = self.output_times( 0, self.config[ 'tspan' ] )
+        )
+
+        self.times   = self.ode_sol.t
+        self.n_steps = self.times.shape[ 0 ]
+        self.stm     = self.ode_sol.y[ 6:, -1 ].reshape( 6, 6 ).copy()
+
+        if self.config[ 'stm' ] == 'final':
+            # Copy the states out so the 42-row solver output can be freed
+            self.states    = np.ascontiguousarray( self.ode_sol.y[ :6 ].T )
+            self.ode_sol.y = None
+        else:
+            self.states = self.ode_sol.y[ :6 ].T
+            self.stms   = np.empty( ( self.n_steps, 6, 6 ) )
+            self.stms.reshape( self.n_steps, 36 )[ : ] = self.ode_sol.y[ 6: ].T
+
+    def propagate_encke( self ):
+        '''
+        Integrates the deviation from an osculating Kepler orbit, rectifying
+        the reference whenever |dr| / |r_ref| exceeds config[ 'rectify_tol' ].
+        Sampled at output_times, or else at every solver step.
+        '''
+        def rectify( t, dstates ):
+            ref_state = self.osc_reference( t - self.osc_time )
+            return np.sqrt( ( dstates[ :3 ] @ dstates[ :3 ] ) /
+                ( ref_state[ :3 ] @ ref_state[ :3 ] ) ) - self.config[ 'rectify_tol' ]
+
+        rectify.terminal = True
+
+        tspan  = self.config[ 'tspan' ]
+        t_eval = self.output_times( 0, tspan )
+
+        self.osc_state         = self.state0.copy()
+        self.osc_time          = 0.0
+        self.osc_reference     = oc.kepler_fg( self.osc_state, self.cb.mu )
+        self.n_rectifications  = 0
+        self.n_fevals          = 0
+
+        if t_eval is None:
+            times  = [ np.zeros( 1 ) ]
+            states = [ self.state0[ None, : ] ]
+        else:
+            times  = [ t_eval[ t_eval == 0 ] ]
+            states = [ np.repeat( self.state0[ None, : ], times[ 0 ].shape[ 0 ], axis = 0 ) ]
+
+        while self.osc_time < tspan:
+            self.ode_sol = solve_ivp(
+                fun          = self.diffy_q_encke,
+                t_span       = ( self.osc_time, tspan ),
+                y0           = np.zeros( 6 ),
+                method       = self.config[ 'propagator' ],
+                rtol         = self.config[ 'rtol' ],
+                atol         = self.config[ 'atol' ],
+                events       = rectify,
+                t_eval       = None if t_eval is None else t_eval[ t_eval > self.osc_time ],
+                dense_output = t_eval is not None
+            )
+            self.n_fevals += self.ode_sol.nfev
+
+            # Add the deviations back onto the reference orbit
+            ref_states = oc.kepler_universal(
+                self.osc_state, self.ode_sol.t - self.osc_time, self.cb.mu )
+            seg_states = ref_states + self.ode_sol.y.T
+            first      = 1 if t_eval is None else 0
+
+            times.append(  self.ode_sol.t[ first: ] )
+            states.append( seg_states[ first: ] )
+
+            # A failed solve keeps the samples it reached, as in cowell
+            if self.ode_sol.status == -1:
+                logger.warning( 'Encke propagation stopped at t = %.6g s: %s',
+                                self.ode_sol.t[ -1 ], self.ode_sol.message )
+                break
+
+            if t_eval is None:
+                t_end, dstate_end = self.ode_sol.t[ -1 ], self.ode_sol.y[ :, -1 ]
+            else:
+                t_end = self.ode_sol.t_events[ 0 ][ 0 ] if self.ode_sol.status == 1 else tspan
+                dstate_end = self.ode_sol.sol( t_end )
+
+            # Rectify: new osculating reference at the current state
+            self.osc_state     = oc.kepler_universal(
+                self.osc_state, [ t_end - self.osc_time ], self.cb.mu )[ 0 ] + dstate_end
+            self.osc_time      = t_end
+            self.osc_reference = oc.kepler_fg( self.osc_state, self.cb.mu )
+
+            if self.ode_sol.status == 1:
+                self.n_rectifications += 1
+
+        self.states  = np.vstack( states )
+        self.times   = np.concatenate( times )
+        self.n_steps = self.states.shape[ 0 ]
+
+    def propagate_sundman( self ):
+        '''
+        Integrates in the regularized independent variable s and converts
+        the result back to Cartesian states over physical time, sampled at
+        output_times, or else at every solver step
+        '''
+        def final_time( s, states ):
+            return states[ 6 ] - self.config[ 'tspan' ]
+
+        final_time.terminal = True
+
+        # Upper bound on s: the whole span spent at periapsis
+        mu    = self.cb.mu
+        power = self.config[ 'sundman_power' ]
+        r     = np.linalg.norm( self.state0[ :3 ] )
+        h     = np.linalg.norm( np.cross( self.state0[ :3 ], self.state0[ 3: ] ) )
+        e     = oc.coe_from_sv( self.state0, args = { 'mu' : mu } )[ 1 ]
+        r_min = min( r, h**2 / mu / ( 1 + e ) )
+        s_max = self.config[ 'tspan' ] / r_min ** power
+
+        t_eval = self.output_times( 0, self.config[ 'tspan' ] )
+
+        self.ode_sol = solve_ivp(
+            fun          = self.diffy_q_sundman,
+            t_span       = ( 0, s_max ),
+            y0           = np.append( self.state0, 0.0 ),
+            method       = self.config[ 'propagator' ],
+            rtol         = self.config[ 'rtol' ],
+            atol         = self.config[ 'atol' ],
+            events       = final_time,
+            dense_output = t_eval is not None
+        )
+
+        if t_eval is None:
+            self.states  = np.ascontiguousarray( self.ode_sol.y[ :6 ].T )
+            self.times   = self.ode_sol.y[ 6 ]
+            self.n_steps = self.states.shape[ 0 ]
+            return
+
+        # The final time event ends the run at tspan up to its root
+        # tolerance, so tspan itself is kept
+        t_end  = self.config[ 'tspan' ] if self.ode_sol.status == 1 else self.ode_sol.y[ 6, -1 ]
+        t_eval = t_eval[ t_eval <= t_end ]
+
+        # s of each output time: interpolated between the solver steps,
+        # then refined by Newton iterations on t( s ), with dt/ds = r^n
+        s      = np.interp( t_eval, self.ode_sol.y[ 6 ], self.ode_sol.t )
+
+        for _ in range( 4 ):
+            y = self.ode_sol.sol( s )
+            s = np.clip( s - ( y[ 6 ] - t_eval ) / np.linalg.norm( y[ :3 ], axis = 0 ) ** power,
+                         0, self.ode_sol.t[ -1 ] )
+
+        self.states  = np.ascontiguousarray( self.ode_sol.sol( s )[ :6 ].T )
+        self.times   = t_eval
+        self.n_steps = self.states.shape[ 0 ]
+
+    def make_maneuver( self, time, dv, frame = 'inertial' ):
+        '''
+        Returns an impulsive maneuver dictionary. dv (km/s) is given either
+        in the inertial frame or in the VNC frame (velocity, orbit normal,
+        co-normal) of the pre-maneuver state
+        '''
+        if frame not in ( 'inertial', 'VNC' ):
+            raise ValueError( 'Unknown maneuver frame: %s' % frame )
+
+        if not 0 < time < self.config[ 'tspan' ]:
+            raise ValueError( 'Maneuver time must lie inside ( 0, tspan )' )
+
+        return {
+            'time'  : float( time ),
+            'dv'    : np.array( dv, dtype = float ),
+            'frame' : frame
+        }
+
+    def maneuver_dv( self, maneuver, state ):
+        '''
+        Returns the inertial delta-v of a maneuver applied at state
+        '''
+        if maneuver[ 'frame' ] == 'inertial':
+            return maneuver[ 'dv' ]
+
+        v = state[ 3: ] / np.linalg.norm( state[ 3: ] )
+        h = np.cross( state[ :3 ], state[ 3: ] )
+        n = h / np.linalg.norm( h )
+
+        return np.column_stack( ( v, n, np.cross( v, n ) ) ) @ maneuver[ 'dv' ]
+
+    def add_maneuver( self, time, dv, frame = 'inertial' ):
+        '''
+        Inserts an impulsive maneuver into the plan and returns its index
+        '''
+        maneuver = self.make_maneuver( time, dv, frame )
+        index    = bisect.bisect_right( [ m[ 'time' ] for m in self.maneuvers ], maneuver[ 'time' ] )
+        self.maneuvers.insert( index, maneuver )
+
+        # The segment ending at the new maneuver is split in two
+        self.invalidate_segments( index )
+
+        return index
+
+    def set_maneuver( self, index, time = None, dv = None, frame = None ):
+        '''
+        Edits a maneuver of the plan. Changing only dv / frame keeps the
+        segment leading up to the maneuver; moving it in time also
+        re-propagates the segment that ends at it.
+        '''
+        old = self.maneuvers[ index ]
+        maneuver = self.make_maneuver(
+            old[ 'time' ]  if time  is None else time,
+            old[ 'dv' ]    if dv    is None else dv,
+            old[ 'frame' ] if frame is None else frame )
+
+        if time is None:
+            self.maneuvers[ index ] = maneuver
+            self.invalidate_segments( index + 1 )
+            return index
+
+        del self.maneuvers[ index ]
+        new_index = bisect.bisect_right( [ m[ 'time' ] for m in self.maneuvers ], maneuver[ 'time' ] )
+        self.maneuvers.insert( new_index, maneuver )
+        self.invalidate_segments( min( index, new_index ) )
+
+        return new_index
+
+    def remove_maneuver( self, index ):
+        '''
+        Removes a maneuver, merging the segments on either side of it
+        '''
+        del self.maneuvers[ index ]
+        self.invalidate_segments( index )
+
+    def invalidate_segments( self, first ):
+        '''
+        Discards segment first and every later segment from the history
+        and re-propagates them if config[ 'propagate' ] is set
+        '''
+        del self.segments[ first: ]
+        self.truncate_history( self.segments[ -1 ][ 'stop' ] if self.segments else 0 )
+
+        # Start the new segments with the solver's own initial step, so the
+        # result does not depend on the edit history
+        self.last_step = None
+
+        if self.config[ 'propagate' ]:
+            self.propagate_segments()
+
+    def propagate_segments( self ):
+        '''
+        Propagates every segment of the maneuver plan that is not already
+        stored, reusing the earlier ones.
+
+        Segment k spans [ t_(k-1), t_k ] between maneuvers (0 and tspan at
+        the ends), so each maneuver time appears twice in self.times:
+        before and after the impulse. self.times and self.states are views
+        of the shared history buffer.
+        '''
+        self.check_continuable( 'A maneuver plan' )
+
+        bounds = [ 0.0 ] + [ m[ 'time' ] for m in self.maneuvers ] + [ float( self.config[ 'tspan' ] ) ]
+        first  = len( self.segments )
+
+        if first <= len( self.maneuvers ):
+            logger.info( 'Propagating segments %d-%d...', first, len( self.maneuvers ) )
+
+        # Finish a segment left incomplete by a checkpoint
+        if first and self.segments[ -1 ][ 't1' ] < bounds[ first ]:
+            self.advance( bounds[ first ] )
+
+        for k in range( first, len( self.maneuvers ) + 1 ):
+            if k == 0:
+                dv     = np.zeros( 3 )
+                state0 = self.state0.copy()
+            else:
+                state0  = self.history.last_state
+                dv      = self.maneuver_dv( self.maneuvers[ k - 1 ], state0 )
+                state0[ 3: ] += dv
+
+            span = self.history.append( [ bounds[ k ] ], state0[ None, : ] )
+
+            self.segments.append( {
+                't0'     : bounds[ k ],
+                't1'     : bounds[ k ],
+                'state0' : state0,
+                'dv'     : dv,
+                'start'  : span.start,
+                'stop'   : span.stop
+            } )
+
+            self.advance( bounds[ k + 1 ] )
+
+        self.update_history_views()
+
+    def propagate_segment( self, state0, t0, t1 ):
+        '''
+        Integrates a single coast arc from t0 to t1, always sampling both
+        ends (plus the output_times inside the arc)
+        '''
+        if t1 <= t0:
+            return np.array( [ t0 ] ), state0[ None, : ]
+
+        t_eval = self.output_times( t0, t1 )
+        if t_eval is not None:
+            t_eval = np.union1d( t_eval, [ t0, t1 ] )
+
+        if self.config[ 'propagator' ] in nt.SYMPLECTIC_WEIGHTS:
+            return self.propagate_symplectic( state0, t0, t1, t_eval )
+
+        if self.config[ 'propagator' ] == 'MCPI':
+            return self.propagate_mcpi( state0, t0, t1, t_eval )
+
+        # Continue with the step size the solver last settled on
+        first_step = None
+        if self.last_step is not None:
+            first_step = min( self.last_step, t1 - t0 )
+
+        ode_sol = solve_ivp(
+            fun        = self.diffy_q,
+            t_span     = ( t0, t1 ),
+            y0         = state0,
+            method     = self.config[ 'propagator' ],
+            rtol       = self.config[ 'rtol' ],
+            atol       = self.config[ 'atol' ],
+            t_eval     = t_eval,
+            first_step = first_step
+        )
+
+        # The last step is usually clipped to t1, so keep the one before
+        if t_eval is None and ode_sol.t.shape[ 0 ] > 2:
+            self.last_step = ode_sol.t[ -2 ] - ode_sol.t[ -3 ]
+
+        return ode_sol.t, ode_sol.y.T
+
+    def symplectic_step_size( self ):
+        '''
+        Fixed step of the symplectic propagators: config[ 'dt' ], else
+        1/100 of the initial orbital period
+        '''
+        if self.config[ 'dt' ] is not None:
+            return float( self.config[ 'dt' ] )
+
+        if np.dot( self.state0[ 3: ], self.state0[ 3: ] ) / 2 - \
+                self.cb.mu / np.linalg.norm( self.state0[ :3 ] ) >= 0:
+            raise ValueError( 'Open orbits require config[ \'dt\' ] for symplectic propagators' )
+
+        return oc.period_from_sv( self.state0, self.cb.mu ) / 100
+
+    def propagate_symplectic( self, state0, t0, t1, times = None ):
+        '''
+        Integrates a coast arc from t0 to t1 with the fixed-step symplectic
+        method config[ 'propagator' ] (see nt.SYMPLECTIC_WEIGHTS), sampled
+        at times, or else at every step and at t1
+        '''
+        if self.config[ 'stm' ] or self.config[ 'formulation' ] != 'cowell':
+            raise ValueError( 'Symplectic propagators require the cowell formulation without STM' )
+
+        for key, value in self.orbit_perts.items():
+            if value and key != 'J2':
+                raise ValueError( 'Symplectic propagators only support conservative perturbations (J2)' )
+
+        dt = self.symplectic_step_size()
+
+        if times is None:
+            times = np.union1d( t0 + dt * np.arange( np.ceil( ( t1 - t0 ) / dt ) ), [ t1 ] )
+
+        states = nt.symplectic_integrate( self.accelerations, state0[ :3 ], state0[ 3: ],
+            times - t0, dt, { 'method' : self.config[ 'propagator' ] } )
+
+        return times, states
+
+    def node_rates( self, times, states ):
+        '''
+        State rates at many nodes at once (shape: [nodes, 6]), split into
+        config[ 'mcpi_args' ][ 'n_chunks' ] blocks over config[ 'executor' ]
+        when one is given
+        '''
+        executor = self.config[ 'executor' ]
+
+        if executor is None:
+            return self.diffy_q_batch( times, states ).reshape( -1, 6 )
+
+        perts       = [ key for key, value in self.orbit_perts.items() if value ]
+        unsupported = [ key for key in perts if key not in WORKER_PERTS ]
+
+        if unsupported:
+            raise ValueError( 'Perturbations not supported with an executor: %s' % unsupported )
+
+        # Workers get the central body and perturbation flags, not the Spacecraft
+        rates_func = functools.partial( batch_rates, cb = self.cb, perts = perts,
+            ballistic_coeff = self.ballistic_coeff )
+
+        n_chunks = self.config[ 'mcpi_args' ].get( 'n_chunks', os.cpu_count() )
+        chunks   = np.array_split( states, min( n_chunks, states.shape[ 0 ] ) )
+        rates    = executor.map( rates_func, [ times ] * len( chunks ), chunks )
+
+        return np.concatenate( list( rates ) ).reshape( -1, 6 )
+
+    def propagate_mcpi( self, state0, t0, t1, times = None ):
+        '''
+        Integrates a coast arc from t0 to t1 with Modified Chebyshev-Picard
+        iteration on equal segments, each warm-started from the Kepler
+        solution. The arc is kept as a Chebyshev ephemeris in
+        self.ephemeris (nt.ChebyshevSeries), sampled at times, or else
+        degree times per segment and at t1.
+
+        config[ 'mcpi_args' ]: { 'segment'  : segment length (s, default
+                                              1/4 of the initial period),
+                                 'degree', 'tol', 'max_iter' : see
+                                              nt.chebyshev_picard,
+                                 'n_chunks' : node blocks per executor }
+        '''
+        if self.config[ 'stm' ] or self.config[ 'formulation' ] != 'cowell':
+            raise ValueError( 'MCPI requires the cowell formulation without STM' )
+
+        _args = {
+            'segment'  : None,
+            'degree'   : 32,
+            'tol'      : 1e-13,
+            'max_iter' : 100
+        }
+
+        for key in self.config[ 'mcpi_args' ].keys():
+            _args[ key ] = self.config[ 'mcpi_args' ][ key ]
+
+        segment = _args[ 'segment' ]
+        if segment is None:
+            segment = oc.period_from_sv( self.state0, self.cb.mu ) / 4
+
+        n_seg    = max( 1, int( np.ceil( ( t1 - t0 ) / segment - 1e-9 ) ) )
+        interval = ( t1 - t0 ) / n_seg
+        coeffs   = np.empty( ( n_seg, _args[ 'degree' ] + 2, 6 ) )
+        state    = np.asarray( state0, dtype = float )
+
+        self.mcpi_iterations = np.empty( n_seg, dtype = int )
+
+        for k in range( n_seg ):
+            a     = t0 + k * interval
+            guess = lambda times: oc.kepler_universal( state, times - a, self.cb.mu )
+
+            coeffs[ k ], self.mcpi_iterations[ k ], converged = nt.chebyshev_picard(
+                self.node_rates, a, a + interval, state, guess, _args )
+
+            if not converged:
+                raise RuntimeError( 'MCPI did not converge on segment %d; '
+                    'shorten mcpi_args[ \'segment\' ]' % k )
+
+            # End of the segment: every T_k( 1 ) = 1
+            state = coeffs[ k ].sum( axis = 0 )
+
+        self.ephemeris = nt.ChebyshevSeries( t0, interval, coeffs )
+
+        if times is None:
+            step  = interval / _args[ 'degree' ]
+            times = np.union1d( t0 + step * np.arange( n_seg * _args[ 'degree' ] ), [ t1 ] )
+
+        return times, self.ephemeris( times )
+
+    def advance( self, t_end ):
+        '''
+        Integrates from the last stored sample to t_end and appends the
+        result to the history (and to the last maneuver segment). With
+        config[ 'checkpoint_file' ] set, the run is split into chunks of
+        config[ 'checkpoint_interval' ] seconds and a checkpoint is written
+        after each chunk.
+        '''
+        checkpoint = self.config[ 'checkpoint_file' ]
+        interval   = self.config[ 'checkpoint_interval' ] if checkpoint else np.inf
+        t          = float( self.history.times[ -1 ] )
+
+        while t < t_end:
+            t1 = min( t + interval, t_end )
+
+            times, states = self.propagate_segment( self.history.last_state, t, t1 )
+            self.history.append( times[ 1: ], states[ 1: ] )
+            t = t1
+
+            if self.segments:
+                self.segments[ -1 ][ 't1' ]   = t1
+                self.segments[ -1 ][ 'stop' ] = self.history.size
+
+            if checkpoint:
+                self.save_checkpoint()
+
+        self.update_history_views()
+
+    def extend( self, dt ):
+        '''
+        Continues the propagation by dt seconds from the last state,
+        appending to the existing history instead of starting over
+        '''
+        self.check_continuable( 'Extending a propagation' )
+
+        if self.history.size == 0:
+            if hasattr( self, 'states' ):
+                self.history.append( self.times, self.states, self.end_state )
+            else:
+                self.history.append( [ 0.0 ], self.state0[ None, : ] )
+
+        self.config[ 'tspan' ] = float( self.history.times[ -1 ] ) + dt
+        self.advance( self.config[ 'tspan' ] )
+
+    def check_continuable( self, name ):
+        '''
+        Segment-wise propagation integrates the Cartesian state only
+        '''
+        if self.config[ 'stm' ] or self.config[ 'formulation' ] != 'cowell':
+            raise ValueError( '%s requires the cowell formulation without STM' % name )
+
+    def truncate_history( self, size ):
+        '''
+        Truncates the history, marking checkpoint sample files that hold
+        discarded samples as stale
+        '''
+        self.history.truncate( size )
+
+        for entry in self.checkpoint_data.values():
+            if entry[ 'rows' ] is not None and entry[ 'rows' ] > size:
+                entry[ 'rows' ] = None
+
+    def update_history_views( self ):
+        '''
+        Points times / states at the filled part of the history buffer
+        '''
+        self.times   = self.history.times
+        self.states  = self.history.states
+        self.n_steps = self.history.size
+        self.ode_sol = None
+
+        self.altitudes_calculated = False
+        self.latlons_calculated   = False
+        self.coes_calculated      = False
+
+    def checkpoint_key( self ):
+        '''
+        Hash of the configuration a checkpoint belongs to. tspan is left
+        out, so a run can be resumed and lengthened.
+        '''
+        return pc.config_key(
+            dict( self.config, tspan = None, maneuvers = self.maneuvers ), self.state0 )
+
+    def save_checkpoint( self, filename = None ):
+        '''
+        Writes a checkpoint to filename (default: config[ 'checkpoint_file' ]).
+
+        History samples are appended as float64 rows [ t, state ] to a
+        sample file next to it, so each chunk costs I/O proportional to its
+        own length. filename itself is small and atomically replaced: it
+        holds the number of valid samples, the maneuver segments, the
+        float64 restart states of the history and the last solver step
+        size. A history truncated below the saved samples
+        (edited maneuvers) starts a new sample file, and the old one is
+        removed once filename points to the new one.
+        '''
+        filename = filename or self.config[ 'checkpoint_file' ]
+        entry    = self.checkpoint_data.get( filename )
+        old      = None
+
+        if entry is None or entry[ 'rows' ] is None or not os.path.exists( entry[ 'data' ] ):
+            old = entry[ 'data' ] if entry else checkpoint_data_file( filename )
+
+            fd, data = tempfile.mkstemp( dir = os.path.dirname( os.path.abspath( filename ) ),
+                                         prefix = os.path.basename( filename ) + '.', suffix = '.bin' )
+            os.close( fd )
+            entry = self.checkpoint_data[ filename ] = { 'data' : data, 'rows' : 0 }
+
+        start = entry[ 'rows' ]
+        rows  = np.column_stack( ( self.history.times[ start: ], self.history.states[ start: ] ) )
+
+        # Drop any partial rows of an interrupted write before appending
+        with open( entry[ 'data' ], 'r+b' ) as f:
+            f.truncate( start * CHECKPOINT_ROW.itemsize )
+            f.seek( 0, os.SEEK_END )
+            f.write( np.ascontiguousarray( rows, dtype = np.float64 ).tobytes() )
+
+        entry[ 'rows' ] = self.history.size
+        segments        = self.segments
+        ends            = self.history.end_states
+
+        pc.save_npz( filename,
+            key            = self.checkpoint_key(),
+            data           = os.path.basename( entry[ 'data' ] ),
+            size           = self.history.size,
+            segments       = np.array( [ [ seg[ 't0' ], seg[ 't1' ], seg[ 'start' ], seg[ 'stop' ] ]
+                                         for seg in segments ] ).reshape( -1, 4 ),
+            segment_states = np.array( [ seg[ 'state0' ] for seg in segments ] ).reshape( -1, 6 ),
+            segment_dvs    = np.array( [ seg[ 'dv' ] for seg in segments ] ).reshape( -1, 3 ),
+            end_index      = np.array( sorted( ends ), dtype = np.int64 ),
+            end_states     = np.array( [ ends[ index ] for index in sorted( ends ) ] ).reshape( -1, 6 ),
+            last_step      = np.nan if self.last_step is None else self.last_step
+        )
+
+        if old is not None and old != entry[ 'data' ] and os.path.exists( old ):
+            os.remove( old )
+
+    def load_checkpoint( self, filename = None ):
+        '''
+        Restores the history written by save_checkpoint
+        '''
+        filename = filename or self.config[ 'checkpoint_file' ]
+
+        with np.load( filename ) as data:
+            if str( data[ 'key' ] ) != self.checkpoint_key():
+                raise ValueError( 'Checkpoint was written for a different configuration' )
+
+            size = int( data[ 'size' ] )
+            path = checkpoint_data_file( filename )
+            rows = np.fromfile( path, dtype = CHECKPOINT_ROW, count = size )
+
+            if rows.shape[ 0 ] < size:
+                raise ValueError( 'Checkpoint sample file is incomplete: %s' % path )
+
+            self.history.truncate( 0 )
+            self.history.append( rows[ :, 0 ], rows[ :, 1: ] )
+            self.history.end_states.update(
+                zip( data[ 'end_index' ].tolist(), data[ 'end_states' ] ) )
+            self.checkpoint_data[ filename ] = { 'data' : path, 'rows' : size }
+
+            self.segments = [ {
+                't0'     : float( row[ 0 ] ),
+                't1'     : float( row[ 1 ] ),
+                'state0' : state0,
+                'dv'     : dv,
+                'start'  : int( row[ 2 ] ),
+                'stop'   : int( row[ 3 ] )
+            } for row, state0, dv in zip(
+                data[ 'segments' ], data[ 'segment_states' ], data[ 'segment_dvs' ] ) ]
+
+            last_step      = float( data[ 'last_step' ] )
+            self.last_step = None if np.isnan( last_step ) else last_step
+
+        self.update_history_views()
+
+    def resume( self, filename = None ):
+        '''
+        Loads a checkpoint and propagates the rest of the run up to
+        config[ 'tspan' ]. A Spacecraft built with config[ 'propagate' ]
+        set resumes from an existing config[ 'checkpoint_file' ] by itself
+        (see propagate_orbit); resuming from another file requires
+        'propagate' : False.
+        '''
+        self.load_checkpoint( filename )
+
+        if self.maneuvers:
+            self.propagate_segments()
+        else:
+            self.advance( self.config[ 'tspan' ] )
+
+    def save_archive( self, filename, args = {} ):
+        '''
+        Writes the state history as a compressed, delta-encoded archive
+        (see storage.save_archive, read back with storage.load_archive)
+        '''
+        st.save_archive( filename, self.times, self.states, args )
+
+    def segment( self, index ):
+        '''
+        Returns views of the times and states of one segment
+        '''
+        segment = self.segments[ index ]
+        span    = slice( segment[ 'start' ], segment[ 'stop' ] )
+
+        return self.history.times[ span ], self.history.states[ span ]
+
+    def propagate_patched_conic( self ):
+        '''
+        Patched conic propagation from config[ 'cb' ], switching central
+        body at SOI crossings (see patched_conics.propagate). States are
+        heliocentric, in the J2000 equatorial frame of the initial state;
+        self.legs lists the central body of each leg, self.leg_index the
+        leg of each sample and self.local_states the states relative to
+        that leg's central body
+        '''
+        args = dict( self.config[ 'patched_conic_args' ] )
+        args.setdefault( 't_eval', self.output_times( 0, self.config[ 'tspan' ] ) )
+
+        results = pcs.propagate( self.state0, self.cb, self.config[ 'tspan' ], args )
+
+        self.legs         = results[ 'legs' ]
+        self.leg_index    = results[ 'leg_index' ]
+        self.local_states = results[ 'local_states' ]
+        self.times        = results[ 'times' ]
+        self.states       = results[ 'states' ]
+        self.n_steps      = self.states.shape[ 0 ]
+
+    def central_states( self ):
+        '''
+        Returns the states relative to the central body of every sample
+        and that body's mu and radius (shape: [steps]). Patched conic
+        samples are taken relative to the central body of their leg.
+        '''
+        if self.config[ 'formulation' ] != 'patched_conic':
+            return self.states, np.full( self.n_steps, self.cb.mu ), np.full( self.n_steps, self.cb.radius )
+
+        mus   = np.array( [ leg[ 'cb' ][ 'mu' ]     for leg in self.legs ] )
+        radii = np.array( [ leg[ 'cb' ][ 'radius' ] for leg in self.legs ] )
+
+        return self.local_states, mus[ self.leg_index ], radii[ self.leg_index ]
+
     def calc_altitudes( self ):
-        self.altitudes = np.linalg.norm( self.states[ :, :3], axis = 1 ) - self.cb[ 'radius' ]
+        states, _, radii = self.central_states()
+
+        self.altitudes = np.linalg.norm( states[ :, :3], axis = 1 ) - radii
         self.altitudes_calculated = True
     
     def calc_coes ( self ):
+        states, mus, _ = self.central_states()
         self.coes = np.zeros( ( self.n_steps, 6 ) )
 
         for n in range( self.n_steps ):
             self.coes[ n, : ] = oc.coe_from_sv(
-                self.states[ n, : ],
+                states[ n, : ],
                 args = {
-                    'mu'  : self.cb[ 'mu' ],
+                    'mu'  : mus[ n ],
                     'deg' : True
                 } 
             )
@@ -150,30 +1233,62 @@ class Spacecraft:
         self.coes_calculated = True
 
     def calc_latlons( self ):
-        self.latlons            = oc.cart2lat( self.states[ :, :3], self.times, REFERENCE_TIME )
+        if self.config[ 'formulation' ] == 'patched_conic':
+            raise ValueError( 'Latitudes and longitudes are not defined for heliocentric '
+                              'patched conic states' )
+
+        self.latlons            = oc.cart2lat( self.states[ :, :3], self.times, self.config[ 'epoch' ] )
         self.latlons_calculated = True
     
     def calc_J2( self, state ):
         '''
-        Returns the perturbing gravitational acceleration vector (p) due to J2
+        Returns the perturbing gravitational acceleration vector (p) due to J2.
+        Also accepts stacked states (shape: [N, 6]), returning shape [N, 3]
+        '''
+        return J2_acceleration( state, self.cb )
+
+    def calc_J2_jacobian( self, state ):
+        '''
+        Returns the partial derivatives of the J2 acceleration with respect
+        to position (3x3, or [N, 3, 3] for stacked states)
         '''
-        x, y, z = state[ :3 ] 
-        r       = np.linalg.norm( state[ :3 ] )
-        p       = np.zeros( 3 )
+        x  = state[ ..., 0 ]
+        y  = state[ ..., 1 ]
+        z  = state[ ..., 2 ]
+        r2 = x**2 + y**2 + z**2
+        r  = np.sqrt( r2 )
+        k  = self.cb.J2_coeff
+
+        r5  = k / r**5
+        r7  = k / r**7
+        r9  = k / r**9
+        z2  = z**2
 
-        tx = x / r * ( 5 * z**2 / r**2 - 1 )
-        ty = y / r * ( 5 * z**2 / r**2 - 1 )
-        tz = z / r * ( 5 * z**2 / r**2 - 3 )
+        # Shared terms of the x and y rows
+        dxy = 5 * z2 * r7 - r5
+        cxy = 5 * r7 - 35 * z2 * r9
+        cxz = 15 * r7 - 35 * z2 * r9
 
-        p = 3 / 2 * self.cb[ 'J2' ] * self.cb[ 'mu' ] * self.cb[ 'radius' ]**2 / r**4 * np.array( [ tx, ty, tz ] )
+        J = np.empty( x.shape + ( 3, 3 ) )
+        J[ ..., 0, 0 ] = dxy + x**2 * cxy
+        J[ ..., 1, 1 ] = dxy + y**2 * cxy
+        J[ ..., 0, 1 ] = J[ ..., 1, 0 ] = x * y * cxy
+        J[ ..., 0, 2 ] = J[ ..., 2, 0 ] = x * z * cxz
+        J[ ..., 1, 2 ] = J[ ..., 2, 1 ] = y * z * cxz
+        J[ ..., 2, 2 ] = 30 * z2 * r7 - 35 * z2**2 * r9 - 3 * r5
 
-        return p
+        return J
 
     def calc_SRP( self, state ):
         pass
 
     def calc_atm_drag( self, state ):
-        pass
+        '''
+        Returns the drag acceleration in the co-rotating exponential
+        atmosphere of the central body (see atmosphere.drag_acceleration).
+        Also accepts stacked states (shape: [N, 6])
+        '''
+        return at.drag_acceleration( state, self.cb, self.ballistic_coeff )
 
     def calc_third_body_perts( self ):
         pass
@@ -185,14 +1300,17 @@ class Spacecraft:
         pt.plot_coes( self.times[ ::step ], [ self.coes[ ::step ] ], args )
 
     def plot_3d( self, label = ['Orbit'], args = {} ):
-        pt.plot_3d( [ self.states[ :, :3] ], 
-            args = {
-                'show'      : True,
-                'cb_radius' : self.cb[ 'radius' ],
-                'traj_lws'  : 1,
-                'labels'    : label
-            }
-        )
+        _args = {
+            'show'      : True,
+            'cb_radius' : self.cb.radius,
+            'traj_lws'  : 1,
+            'labels'    : label
+        }
+
+        for key in args.keys():
+            _args[ key ] = args[ key ]
+
+        pt.plot_3d( [ self.states[ :, :3] ], _args )
 
     def plot_altitudes( self, args = { 'show' : True, 'time_unit' : 'hours' } ):
         if self.altitudes_calculated == False:
@@ -209,8 +1327,8 @@ class Spacecraft:
     def plot_velocities( self, args = { 'show' : True, 'time_unit' : 'hours' } ):
         pt.plot_velocities( self.times, self.states[ :, 3: ], args )
 
-    def plot_groundtrack( self ):
+    def plot_groundtrack( self, args = { 'show' : True } ):
         if not self.latlons_calculated:
             self.calc_latlons()
         
-        pt.plot_groundtracks( self.latlons )
\ No newline at end of file
+        pt.plot_groundtracks( self.latlons, args )
\ No newline at end of file
@@ -0,0 +1,60 @@
+'''
+Atmosphere
+
+Piecewise exponential atmosphere density and the drag acceleration
+shared by the drag perturbation (Spacecraft.calc_atm_drag) and the
+orbit lifetime estimator, so both use the same density table and
+ballistic coefficient.
+
+Units: densities in kg/m^3, areas in m^2, masses in kg, and ballistic
+coefficients B = Cd A / m in m^2/kg; accelerations in km/s^2.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data as pd
+
+
+def ballistic_coefficient( Cd, area, mass ):
+    '''
+    Returns B = Cd A / m (m^2/kg)
+    '''
+    return Cd * area / mass
+
+def density( altitudes, table = pd.earth_atmosphere ):
+    '''
+    Returns the density (kg/m^3) and local scale height (km) at altitudes
+    (km, any shape) from a table of [ base altitude, base density, scale
+    height ] rows sorted by altitude
+    '''
+    table     = np.asarray( table, dtype = float )
+    altitudes = np.asarray( altitudes, dtype = float )
+
+    index = np.clip( np.searchsorted( table[ :, 0 ], altitudes, side = 'right' ) - 1,
+                     0, table.shape[ 0 ] - 1 )
+    rows  = table[ index ]
+    base, rho0, H = rows[ ..., 0 ], rows[ ..., 1 ], rows[ ..., 2 ]
+
+    return rho0 * np.exp( -( altitudes - base ) / H ), H
+
+def drag_acceleration( states, cb, B ):
+    '''
+    Returns the drag acceleration (km/s^2) of one or many states
+    (shape: [..., 6]) in an atmosphere co-rotating with the central body,
+    for a ballistic coefficient B (m^2/kg)
+    '''
+    r     = states[ ..., :3 ]
+    omega = cb.get( 'rotation_rate', 0.0 )
+
+    # Velocity relative to the atmosphere, v - omega x r
+    v_rel = np.array( states[ ..., 3:6 ], dtype = float )
+    v_rel[ ..., 0 ] += omega * r[ ..., 1 ]
+    v_rel[ ..., 1 ] -= omega * r[ ..., 0 ]
+
+    rho, _ = density( np.linalg.norm( r, axis = -1 ) - cb[ 'radius' ], cb[ 'atmosphere' ] )
+    speed  = np.linalg.norm( v_rel, axis = -1 )
+
+    # rho B has units 1/m, hence the factor 1000 to km^-1
+    return ( -0.5e3 * B * rho * speed )[ ..., None ] * v_rel
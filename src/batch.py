@@ -0,0 +1,151 @@
+'''
+Parallel Batch Propagation
+
+Runs independent Spacecraft propagations in worker processes, each with
+its own adaptive step size, so that mixed catalogs (LEO next to HEO) do
+not force every orbit onto the smallest common step.
+
+Every propagation is sampled on one common output grid and written by
+the worker straight into a preallocated multiprocessing.shared_memory
+block, so only the configurations travel between processes. Jobs are
+handed out one at a time from a queue shared by all workers, longest
+estimated job first, so idle workers keep taking work until the queue
+is empty.
+'''
+
+# Python Standard Libraries
+from concurrent.futures        import ProcessPoolExecutor, FIRST_EXCEPTION, wait
+from multiprocessing           import shared_memory
+import logging
+import os
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import orbit_calcs as oc
+import storage     as st
+
+logger = logging.getLogger( __name__ )
+
+# Output grid and shared output array of the current worker process
+_worker = {}
+
+
+def estimate_cost( config ):
+    '''
+    Relative cost of a propagation: the number of revolutions in tspan,
+    weighted by how much an eccentric orbit shrinks the step size near
+    periapsis. Only the ordering of the jobs matters.
+    '''
+    sc = Spacecraft( dict( config, propagate = False ) )
+    mu = sc.cb.mu
+
+    a = oc.coe_from_sv( sc.state0, args = { 'mu' : mu } )
+    e = min( a[ 1 ], 0.99 )
+
+    if e >= 0.99 or a[ 0 ] <= 0:
+        return float( 'inf' )
+
+    period = oc.period_from_sv( sc.state0, mu )
+
+    return sc.config[ 'tspan' ] / period * ( 1 + e ) / ( 1 - e )**1.5
+
+def _attach( name, shape, dtype, times ):
+    '''
+    Worker initializer: maps the shared output block once per process
+    '''
+    shm = shared_memory.SharedMemory( name = name )
+    _worker[ 'shm' ]    = shm
+    _worker[ 'times' ]  = times
+    _worker[ 'states' ] = np.ndarray( shape, dtype = dtype, buffer = shm.buf )
+
+def _propagate_job( index, config, times = None, states = None ):
+    '''
+    Propagates one configuration onto the common grid and writes the
+    result into row index of the shared output. Returns the index and
+    the number of grid samples filled.
+    '''
+    if states is None:
+        times  = _worker[ 'times' ]
+        states = _worker[ 'states' ]
+
+    sc = Spacecraft( dict( config, tspan = times[ -1 ], t_eval = times, propagate = True ) )
+
+    # Pick the grid samples out of the history (maneuver plans also store
+    # the segment ends); grid times the run never reached (a solver that
+    # stopped early) are left as NaN
+    k     = np.searchsorted( sc.times, times, side = 'right' ) - 1
+    valid = ( k >= 0 ) & ( sc.times[ np.maximum( k, 0 ) ] == times )
+
+    states[ index, valid ]  = sc.states[ k[ valid ] ]
+    states[ index, ~valid ] = np.nan
+
+    if not valid.all():
+        logger.warning( 'Job %d stopped at t = %.6g s: %d of %d grid samples left as NaN',
+                        index, sc.times[ -1 ], ( ~valid ).sum(), valid.shape[ 0 ] )
+
+    return index, int( valid.sum() )
+
+def propagate_batch( configs, times, args = {} ):
+    '''
+    Propagates many Spacecraft configurations in parallel.
+
+    Parameters:
+    - configs: List of Spacecraft configurations
+    - times  : Common output grid in seconds (shape: [steps]); each
+               configuration is integrated to times[ -1 ] with its own
+               adaptive steps and sampled on this grid
+    - args   : { 'n_workers' : number of processes (1 runs in process),
+                 'storage'   : storage policy, 'dtype' of the output,
+                 'cost'      : function config -> relative run time }
+
+    Returns:
+    - states: State histories (shape: [N, steps, 6])
+    '''
+    _args = {
+        'n_workers' : os.cpu_count(),
+        'storage'   : {},
+        'cost'      : estimate_cost
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    times     = np.asarray( times, dtype = float )
+    n_workers = max( 1, min( _args[ 'n_workers' ] or 1, len( configs ) ) )
+    shape     = ( len( configs ), times.shape[ 0 ], 6 )
+    dtype     = np.dtype( st.storage_policy( _args[ 'storage' ] )[ 'dtype' ] )
+
+    # Longest jobs first, so the short ones fill in the gaps at the end
+    costs = np.array( [ _args[ 'cost' ]( config ) for config in configs ] )
+    order = np.argsort( -costs, kind = 'stable' )
+
+    if n_workers == 1:
+        states = np.empty( shape, dtype = dtype )
+        for index in order:
+            _propagate_job( index, configs[ index ], times, states )
+        return states
+
+    size = max( 1, int( np.prod( shape ) ) * dtype.itemsize )
+    shm  = shared_memory.SharedMemory( create = True, size = size )
+
+    try:
+        with ProcessPoolExecutor( max_workers = n_workers, initializer = _attach,
+                                  initargs = ( shm.name, shape, dtype, times ) ) as executor:
+            futures = [ executor.submit( _propagate_job, int( index ), configs[ index ] )
+                        for index in order ]
+
+            done, pending = wait( futures, return_when = FIRST_EXCEPTION )
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+
+        states = np.ndarray( shape, dtype = dtype, buffer = shm.buf ).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return states
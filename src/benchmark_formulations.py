@@ -0,0 +1,53 @@
+'''
+Benchmark of the Cartesian (Cowell) formulation against the
+Sundman-regularized formulation for highly eccentric orbits.
+
+Reports the number of integration steps and the maximum relative error
+in specific energy (two-body only, so energy is exactly conserved).
+'''
+
+# Python Standard Libraries
+import time
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from Spacecraft     import Spacecraft as SC
+import planetary_data as pd
+import orbit_calcs    as oc
+
+mu = pd.earth[ 'mu' ]
+
+def run( coes, formulation, tol, revs ):
+    start = time.perf_counter()
+    sc    = SC( {
+        'coes'        : coes,
+        'tspan'       : str( revs ),
+        'formulation' : formulation,
+        'propagator'  : 'DOP853',
+        'atol'        : tol,
+        'rtol'        : tol
+    } )
+    wall = time.perf_counter() - start
+
+    energies = oc.specific_energy( sc.states, mu )
+    de       = np.max( np.abs( ( energies - energies[ 0 ] ) / energies[ 0 ] ) )
+
+    return sc.n_steps, de, wall
+
+if __name__ == '__main__':
+    revs = 20
+    rows = []
+
+    for e in [ 0.7, 0.73, 0.8, 0.9 ]:
+        coes = [ 26500, e, 63.4, 45, 270, 0 ]
+        for tol in [ 1e-6, 1e-9 ]:
+            for formulation in [ 'cowell', 'sundman' ]:
+                rows.append( ( e, tol, formulation ) + run( coes, formulation, tol, revs ) )
+
+    print()
+    print( '%d revolutions, a = 26500 km, DOP853' % revs )
+    print( '%5s %7s %10s %7s %12s %8s' % ( 'e', 'tol', 'form', 'steps', 'dE/E', 'wall(s)' ) )
+    for row in rows:
+        print( '%5.2f %7.0e %10s %7d %12.3e %8.3f' % row )
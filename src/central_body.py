@@ -0,0 +1,66 @@
+'''
+Central Body
+
+Compact, immutable representation of a central body for the force model.
+Constants used on every right-hand side evaluation (including derived
+ones such as the J2 acceleration coefficient) are computed once.
+
+CentralBody behaves as a read-only mapping over the original
+planetary_data dictionary, so code written against the dicts
+(cb[ 'mu' ], cb[ 'radius' ], ...) keeps working.
+'''
+
+# Python Standard Libraries
+from collections.abc import Mapping
+from types           import MappingProxyType
+
+# Third-party Libraries
+import numpy as np
+
+
+class CentralBody( Mapping ):
+
+    __slots__ = (
+        'name', 'mu', 'radius', 'J2', 'J2_coeff', 'sqrt_mu', '_data' )
+
+    def __init__( self, cb ):
+        if isinstance( cb, CentralBody ):
+            cb = cb._data
+
+        set_attr = object.__setattr__
+        set_attr( self, '_data',    MappingProxyType( dict( cb ) ) )
+        set_attr( self, 'name',     cb.get( 'name', '' ) )
+        set_attr( self, 'mu',       float( cb[ 'mu' ] ) )
+        set_attr( self, 'radius',   float( cb[ 'radius' ] ) )
+        set_attr( self, 'J2',       float( cb.get( 'J2', 0.0 ) ) )
+        set_attr( self, 'sqrt_mu',  np.sqrt( self.mu ) )
+
+        # Coefficient of the J2 acceleration, 3/2 J2 mu R^2
+        set_attr( self, 'J2_coeff', 1.5 * self.J2 * self.mu * self.radius**2 )
+
+    def __setattr__( self, key, value ):
+        raise AttributeError( 'CentralBody is immutable' )
+
+    def __getitem__( self, key ):
+        return self._data[ key ]
+
+    def __iter__( self ):
+        return iter( self._data )
+
+    def __len__( self ):
+        return len( self._data )
+
+    def __repr__( self ):
+        return 'CentralBody(%s)' % self.name
+
+    def __reduce__( self ):
+        return ( CentralBody, ( dict( self._data ), ) )
+
+def central_body( cb ):
+    '''
+    Returns cb as a CentralBody, accepting planetary_data dicts
+    '''
+    if isinstance( cb, CentralBody ):
+        return cb
+
+    return CentralBody( cb )
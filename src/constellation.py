@@ -0,0 +1,300 @@
+'''
+Constellation Tools
+
+Walker constellation generation, batch propagation of every satellite in
+one vectorized call and coverage statistics over a latitude / longitude
+grid.
+'''
+
+# Third-party Libraries
+import numpy as np
+from scipy.integrate import solve_ivp
+
+# User-defined Libraries
+from Spacecraft import Spacecraft, REFERENCE_TIME
+import planetary_data  as pd
+import orbit_calcs     as oc
+import mean_elements   as me
+import storage         as st
+import numerical_tools as nt
+import coverage        as cv
+
+
+def walker_elements( T, P, F, sma, incl, args = {} ):
+    '''
+    Returns the classical orbital elements of a Walker constellation T/P/F
+    (shape: [T, 6], angles in degrees).
+
+    Parameters:
+    - T   : Total number of satellites
+    - P   : Number of equally spaced orbital planes
+    - F   : Relative phasing between adjacent planes (0 <= F < P)
+    - sma : Semi-major axis (km)
+    - incl: Inclination (deg)
+    - args: { 'pattern' : 'delta' (planes over 360 deg) or 'star' (180 deg),
+              'ecc', 'aop', 'raan0', 'ta0' }
+    '''
+    _args = {
+        'pattern' : 'delta',
+        'ecc'     : 0.0,
+        'aop'     : 0.0,
+        'raan0'   : 0.0,
+        'ta0'     : 0.0
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    if T % P:
+        raise ValueError( 'T must be a multiple of P' )
+
+    S      = T // P
+    spread = 360.0 if _args[ 'pattern' ] == 'delta' else 180.0
+
+    plane = np.repeat( np.arange( P ), S )
+    slot  = np.tile(   np.arange( S ), P )
+
+    coes = np.empty( ( T, 6 ) )
+    coes[ :, 0 ] = sma
+    coes[ :, 1 ] = _args[ 'ecc' ]
+    coes[ :, 2 ] = incl
+    coes[ :, 3 ] = _args[ 'raan0' ] + spread / P * plane
+    coes[ :, 4 ] = _args[ 'aop' ]
+    coes[ :, 5 ] = _args[ 'ta0' ] + 360.0 / S * slot + 360.0 * F / T * plane
+    coes[ :, 3: ] %= 360.0
+
+    return coes
+
+def propagate_constellation( coes, times, args = {} ):
+    '''
+    Propagates every satellite of a constellation together.
+
+    Parameters:
+    - coes : Initial elements (shape: [N, 6], degrees)
+    - times: Output times in seconds (shape: [steps])
+    - args : { 'method' : 'numerical' (one batched solve_ivp call) or
+               'mean' (closed-form secular J2 mean elements),
+               'storage' : storage policy ('dtype', 'contiguous') of the
+               returned histories, plus Spacecraft config keys cb,
+               orbit_perts, propagator, rtol, atol and dt (symplectic
+               propagators, default 1/100 of the shortest period) }
+
+    Returns:
+    - states: State histories (shape: [N, steps, 6])
+    '''
+    _args = {
+        'method'      : 'numerical',
+        'cb'          : pd.earth,
+        'orbit_perts' : {},
+        'propagator'  : 'RK45',
+        'rtol'        : 1e-8,
+        'atol'        : 1e-8,
+        'dt'          : None,
+        'storage'     : {}
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    # Batch outputs are sampled at times, so there is nothing to decimate
+    policy = st.storage_policy( _args[ 'storage' ] )
+    if policy[ 'cadence' ] is not None:
+        raise ValueError( 'Batch runs take their output cadence from times' )
+
+    coes  = np.atleast_2d( np.asarray( coes, dtype = float ) )
+    times = np.asarray( times, dtype = float )
+    N     = coes.shape[ 0 ]
+
+    if _args[ 'method' ] == 'mean':
+        coes_t = me.propagate_mean_elements( coes, times, _args[ 'cb' ] )
+        states = oc.sv_from_coes( coes_t.reshape( -1, 6 ), _args[ 'cb' ][ 'mu' ] )
+        return st.apply_policy( times, states.reshape( N, times.shape[ 0 ], 6 ), policy, axis = 1 )[ 1 ]
+
+    states0 = oc.sv_from_coes( coes, _args[ 'cb' ][ 'mu' ] )
+
+    sc = Spacecraft( {
+        'cb'          : _args[ 'cb' ],
+        'state'       : states0[ 0 ],
+        'tspan'       : times[ -1 ],
+        'orbit_perts' : _args[ 'orbit_perts' ],
+        'propagate'   : False
+    } )
+
+    # Fixed-step symplectic integration of the whole batch, written straight
+    # into the [N, steps, 6] output through a time-major view
+    if _args[ 'propagator' ] in nt.SYMPLECTIC_WEIGHTS:
+        dt = _args[ 'dt' ]
+        if dt is None:
+            dt = min( oc.period_from_sv( state, _args[ 'cb' ][ 'mu' ] ) for state in states0 ) / 100
+
+        states = np.empty( ( N, times.shape[ 0 ], 6 ) )
+        nt.symplectic_integrate( sc.accelerations, states0[ :, :3 ], states0[ :, 3: ],
+            times - times[ 0 ], dt,
+            { 'method' : _args[ 'propagator' ], 'out' : states.transpose( 1, 0, 2 ) } )
+
+        return st.apply_policy( times, states, policy, axis = 1 )[ 1 ]
+
+    ode_sol = solve_ivp(
+        fun    = sc.diffy_q_batch,
+        t_span = ( times[ 0 ], times[ -1 ] ),
+        y0     = states0.ravel(),
+        method = _args[ 'propagator' ],
+        rtol   = _args[ 'rtol' ],
+        atol   = _args[ 'atol' ],
+        t_eval = times
+    )
+
+    states = ode_sol.y.reshape( N, 6, -1 ).transpose( 0, 2, 1 )
+
+    return st.apply_policy( times, states, policy, axis = 1 )[ 1 ]
+
+def latlon_grid( lat_step = 5.0, lon_step = 5.0 ):
+    '''
+    Returns grid cell center latitudes and longitudes (degrees)
+    '''
+    lats = np.arange( -90 + lat_step / 2, 90, lat_step )
+    lons = np.arange( -180 + lon_step / 2, 180, lon_step )
+
+    return lats, lons
+
+def visibility( states, times, lats, lons, args = {} ):
+    '''
+    Returns the number of satellites above the minimum elevation for every
+    grid point at every time (shape: [steps, n_lats, n_lons]).
+
+    A satellite at radius r is visible from a ground point when the central
+    angle between them is below arccos( R cos(el) / r ) - el, so visibility
+    reduces to one matrix product of unit vectors per block of time steps.
+    '''
+    _args = {
+        'cb'            : pd.earth,
+        'min_elevation' : 10.0,
+        'epoch'         : REFERENCE_TIME,
+        'block_size'    : 2**24
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    states = np.asarray( states )
+    N, steps = states.shape[ :2 ]
+
+    # Ground point unit vectors in ECEF (shape: [G, 3])
+    lat, lon = np.meshgrid( np.asarray( lats ) * oc.d2r, np.asarray( lons ) * oc.d2r, indexing = 'ij' )
+    ground   = np.stack( ( np.cos( lat ) * np.cos( lon ),
+                           np.cos( lat ) * np.sin( lon ),
+                           np.sin( lat ) ), axis = -1 ).reshape( -1, 3 )
+    G        = ground.shape[ 0 ]
+
+    # Satellite unit vectors in ECEF and cosine of their visibility cone
+    r_ECEF = oc.eci2ecef( states[ :, :, :3 ], times, _args[ 'epoch' ] )
+    rnorm  = np.linalg.norm( r_ECEF, axis = -1 )
+    u_sats = r_ECEF / rnorm[ ..., None ]
+    el     = _args[ 'min_elevation' ] * oc.d2r
+    lam    = np.arccos( np.clip( _args[ 'cb' ][ 'radius' ] * np.cos( el ) / rnorm, -1, 1 ) ) - el
+    cos_lam = np.cos( lam )
+
+    counts = np.zeros( ( steps, G ), dtype = np.int32 )
+    block  = max( 1, _args[ 'block_size' ] // ( N * G ) )
+
+    # Single precision halves the memory traffic of the dominant product
+    ground  = ground.astype( np.float32 )
+    u_sats  = u_sats.astype( np.float32 )
+    cos_lam = cos_lam.astype( np.float32 )
+
+    for k in range( 0, steps, block ):
+        u   = u_sats[ :, k:k + block ]
+        dot = ( u.reshape( -1, 3 ) @ ground.T ).reshape( N, -1, G )
+        counts[ k:k + block ] = np.add.reduce(
+            dot >= cos_lam[ :, k:k + block, None ], axis = 0, dtype = np.int32 )
+
+    return counts.reshape( steps, len( lats ), len( lons ) )
+
+def coverage_statistics( counts, times, args = {} ):
+    '''
+    Summarizes a visibility count history (shape: [steps, ...]) on a
+    uniform time grid.
+
+    Returns a dictionary of per grid point arrays:
+    - 'percent_covered': percentage of time with at least 'min_sats' in view
+    - 'mean_in_view', 'min_in_view', 'max_in_view'
+    - 'max_gap'        : longest interval without coverage (s)
+    - 'mean_revisit'   : mean gap between passes (s)
+
+    The gap statistics are those of coverage.CoverageGrid (see
+    coverage.gap_statistics).
+    '''
+    _args = {
+        'min_sats' : 1
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    counts  = np.asarray( counts )
+    times   = np.asarray( times, dtype = float )
+    steps   = counts.shape[ 0 ]
+    dt      = times[ 1 ] - times[ 0 ]
+    covered = counts >= _args[ 'min_sats' ]
+    idx     = np.arange( steps ).reshape( ( steps, ) + ( 1, ) * ( counts.ndim - 1 ) )
+    seen    = covered.any( axis = 0 )
+
+    # First / last covered sample, NaN for points never covered
+    first_seen = np.where( seen, times[ 0 ] + covered.argmax( axis = 0 ) * dt, np.nan )
+    last_seen  = np.where( seen, times[ 0 ] + ( steps - 1 - covered[ ::-1 ].argmax( axis = 0 ) ) * dt, np.nan )
+
+    # Gaps between passes: uncovered runs closed by a later covered step.
+    # Index of the most recent covered step, -1 before the first one
+    last    = np.maximum.accumulate( np.where( covered, idx, -1 ), axis = 0 )
+    closing = ~covered[ :-1 ] & covered[ 1: ] & ( last[ :-1 ] >= 0 )
+    gaps    = np.where( closing, idx[ :-1 ] - last[ :-1 ], 0 ) * dt
+
+    covered_time = covered.sum( axis = 0 ) * dt
+    n_gaps       = closing.sum( axis = 0 )
+    gap_total    = gaps.sum( axis = 0 )
+    max_gap      = gaps.max( axis = 0, initial = 0.0 )
+
+    percent_covered, max_gap, mean_revisit = cv.gap_statistics(
+        covered_time, first_seen, last_seen, max_gap, gap_total, n_gaps,
+        times[ 0 ], times[ -1 ], dt )
+
+    return {
+        'percent_covered' : percent_covered,
+        'mean_in_view'    : counts.mean( axis = 0 ),
+        'min_in_view'     : counts.min( axis = 0 ),
+        'max_in_view'     : counts.max( axis = 0 ),
+        'max_gap'         : max_gap,
+        'mean_revisit'    : mean_revisit
+    }
+
+def walker_coverage( T, P, F, sma, incl, times, args = {} ):
+    '''
+    Builds, propagates and evaluates a Walker constellation in one call.
+
+    Returns:
+    - coes  : Constellation elements (shape: [T, 6])
+    - states: State histories (shape: [T, steps, 6])
+    - stats : coverage_statistics dictionary over the grid
+    '''
+    _args = {
+        'walker_args'      : {},
+        'propagate_args'   : {},
+        'visibility_args'  : {},
+        'statistics_args'  : {},
+        'lat_step'         : 5.0,
+        'lon_step'         : 5.0
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    coes       = walker_elements( T, P, F, sma, incl, _args[ 'walker_args' ] )
+    states     = propagate_constellation( coes, times, _args[ 'propagate_args' ] )
+    lats, lons = latlon_grid( _args[ 'lat_step' ], _args[ 'lon_step' ] )
+    counts     = visibility( states, times, lats, lons, _args[ 'visibility_args' ] )
+    stats      = coverage_statistics( counts, times, _args[ 'statistics_args' ] )
+
+    stats[ 'lats' ] = lats
+    stats[ 'lons' ] = lons
+
+    return coes, states, stats
@@ -0,0 +1,154 @@
+'''
+Covariance Propagation
+
+Batched propagation of state uncertainty for many objects, either
+linearized through the state transition matrix or with the unscented
+transform. Each mode integrates every object (and every sigma point)
+in a single vectorized solve_ivp call.
+'''
+
+# Third-party Libraries
+import numpy as np
+from scipy.integrate import solve_ivp
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+
+METHODS = ( 'linear', 'unscented' )
+
+
+def _force_model( config ):
+    '''
+    Returns a non-propagating Spacecraft providing the batched dynamics
+    '''
+    _config = dict( config )
+    _config[ 'propagate' ] = False
+
+    if not len( _config.get( 'state', [] ) ) and not len( _config.get( 'coes', [] ) ):
+        _config[ 'state' ] = np.zeros( 6 )
+        _config[ 'tspan' ] = 0.0
+
+    return Spacecraft( _config )
+
+def sigma_points( means, covs, args = {} ):
+    '''
+    Returns the 2n + 1 unscented sigma points and their mean / covariance
+    weights for stacked means (shape: [M, n]) and covariances ([M, n, n]).
+    '''
+    _args = {
+        'alpha' : 1.0,
+        'beta'  : 2.0,
+        'kappa' : 0.0
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    n   = means.shape[ -1 ]
+    lam = _args[ 'alpha' ]**2 * ( n + _args[ 'kappa' ] ) - n
+
+    # Columns of the Cholesky factor give the sigma point offsets
+    L       = np.linalg.cholesky( ( n + lam ) * covs )
+    offsets = np.swapaxes( L, -1, -2 )
+
+    points = np.concatenate( (
+        means[ :, None, : ],
+        means[ :, None, : ] + offsets,
+        means[ :, None, : ] - offsets
+    ), axis = 1 )
+
+    w_mean      = np.full( 2 * n + 1, 1 / ( 2 * ( n + lam ) ) )
+    w_cov       = w_mean.copy()
+    w_mean[ 0 ] = lam / ( n + lam )
+    w_cov[ 0 ]  = lam / ( n + lam ) + ( 1 - _args[ 'alpha' ]**2 + _args[ 'beta' ] )
+
+    return points, w_mean, w_cov
+
+def propagate_covariances( config, states0, covs0, epochs, args = {} ):
+    '''
+    Propagates the covariance of many objects sharing one force model.
+
+    Parameters:
+    - config : Spacecraft configuration providing cb, orbit_perts and
+               integrator settings (states are taken from states0)
+    - states0: Initial mean states (shape: [M, 6])
+    - covs0  : Initial covariances (shape: [M, 6, 6])
+    - epochs : Output times in seconds since the initial epoch (shape: [T])
+    - args   : { 'method' : 'linear' | 'unscented', plus sigma point
+                 parameters 'alpha', 'beta', 'kappa' }. The linear method
+                 requires analytic partials of every perturbation (J2)
+
+    Returns:
+    - means: Mean states at each epoch (shape: [M, T, 6])
+    - covs : Covariances at each epoch (shape: [M, T, 6, 6])
+    '''
+    _args = {
+        'method' : 'linear'
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    if _args[ 'method' ] not in METHODS:
+        raise ValueError( 'Unknown covariance method: %s (expected one of %s)'
+                          % ( _args[ 'method' ], ', '.join( METHODS ) ) )
+
+    states0 = np.atleast_2d( np.asarray( states0, dtype = float ) )
+    covs0   = np.asarray( covs0, dtype = float ).reshape( -1, 6, 6 )
+    epochs  = np.asarray( epochs, dtype = float )
+    sc      = _force_model( config )
+    M       = states0.shape[ 0 ]
+
+    if _args[ 'method' ] == 'linear':
+        y0 = np.concatenate(
+            ( states0, np.broadcast_to( np.eye( 6 ).ravel(), ( M, 36 ) ) ), axis = 1 )
+        fun = sc.diffy_q_stm_batch
+        sc.check_stm_partials()
+    else:
+        points, w_mean, w_cov = sigma_points( states0, covs0, _args )
+        y0  = points.reshape( -1, 6 )
+        fun = sc.diffy_q_batch
+
+    ode_sol = solve_ivp(
+        fun    = fun,
+        t_span = ( 0, epochs[ -1 ] ),
+        y0     = y0.ravel(),
+        method = sc.config[ 'propagator' ],
+        rtol   = sc.config[ 'rtol' ],
+        atol   = sc.config[ 'atol' ],
+        t_eval = epochs
+    )
+
+    if ode_sol.status != 0:
+        raise RuntimeError( 'Covariance propagation failed at t = %.6g s: %s'
+                            % ( ode_sol.t[ -1 ], ode_sol.message ) )
+
+    T = ode_sol.t.shape[ 0 ]
+
+    if _args[ 'method' ] == 'linear':
+        ys    = ode_sol.y.T.reshape( T, M, 42 ).swapaxes( 0, 1 )
+        means = np.ascontiguousarray( ys[ :, :, :6 ] )
+        stms  = ys[ :, :, 6: ].reshape( M, T, 6, 6 )
+        covs  = stms @ covs0[ :, None ] @ np.swapaxes( stms, -1, -2 )
+    else:
+        ys     = ode_sol.y.T.reshape( T, M, 13, 6 ).swapaxes( 0, 1 )
+        means  = np.einsum( 'k,mtki->mti', w_mean, ys )
+        devs   = ys - means[ :, :, None, : ]
+        covs   = np.einsum( 'k,mtki,mtkj->mtij', w_cov, devs, devs )
+
+    return means, covs
+
+def propagate_covariance( config, cov0, epochs, args = {} ):
+    '''
+    Propagates the covariance of a single Spacecraft configuration.
+
+    Returns:
+    - means: Mean states at each epoch (shape: [T, 6])
+    - covs : Covariances at each epoch (shape: [T, 6, 6])
+    '''
+    sc = _force_model( config )
+
+    means, covs = propagate_covariances(
+        config, sc.state0[ None, : ], np.asarray( cov0 )[ None ], epochs, args )
+
+    return means[ 0 ], covs[ 0 ]
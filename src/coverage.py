@@ -0,0 +1,324 @@
+'''
+Coverage Analysis
+
+Binned global coverage maps for nadir-pointing sensors with a given
+half-angle. Each sub-satellite point is mapped to its footprint of grid
+cells through templates of cell offsets that are precomputed per
+latitude row and footprint size, and coverage intervals are accumulated
+per cell with NumPy scatter operations.
+
+Percent time covered, maximum gap and mean revisit are accumulated
+incrementally, so multi-day, multi-satellite runs can be streamed through
+in chunks of time steps with memory proportional to the grid only.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from Spacecraft import REFERENCE_TIME
+import planetary_data as pd
+import orbit_calcs    as oc
+import plotting_tools as pt
+
+
+def footprint_angle( radii, half_angle, cb_radius ):
+    '''
+    Returns the Earth central angle (radians) of the footprint edge of a
+    nadir-pointing sensor with half_angle (radians) at radii, limited by
+    the horizon
+    '''
+    ratio   = np.asarray( radii ) / cb_radius * np.sin( half_angle )
+    edge    = np.arcsin( np.clip( ratio, -1.0, 1.0 ) ) - half_angle
+    horizon = np.arccos( np.clip( cb_radius / np.asarray( radii ), -1.0, 1.0 ) )
+
+    return np.where( ratio < 1.0, edge, horizon )
+
+def gap_statistics( covered_time, first_seen, last_seen, max_gap, gap_total, n_gaps,
+                    t_start, t_end, dt ):
+    '''
+    Returns ( percent_covered, max_gap (s), mean_revisit (s) ) from per
+    point accumulators of coverage sampled on a uniform time grid, where
+    each covered sample stands for dt of coverage:
+    - covered_time        : covered samples times dt
+    - first_seen, last_seen: first / last covered sample time, NaN if never
+    - max_gap, gap_total, n_gaps: longest, total and number of the gaps
+      between covered samples
+
+    max_gap includes the gaps before the first and after the last pass
+    (the whole run if never covered). mean_revisit is the mean gap between
+    passes: 0 for points covered throughout, NaN for points with fewer
+    than two passes and some uncovered time.
+    '''
+    duration = t_end - t_start + dt
+
+    leading  = np.where( np.isnan( first_seen ), duration, first_seen - t_start )
+    trailing = np.where( np.isnan( last_seen ),  duration, t_end - last_seen )
+    max_gap  = np.maximum( max_gap, np.maximum( leading, trailing ) )
+
+    with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+        mean_revisit = np.where( n_gaps > 0, gap_total / n_gaps, np.nan )
+    mean_revisit = np.where( max_gap == 0, 0.0, mean_revisit )
+
+    return covered_time / duration * 100, max_gap, mean_revisit
+
+class CoverageGrid:
+
+    def __init__( self, args = {} ):
+        _args = {
+            'resolution'   : 1.0,   # grid cell size (deg)
+            'half_angle'   : 45.0,  # sensor half-angle (deg)
+            'cb'           : pd.earth,
+            'lambda_bin'   : None,  # footprint angle quantization (deg)
+            'chunk_pairs'  : 2**21  # max (time, cell) pairs per chunk
+        }
+
+        for key in args.keys():
+            _args[ key ] = args[ key ]
+
+        self.args  = _args
+        self.res   = _args[ 'resolution' ]
+        self.n_lat = int( round( 180 / self.res ) )
+        self.n_lon = int( round( 360 / self.res ) )
+        self.lats  = -90  + self.res * ( np.arange( self.n_lat ) + 0.5 )
+        self.lons  = -180 + self.res * ( np.arange( self.n_lon ) + 0.5 )
+
+        if _args[ 'lambda_bin' ] is None:
+            self.lambda_bin = self.res / 10 * oc.d2r
+        else:
+            self.lambda_bin = _args[ 'lambda_bin' ] * oc.d2r
+
+        self.templates = {}
+        self.reset()
+
+    def reset( self ):
+        n_cells = self.n_lat * self.n_lon
+
+        self.t_start      = None
+        self.t_end        = None
+        self.dt           = None
+        self.covered_time = np.zeros( n_cells )
+        self.first_seen   = np.full( n_cells, np.nan )
+        self.last_seen    = np.full( n_cells, np.nan )
+        self.max_gap      = np.zeros( n_cells )
+        self.gap_total    = np.zeros( n_cells )
+        self.n_gaps       = np.zeros( n_cells, dtype = np.int64 )
+
+    def template( self, row, lam_index ):
+        '''
+        Returns ( rows, dcols ) of the cells within the footprint of a
+        sub-satellite point in latitude row 'row', cached per key
+        '''
+        key = ( row, lam_index )
+
+        if key not in self.templates:
+            lam  = lam_index * self.lambda_bin
+            phi0 = self.lats[ row ] * oc.d2r
+            dres = self.res * oc.d2r
+
+            n_rows = int( np.ceil( lam / dres ) ) + 1
+            rows   = np.arange( row - n_rows, row + n_rows + 1 )
+            rows   = rows[ ( rows >= 0 ) & ( rows < self.n_lat ) ]
+            phi    = self.lats[ rows ] * oc.d2r
+
+            # Longitude half-width of the spherical cap on each row
+            with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+                arg = ( np.cos( lam ) - np.sin( phi0 ) * np.sin( phi ) ) / \
+                      ( np.cos( phi0 ) * np.cos( phi ) )
+            dlon  = np.where( arg <= -1, np.pi, np.arccos( np.clip( arg, -1, 1 ) ) )
+            keep  = arg < 1 + 1e-12
+            rows  = rows[ keep ]
+            widths = np.minimum(
+                np.floor( dlon[ keep ] / dres + 0.5 ).astype( int ), self.n_lon // 2 )
+
+            # Expand to one entry per cell
+            counts = 2 * widths + 1
+            t_rows = np.repeat( rows, counts )
+            starts = np.repeat( -widths, counts )
+            offset = np.arange( counts.sum() ) - np.repeat( np.cumsum( counts ) - counts, counts )
+
+            self.templates[ key ] = ( t_rows, starts + offset )
+
+        return self.templates[ key ]
+
+    def footprint_cells( self, lats, lons, radii ):
+        '''
+        Returns ( sample_index, cell_index ) pairs for every cell inside the
+        footprint of each sub-satellite point (degrees, km)
+        '''
+        rows = np.clip( ( ( lats + 90 ) / self.res ).astype( int ), 0, self.n_lat - 1 )
+        cols = ( ( lons + 180 ) / self.res ).astype( int ) % self.n_lon
+        lam  = footprint_angle( radii, self.args[ 'half_angle' ] * oc.d2r,
+                                self.args[ 'cb' ][ 'radius' ] )
+        lam_index = np.round( lam / self.lambda_bin ).astype( int )
+
+        # Group samples sharing a template and expand each group at once
+        keys    = rows * ( lam_index.max() + 1 ) + lam_index
+        order   = np.argsort( keys, kind = 'stable' )
+        bounds  = np.flatnonzero( np.diff( keys[ order ] ) ) + 1
+        samples = []
+        cells   = []
+
+        for members in np.split( order, bounds ):
+            if members.shape[ 0 ] == 0:
+                continue
+            t_rows, t_dcols = self.template( rows[ members[ 0 ] ], lam_index[ members[ 0 ] ] )
+
+            c = t_rows[ None, : ] * self.n_lon + \
+                ( cols[ members, None ] + t_dcols[ None, : ] ) % self.n_lon
+            samples.append( np.repeat( members, t_rows.shape[ 0 ] ) )
+            cells.append( c.ravel() )
+
+        if not samples:
+            return np.zeros( 0, dtype = int ), np.zeros( 0, dtype = int )
+
+        return np.concatenate( samples ), np.concatenate( cells )
+
+    def accumulate( self, times, lats, lons, radii ):
+        '''
+        Adds coverage from sub-satellite points on a uniform time grid.
+
+        Parameters:
+        - times: Sample times in seconds (shape: [steps]); successive calls
+                 must continue the same uniform grid
+        - lats, lons, radii: Sub-satellite latitude / longitude (deg) and
+                 orbit radius (km) (shape: [n_sats, steps])
+        '''
+        times = np.asarray( times, dtype = float )
+        lats  = np.atleast_2d( lats )
+        lons  = np.atleast_2d( lons )
+        radii = np.atleast_2d( radii )
+
+        if self.t_start is None:
+            self.t_start = times[ 0 ]
+            self.dt      = times[ 1 ] - times[ 0 ] if times.shape[ 0 ] > 1 else 0.0
+        self.t_end = times[ -1 ]
+
+        # Estimate the number of (time, cell) pairs per time step to size chunks
+        n_sats, steps = lats.shape
+        sample = self.footprint_cells( lats[ :, 0 ], lons[ :, 0 ], radii[ :, 0 ] )[ 1 ]
+        block  = max( 1, self.args[ 'chunk_pairs' ] // max( 1, sample.shape[ 0 ] ) )
+
+        for k in range( 0, steps, block ):
+            s = slice( k, k + block )
+            self._accumulate_chunk(
+                times[ s ], lats[ :, s ].ravel(), lons[ :, s ].ravel(), radii[ :, s ].ravel() )
+
+    def _accumulate_chunk( self, times, lats, lons, radii ):
+        steps   = times.shape[ 0 ]
+        n_cells = self.n_lat * self.n_lon
+
+        sample, cells = self.footprint_cells( lats, lons, radii )
+        t_index       = sample % steps
+
+        # Union over satellites: one entry per (cell, time step), sorted by
+        # cell and then time
+        pairs   = np.sort( cells.astype( np.int64 ) * steps + t_index )
+        pairs   = pairs[ np.concatenate( ( [ True ], pairs[ 1: ] != pairs[ :-1 ] ) ) ]
+        cells   = pairs // steps
+        t_index = pairs %  steps
+        t       = times[ t_index ]
+
+        # Percent time covered
+        self.covered_time += np.bincount( cells, minlength = n_cells ) * self.dt
+
+        # Intervals between successive covered samples of the same cell,
+        # the first sample of each cell closing the gap from the last chunk
+        first = np.ones( cells.shape[ 0 ], dtype = bool )
+        first[ 1: ] = cells[ 1: ] != cells[ :-1 ]
+
+        previous          = np.empty( t.shape[ 0 ] )
+        previous[ 1: ]    = t[ :-1 ]
+        previous[ first ] = self.last_seen[ cells[ first ] ]
+
+        interval = t - previous
+        gap      = interval - self.dt
+        is_gap   = np.isfinite( interval ) & ( interval > 1.5 * self.dt )
+
+        np.maximum.at( self.max_gap, cells[ is_gap ], gap[ is_gap ] )
+        self.gap_total += np.bincount( cells[ is_gap ], weights = gap[ is_gap ], minlength = n_cells )
+        self.n_gaps    += np.bincount( cells[ is_gap ], minlength = n_cells )
+
+        # Bookkeeping of first / last coverage per cell
+        unseen = np.isnan( self.first_seen[ cells[ first ] ] )
+        self.first_seen[ cells[ first ][ unseen ] ] = t[ first ][ unseen ]
+
+        last = np.ones( cells.shape[ 0 ], dtype = bool )
+        last[ :-1 ] = cells[ :-1 ] != cells[ 1: ]
+        self.last_seen[ cells[ last ] ] = t[ last ]
+
+    def results( self ):
+        '''
+        Returns a dictionary of coverage maps (shape: [n_lat, n_lon]):
+        - 'percent_covered': percentage of the run time inside a footprint
+        - 'max_gap'        : longest interval without coverage (s), including
+                             the gaps before the first and after the last pass
+        - 'mean_revisit'   : mean gap between passes (s), 0 if always
+                             covered, NaN with < 2 passes (gap_statistics)
+        '''
+        shape = ( self.n_lat, self.n_lon )
+
+        percent_covered, max_gap, mean_revisit = gap_statistics(
+            self.covered_time, self.first_seen, self.last_seen, self.max_gap,
+            self.gap_total, self.n_gaps, self.t_start, self.t_end, self.dt )
+
+        return {
+            'lats'            : self.lats,
+            'lons'            : self.lons,
+            'percent_covered' : percent_covered.reshape( shape ),
+            'max_gap'         : max_gap.reshape( shape ),
+            'mean_revisit'    : mean_revisit.reshape( shape )
+        }
+
+def coverage_from_states( states, times, args = {} ):
+    '''
+    Computes coverage maps for satellites sharing a uniform time grid.
+
+    Parameters:
+    - states: ECI states or positions (shape: [n_sats, steps, >=3])
+    - times : Times in seconds since epoch (shape: [steps])
+    - args  : CoverageGrid arguments, plus 'epoch'
+
+    Returns:
+    - CoverageGrid results dictionary
+    '''
+    _args = {
+        'epoch' : REFERENCE_TIME
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    states = np.asarray( states )
+    if states.ndim == 2:
+        states = states[ None ]
+
+    grid   = CoverageGrid( _args )
+    r_ECEF = oc.eci2ecef( states[ :, :, :3 ], times, _args[ 'epoch' ] )
+    radii  = np.linalg.norm( r_ECEF, axis = -1 )
+    lats   = np.arcsin( r_ECEF[ :, :, 2 ] / radii ) * oc.r2d
+    lons   = np.arctan2( r_ECEF[ :, :, 1 ], r_ECEF[ :, :, 0 ] ) * oc.r2d
+
+    grid.accumulate( times, lats, lons, radii )
+
+    return grid.results()
+
+def plot_coverage( results, key = 'percent_covered', args = {} ):
+    '''
+    Renders one of the coverage maps as a heatmap
+    '''
+    titles = {
+        'percent_covered' : 'Percent Time Covered',
+        'max_gap'         : 'Maximum Gap (s)',
+        'mean_revisit'    : 'Mean Revisit (s)'
+    }
+
+    _args = {
+        'title'      : titles.get( key, key ),
+        'cbar_label' : titles.get( key, key )
+    }
+
+    for arg in args.keys():
+        _args[ arg ] = args[ arg ]
+
+    pt.plot_coverage_map( results[ 'lats' ], results[ 'lons' ], results[ key ], _args )
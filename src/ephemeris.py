@@ -0,0 +1,207 @@
+'''
+Analytic Planetary Ephemeris
+
+Heliocentric planet states from mean Keplerian elements and their
+secular rates (E. M. Standish, "Keplerian Elements for Approximate
+Positions of the Major Planets", JPL, Table 1: valid 1800 AD - 2050 AD,
+J2000 ecliptic and equinox). Position errors are of the order of
+thousands of km for the inner planets, enough for mission design,
+SOI and third-body computations.
+
+Evaluation is vectorized over time arrays, repeated requests for the
+same epochs are served from a size-bounded LRU cache, and piecewise Chebyshev fits
+give constant-cost lookups inside integrators.
+'''
+
+# Python Standard Libraries
+from collections import OrderedDict
+import hashlib
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data  as pd
+import orbit_calcs     as oc
+import numerical_tools as nt
+
+J2000 = '2000-01-01T12:00:00'
+
+# Mean obliquity of the ecliptic at J2000 (deg)
+OBLIQUITY = 23.43928
+
+# Memory bound of the ephemeris cache (bytes)
+CACHE_BYTES = 64 * 2**20
+
+# Cached states, least recently used first, and their total size
+_cache = {
+    'entries' : OrderedDict(),
+    'bytes'   : 0
+}
+
+# [ a (AU), e, I (deg), L (deg), long. perihelion (deg), long. node (deg) ]
+# at J2000 and their rates per Julian century. 'Earth' is the Earth-Moon
+# barycenter.
+ELEMENTS = {
+    'Mercury' : (
+        [  0.38709927, 0.20563593,  7.00497902, 252.25032350,  77.45779628,  48.33076593 ],
+        [  0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081 ] ),
+    'Venus'   : (
+        [  0.72333566, 0.00677672,  3.39467605, 181.97909950, 131.60246718,  76.67984255 ],
+        [  0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418 ] ),
+    'Earth'   : (
+        [  1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193,   0.0 ],
+        [  0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364,   0.0 ] ),
+    'Mars'    : (
+        [  1.52371034, 0.09339410,  1.84969142,  -4.55343205, -23.94362959,  49.55953891 ],
+        [  0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343 ] ),
+    'Jupiter' : (
+        [  5.20288700, 0.04838624,  1.30439695,  34.39644051,  14.72847983, 100.47390909 ],
+        [ -0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668,  0.20469106 ] ),
+    'Saturn'  : (
+        [  9.53667594, 0.05386179,  2.48599187,  49.95424423,  92.59887831, 113.66242448 ],
+        [ -0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794 ] ),
+    'Uranus'  : (
+        [ 19.18916464, 0.04725744,  0.77263783, 313.23810451, 170.95427630,  74.01692503 ],
+        [ -0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281,  0.04240589 ] ),
+    'Neptune' : (
+        [ 30.06992276, 0.00859048,  1.77004347, -55.12002969,  44.96476227, 131.78422574 ],
+        [  0.00026291, 0.00005105,  0.00035372, 218.45945325, -0.32241464, -0.00508664 ] ),
+    'Pluto'   : (
+        [ 39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684 ],
+        [ -0.00031596, 0.00005170,  0.00004818, 145.20780515, -0.04062942, -0.01183482 ] )
+}
+
+
+def mean_elements( name, centuries ):
+    '''
+    Returns the mean elements of a planet at times given in Julian
+    centuries past J2000 (shape: [steps, 6], as in ELEMENTS with a in km)
+    '''
+    if name not in ELEMENTS:
+        raise ValueError( 'No approximate elements for body: %s' % name )
+
+    elements, rates = ELEMENTS[ name ]
+    out = np.asarray( elements ) + np.outer( centuries, rates )
+    out[ :, 0 ] *= pd.AU
+
+    return out
+
+def _states( name, epoch, frame, times ):
+    '''
+    Computes the read-only states of a planet at times (shape: [steps])
+    '''
+    if name == pd.sun[ 'name' ]:
+        states = np.zeros( ( times.shape[ 0 ], 6 ) )
+        states.setflags( write = False )
+        return states
+
+    centuries = ( oc.julian_date( epoch ) - 2451545.0 + times / 86400.0 ) / 36525.0
+    a, e, incl, L, varpi, raan = mean_elements( name, centuries ).T
+
+    # Mean anomaly, wrapped to [ -180, 180 ) deg, and true anomaly
+    M  = np.mod( L - varpi + 180.0, 360.0 ) - 180.0
+    ta = oc.true_anomaly_from_mean( M * oc.d2r, e ) * oc.r2d
+
+    coes   = np.stack( ( a, e, incl, raan, varpi - raan, ta ), axis = 1 )
+    states = oc.sv_from_coes( coes, pd.sun[ 'mu' ] )
+
+    if frame == 'equatorial':
+        R = nt.R1( -OBLIQUITY, deg = True )
+        states[ :, :3 ] = states[ :, :3 ] @ R.T
+        states[ :, 3: ] = states[ :, 3: ] @ R.T
+
+    states.setflags( write = False )
+
+    return states
+
+def clear_cache():
+    _cache[ 'entries' ].clear()
+    _cache[ 'bytes' ] = 0
+
+def analytic_ephemeris( body, times, args = {} ):
+    '''
+    Returns heliocentric states of a planet (shape: [steps, 6], km, km/s).
+
+    Parameters:
+    - body : planetary_data dictionary (planets, Pluto or the Sun)
+    - times: Seconds past args[ 'epoch' ] (shape: [steps] or scalar)
+    - args : { 'epoch' : ISO UTC epoch of t = 0 (default J2000),
+               'frame' : 'ecliptic' or 'equatorial' (J2000) }
+
+    The returned array is read-only, since it may be shared by the cache.
+    '''
+    _args = {
+        'epoch' : J2000,
+        'frame' : 'ecliptic'
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    times = np.atleast_1d( np.asarray( times, dtype = np.float64 ) )
+
+    # Keyed on a digest of the times, so keys stay small for long grids
+    digest  = hashlib.sha1( np.ascontiguousarray( times ).tobytes() ).hexdigest()
+    key     = ( body[ 'name' ], _args[ 'epoch' ], _args[ 'frame' ], times.shape[ 0 ], digest )
+    entries = _cache[ 'entries' ]
+
+    if key in entries:
+        entries.move_to_end( key )
+        return entries[ key ]
+
+    states = _states( body[ 'name' ], _args[ 'epoch' ], _args[ 'frame' ], times )
+
+    # Least recently used entries are evicted once the cache exceeds
+    # CACHE_BYTES; results larger than that are not cached
+    if states.nbytes <= CACHE_BYTES:
+        entries[ key ]     = states
+        _cache[ 'bytes' ] += states.nbytes
+
+        while _cache[ 'bytes' ] > CACHE_BYTES:
+            _cache[ 'bytes' ] -= entries.popitem( last = False )[ 1 ].nbytes
+
+    return states
+
+def fit_chebyshev( body, t0, t1, args = {} ):
+    '''
+    Returns a numerical_tools.ChebyshevSeries of the analytic ephemeris of
+    body over [ t0, t1 ] seconds past args[ 'epoch' ].
+
+    args: analytic_ephemeris arguments, plus 'interval' (s) and 'degree'
+    of the piecewise fit (default: 8 days, degree 12)
+    '''
+    _args = {
+        'interval' : 8 * 86400.0,
+        'degree'   : 12
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    ephem_args = { key : _args[ key ] for key in ( 'epoch', 'frame' ) if key in _args }
+
+    return nt.ChebyshevSeries.fit(
+        lambda times: np.array( analytic_ephemeris( body, times, ephem_args ) ),
+        t0, t1, _args )
+
+def chebyshev_ephemeris( bodies, t0, t1, args = {} ):
+    '''
+    Fits every body over [ t0, t1 ] and returns an ephemeris function
+    ephemeris( body, times, args ) with the same signature as
+    analytic_ephemeris, e.g. for patched_conics.propagate (which
+    expects args[ 'frame' ] = 'equatorial'). The frame is fixed by the
+    fit, so the args of the returned function are ignored.
+    '''
+    series = { body[ 'name' ] : fit_chebyshev( body, t0, t1, args )
+               for body in bodies if body[ 'name' ] != pd.sun[ 'name' ] }
+
+    def ephemeris( body, times, args = {} ):
+        times = np.atleast_1d( np.asarray( times, dtype = float ) )
+
+        if body[ 'name' ] == pd.sun[ 'name' ]:
+            return np.zeros( ( times.shape[ 0 ], 6 ) )
+
+        return series[ body[ 'name' ] ]( times )
+
+    return ephemeris
@@ -0,0 +1,183 @@
+'''
+Mean Element Propagation
+
+Semi-analytic long-term propagation of mean classical orbital elements
+under the secular effect of J2, plus the first-order Brouwer-Lyddane
+short-period map between osculating and mean elements
+(Schaub & Junkins, Analytical Mechanics of Space Systems, Appendix F).
+
+Elements use the same format as sv_from_coe / coe_from_sv:
+[ sma, ecc, incl, raan, aop, ta ], angles in degrees unless deg = False.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data as pd
+import orbit_calcs    as oc
+
+
+def secular_J2_rates( coes, cb = pd.earth, deg = True ):
+    '''
+    Returns the secular rates of RAAN, argument of periapsis and mean
+    anomaly (rad/s) due to J2 for mean elements coes (shape: [..., 6])
+    '''
+    coes = np.asarray( coes, dtype = float )
+    sma  = coes[ ..., 0 ]
+    ecc  = coes[ ..., 1 ]
+    incl = coes[ ..., 2 ] * oc.d2r if deg else coes[ ..., 2 ]
+
+    n    = np.sqrt( cb[ 'mu' ] / sma**3 )
+    p    = sma * ( 1 - ecc**2 )
+    eta  = np.sqrt( 1 - ecc**2 )
+    k    = n * cb[ 'J2' ] * ( cb[ 'radius' ] / p )**2
+    cosi = np.cos( incl )
+
+    raan_dot = -1.5  * k * cosi
+    aop_dot  =  0.75 * k * ( 5 * cosi**2 - 1 )
+    M_dot    =  n + 0.75 * k * eta * ( 3 * cosi**2 - 1 )
+
+    return raan_dot, aop_dot, M_dot
+
+def propagate_mean_elements( coes, times, cb = pd.earth, deg = True ):
+    '''
+    Evaluates the secular J2 evolution of mean elements in closed form.
+
+    Parameters:
+    - coes : Mean elements at t = 0 (shape: [N, 6] or [6])
+    - times: Times since epoch in seconds (shape: [steps])
+
+    Returns:
+    - Mean elements at each time (shape: [N, steps, 6], or [steps, 6]
+      for a single orbit)
+    '''
+    coes   = np.asarray( coes, dtype = float )
+    single = coes.ndim == 1
+    coes   = np.atleast_2d( coes )
+    times  = np.asarray( times, dtype = float )
+    angle  = oc.d2r if deg else 1.0
+
+    raan_dot, aop_dot, M_dot = secular_J2_rates( coes, cb, deg )
+
+    ecc = coes[ :, 1 ]
+    M0  = oc.mean_anomaly_from_true( coes[ :, 5 ] * angle, ecc )
+
+    out = np.empty( ( coes.shape[ 0 ], times.shape[ 0 ], 6 ) )
+    out[ :, :, :3 ] = coes[ :, None, :3 ]
+
+    out[ :, :, 3 ] = coes[ :, 3, None ] + raan_dot[ :, None ] * times / angle
+    out[ :, :, 4 ] = coes[ :, 4, None ] + aop_dot[  :, None ] * times / angle
+
+    M = M0[ :, None ] + M_dot[ :, None ] * times
+    out[ :, :, 5 ] = oc.true_anomaly_from_mean( M, ecc[ :, None ] ) / angle
+
+    # Wrap angles into [0, 360) deg / [0, 2 pi)
+    out[ :, :, 3: ] = np.mod( out[ :, :, 3: ], 2 * np.pi / angle )
+
+    return out[ 0 ] if single else out
+
+def _brouwer_lyddane_map( coes, gamma2, deg ):
+    '''
+    First-order J2 short-period map. gamma2 = J2 / 2 (R / a)^2 maps mean to
+    osculating elements; -gamma2 maps osculating to mean elements.
+    '''
+    angle = oc.d2r if deg else 1.0
+
+    a     = coes[ ..., 0 ]
+    e     = coes[ ..., 1 ]
+    i     = coes[ ..., 2 ] * angle
+    Omega = coes[ ..., 3 ] * angle
+    w     = coes[ ..., 4 ] * angle
+    f     = coes[ ..., 5 ] * angle
+    M     = oc.mean_anomaly_from_true( f, e )
+
+    eta  = np.sqrt( 1 - e**2 )
+    g2p  = gamma2 / eta**4
+    ci   = np.cos( i )
+    ci2  = ci**2
+    si   = np.sqrt( 1 - ci2 )
+    ar   = ( 1 + e * np.cos( f ) ) / eta**2
+    crit = 1 - 5 * ci2
+    cf   = np.cos( f )
+
+    # Angle combinations appearing throughout the map
+    c2w2f = np.cos( 2 * w + 2 * f )
+    s2w2f = np.sin( 2 * w + 2 * f )
+    c2wf  = np.cos( 2 * w + f )
+    s2wf  = np.sin( 2 * w + f )
+    c2w3f = np.cos( 2 * w + 3 * f )
+    s2w3f = np.sin( 2 * w + 3 * f )
+    f_M   = f - M + e * np.sin( f )
+
+    a_p = a + a * gamma2 * ( ( 3 * ci2 - 1 ) * ( ar**3 - 1 / eta**3 ) +
+        3 * ( 1 - ci2 ) * ar**3 * c2w2f )
+
+    de1 = g2p / 8 * e * eta**2 * ( 1 - 11 * ci2 - 40 * ci2**2 / crit ) * np.cos( 2 * w )
+
+    de = de1 + eta**2 / 2 * (
+        gamma2 * ( ( 3 * ci2 - 1 ) / eta**6 *
+            ( e * eta + e / ( 1 + eta ) + 3 * cf + 3 * e * cf**2 + e**2 * cf**3 ) +
+            3 * ( 1 - ci2 ) / eta**6 * ( e + 3 * cf + 3 * e * cf**2 + e**2 * cf**3 ) * c2w2f ) -
+        g2p * ( 1 - ci2 ) * ( 3 * c2wf + c2w3f ) )
+
+    di = -e * de1 / eta**2 / np.tan( i ) + \
+        g2p / 2 * ci * si * ( 3 * c2w2f + 3 * e * c2wf + e * c2w3f )
+
+    MwOmega = M + w + Omega + g2p / 8 * eta**3 * ( 1 - 11 * ci2 - 40 * ci2**2 / crit ) - \
+        g2p / 16 * ( 2 + e**2 - 11 * ( 2 + 3 * e**2 ) * ci2 -
+            40 * ( 2 + 5 * e**2 ) * ci2**2 / crit - 400 * e**2 * ci2**3 / crit**2 ) + \
+        g2p / 4 * ( -6 * crit * f_M +
+            ( 3 - 5 * ci2 ) * ( 3 * s2w2f + 3 * e * s2wf + e * s2w3f ) ) - \
+        g2p / 8 * e**2 * ci * ( 11 + 80 * ci2 / crit + 200 * ci2**2 / crit**2 ) - \
+        g2p / 2 * ci * ( 6 * f_M - 3 * s2w2f - 3 * e * s2wf - e * s2w3f )
+
+    edM = g2p / 8 * e * eta**3 * ( 1 - 11 * ci2 - 40 * ci2**2 / crit ) - \
+        g2p / 4 * eta**3 * ( 2 * ( 3 * ci2 - 1 ) * ( ar**2 * eta**2 + ar + 1 ) * np.sin( f ) +
+            3 * ( 1 - ci2 ) * ( ( -ar**2 * eta**2 - ar + 1 ) * s2wf +
+                ( ar**2 * eta**2 + ar + 1 / 3 ) * s2w3f ) )
+
+    dOmega = -g2p / 8 * e**2 * ci * ( 11 + 80 * ci2 / crit + 200 * ci2**2 / crit**2 ) - \
+        g2p / 2 * ci * ( 6 * f_M - 3 * s2w2f - 3 * e * s2wf - e * s2w3f )
+
+    # Recombine without dividing by small eccentricities / inclinations
+    d1  = ( e + de ) * np.sin( M ) + edM * np.cos( M )
+    d2  = ( e + de ) * np.cos( M ) - edM * np.sin( M )
+    M_p = np.arctan2( d1, d2 )
+    e_p = np.sqrt( d1**2 + d2**2 )
+
+    si2 = np.sin( i / 2 )
+    d3  = ( si2 + np.cos( i / 2 ) * di / 2 ) * np.sin( Omega ) + si2 * dOmega * np.cos( Omega )
+    d4  = ( si2 + np.cos( i / 2 ) * di / 2 ) * np.cos( Omega ) - si2 * dOmega * np.sin( Omega )
+    Omega_p = np.arctan2( d3, d4 )
+    i_p     = 2 * np.arcsin( np.clip( np.sqrt( d3**2 + d4**2 ), 0.0, 1.0 ) )
+    w_p     = MwOmega - M_p - Omega_p
+
+    f_p = oc.true_anomaly_from_mean( M_p, e_p )
+
+    out = np.stack( ( a_p, e_p, i_p, Omega_p, w_p, f_p ), axis = -1 )
+    out[ ..., 2: ] = np.mod( out[ ..., 2: ], 2 * np.pi ) / angle
+
+    return out
+
+def mean_to_osculating( coes, cb = pd.earth, deg = True ):
+    '''
+    Converts mean elements to osculating elements (shape: [..., 6]).
+
+    Note: the map is singular at the critical inclination (63.4 deg).
+    '''
+    coes   = np.asarray( coes, dtype = float )
+    gamma2 = cb[ 'J2' ] / 2 * ( cb[ 'radius' ] / coes[ ..., 0 ] )**2
+
+    return _brouwer_lyddane_map( coes, gamma2, deg )
+
+def osculating_to_mean( coes, cb = pd.earth, deg = True ):
+    '''
+    Converts osculating elements to mean elements (shape: [..., 6]).
+
+    Note: the map is singular at the critical inclination (63.4 deg).
+    '''
+    coes   = np.asarray( coes, dtype = float )
+    gamma2 = cb[ 'J2' ] / 2 * ( cb[ 'radius' ] / coes[ ..., 0 ] )**2
+
+    return _brouwer_lyddane_map( coes, -gamma2, deg )
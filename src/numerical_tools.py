@@ -49,4 +49,246 @@ def norm( vec ):
         '''
         Returns norm of input vector
         '''
-        return np.linalg.norm( vec )
\ No newline at end of file
+        return np.linalg.norm( vec )
+
+
+class ChebyshevSeries:
+        '''
+        Piecewise Chebyshev approximation of a vector function of time on
+        equal-length intervals. Evaluation locates the interval directly,
+        so lookups cost the same anywhere in the span.
+        '''
+
+        def __init__( self, t0, interval, coeffs ):
+                '''
+                coeffs: Coefficients (shape: [n_intervals, degree + 1, n_out])
+                '''
+                self.t0       = t0
+                self.interval = interval
+                self.coeffs   = np.asarray( coeffs )
+                self.t1       = t0 + interval * self.coeffs.shape[ 0 ]
+
+        @classmethod
+        def fit( cls, func, t0, t1, args = {} ):
+                '''
+                Interpolates func( times ) -> [ steps, n_out ] at the
+                Chebyshev nodes of every interval, with a single call to func
+                '''
+                _args = {
+                        'interval' : ( t1 - t0 ) / 8,
+                        'degree'   : 12
+                }
+
+                for key in args.keys():
+                        _args[ key ] = args[ key ]
+
+                n_int    = max( 1, int( np.ceil( ( t1 - t0 ) / _args[ 'interval' ] - 1e-9 ) ) )
+                interval = ( t1 - t0 ) / n_int
+                N        = _args[ 'degree' ] + 1
+
+                # Chebyshev-Gauss nodes on [ -1, 1 ]
+                theta = np.pi * ( np.arange( N ) + 0.5 ) / N
+                x     = np.cos( theta )
+                times = t0 + interval * ( np.arange( n_int )[ :, None ] + ( x[ None, : ] + 1 ) / 2 )
+
+                values = np.asarray( func( times.ravel() ) ).reshape( n_int, N, -1 )
+
+                # Discrete Chebyshev transform of each interval
+                T      = np.cos( np.outer( np.arange( N ), theta ) ) * 2 / N
+                T[ 0 ] /= 2
+                coeffs = np.einsum( 'jk,ikn->ijn', T, values )
+
+                return cls( t0, interval, coeffs )
+
+        def __call__( self, times ):
+                '''
+                Evaluates the series (shape: [steps, n_out])
+                '''
+                times = np.atleast_1d( np.asarray( times, dtype = float ) )
+                index = np.clip( ( ( times - self.t0 ) // self.interval ).astype( int ),
+                                 0, self.coeffs.shape[ 0 ] - 1 )
+                tau   = ( 2 * ( times - self.t0 - index * self.interval ) / self.interval - 1 )[ :, None ]
+                c     = self.coeffs[ index ]
+
+                # Clenshaw recurrence
+                b1 = np.zeros( c[ :, 0 ].shape )
+                b2 = np.zeros( c[ :, 0 ].shape )
+
+                for k in range( c.shape[ 1 ] - 1, 0, -1 ):
+                        b1, b2 = c[ :, k ] + 2 * tau * b1 - b2, b1
+
+                return c[ :, 0 ] + tau * b1 - b2
+
+# Substep weights of symmetric compositions of the kick-drift-kick leapfrog
+# (H. Yoshida, "Construction of higher order symplectic integrators",
+# Phys. Lett. A 150, 1990; 6th order: solution A)
+_Y4 = 1 / ( 2 - 2**( 1 / 3 ) )
+_Y6 = [ 0.784513610477560, 0.235573213359357, -1.17767998417887 ]
+
+SYMPLECTIC_WEIGHTS = {
+        'leapfrog' : [ 1.0 ],
+        'yoshida4' : [ _Y4, 1 - 2 * _Y4, _Y4 ],
+        'yoshida6' : _Y6 + [ 1 - 2 * sum( _Y6 ) ] + _Y6[ ::-1 ]
+}
+
+def symplectic_coefficients( method ):
+        '''
+        Returns the ( kick, drift ) coefficients of one step of a composed
+        leapfrog. Adjacent half kicks are merged, so a step costs one
+        acceleration evaluation per substep when the last one is reused.
+        '''
+        if method not in SYMPLECTIC_WEIGHTS:
+                raise ValueError( 'Unknown symplectic method: %s' % method )
+
+        w     = np.asarray( SYMPLECTIC_WEIGHTS[ method ] )
+        kicks = np.concatenate( ( [ 0.0 ], w ) ) / 2
+        kicks[ :-1 ] += w / 2
+
+        return kicks, w
+
+def symplectic_step( accel, r, v, a, h, kicks, drifts ):
+        '''
+        Advances positions r and velocities v (shape: [..., 3]) in place by h,
+        given the acceleration a at r. Returns the acceleration at the new r.
+        '''
+        v += kicks[ 0 ] * h * a
+
+        for c, d in zip( kicks[ 1: ], drifts ):
+                r += d * h * v
+                a  = accel( r )
+                v += c * h * a
+
+        return a
+
+def symplectic_integrate( accel, r0, v0, times, dt, args = {} ):
+        '''
+        Fixed-step symplectic integration of r'' = accel( r ).
+
+        Parameters:
+        - accel : Acceleration function of positions (shape: [..., 3])
+        - r0, v0: Initial positions and velocities at t = 0 (shape: [..., 3],
+                  leading dimensions integrate a batch together)
+        - times : Increasing output times >= 0 (shape: [steps])
+        - dt    : Step size
+        - args  : { 'method' : 'leapfrog', 'yoshida4' or 'yoshida6',
+                    'out'    : preallocated output (shape: [steps, ..., 6]) }
+
+        The trajectory follows the fixed grid k * dt; outputs between grid
+        points are reached with one shortened step from the preceding grid
+        state, which leaves the grid trajectory (and its bounded energy
+        error) untouched.
+        '''
+        _args = {
+                'method' : 'yoshida4',
+                'out'    : None
+        }
+
+        for key in args.keys():
+                _args[ key ] = args[ key ]
+
+        kicks, drifts = symplectic_coefficients( _args[ 'method' ] )
+
+        r     = np.array( r0, dtype = float )
+        v     = np.array( v0, dtype = float )
+        times = np.asarray( times, dtype = float )
+        out   = _args[ 'out' ]
+
+        if out is None:
+                out = np.empty( ( times.shape[ 0 ], ) + r.shape[ :-1 ] + ( 6, ) )
+
+        a    = accel( r )
+        k    = 0
+        tol  = 1e-9 * dt
+
+        for index, t in enumerate( times ):
+                while ( k + 1 ) * dt <= t + tol:
+                        a  = symplectic_step( accel, r, v, a, dt, kicks, drifts )
+                        k += 1
+
+                h = t - k * dt
+
+                if h > tol:
+                        r_out, v_out = r.copy(), v.copy()
+                        symplectic_step( accel, r_out, v_out, a, h, kicks, drifts )
+                else:
+                        r_out, v_out = r, v
+
+                out[ index, ..., :3 ] = r_out
+                out[ index, ..., 3: ] = v_out
+
+        return out
+
+def chebyshev_picard( fun, t0, t1, y0, guess = None, args = {} ):
+        '''
+        Modified Chebyshev-Picard iteration of y' = fun( times, ys ) on
+        [ t0, t1 ] (X. Bai, J. L. Junkins, "Modified Chebyshev-Picard
+        Iteration Methods for Orbit Propagation", J. Astronaut. Sci. 58, 2011).
+
+        Every iteration evaluates fun once, at all Chebyshev-Gauss-Lobatto
+        nodes together, then integrates the Chebyshev fit of the rates.
+
+        Parameters:
+        - fun  : Vectorized rates, fun( times [nodes], ys [nodes, n] ) -> [nodes, n]
+        - y0   : Value at t0 (shape: [n])
+        - guess: Function of times returning the initial guess at the
+                 nodes (default: constant y0)
+        - args : { 'degree'   : degree of the rates fit,
+                   'tol'      : convergence tolerance on the node values,
+                               relative to each component's magnitude,
+                   'max_iter' : maximum number of iterations }
+
+        Returns ( coeffs, iterations, converged ), where coeffs are the
+        Chebyshev coefficients of y on [ t0, t1 ] (shape: [degree + 2, n]),
+        in the form used by ChebyshevSeries.
+        '''
+        _args = {
+                'degree'   : 32,
+                'tol'      : 1e-13,
+                'max_iter' : 100
+        }
+
+        for key in args.keys():
+                _args[ key ] = args[ key ]
+
+        N  = _args[ 'degree' ]
+        y0 = np.asarray( y0, dtype = float )
+
+        # Nodes tau_j = cos( pi j / N ), so T_k( tau_j ) = cos( pi k j / N )
+        phase = np.pi * np.arange( N + 2 )[ :, None ] * np.arange( N + 1 )[ None, : ] / N
+        tau   = np.cos( np.pi * np.arange( N + 1 ) / N )
+        times = t0 + ( t1 - t0 ) * ( tau + 1 ) / 2
+
+        # Discrete Chebyshev transform of node values (end nodes and the
+        # first and last coefficients carry half weight)
+        C = 2.0 / N * np.cos( phase[ :N + 1 ] )
+        C[ :, [ 0, N ] ] /= 2
+        C[ [ 0, N ] ]    /= 2
+
+        # Integral of a Chebyshev series: b_k = ( c_{k-1} - c_{k+1} ) / 2k
+        I = np.zeros( ( N + 2, N + 1 ) )
+        for k in range( 1, N + 2 ):
+                I[ k, k - 1 ] = 1.0 / ( 2 * k ) if k > 1 else 1.0
+                if k + 1 <= N:
+                        I[ k, k + 1 ] = -1.0 / ( 2 * k )
+
+        # Rates per unit tau, fit, integration and evaluation in one matrix;
+        # the constant term is then fixed by y( -1 ) = y0
+        I    = ( t1 - t0 ) / 2 * I @ C
+        E    = np.cos( phase ).T
+        sign = ( -1.0 ) ** np.arange( N + 2 )
+
+        ys = np.tile( y0, ( N + 1, 1 ) ) if guess is None else np.asarray( guess( times ), dtype = float )
+
+        for iteration in range( 1, _args[ 'max_iter' ] + 1 ):
+                coeffs      = I @ fun( times, ys )
+                coeffs[ 0 ] = y0 - sign[ 1: ] @ coeffs[ 1: ]
+                ys_new      = E @ coeffs
+
+                scale = np.maximum( np.abs( ys_new ).max( axis = 0 ), 1e-300 )
+                error = ( np.abs( ys_new - ys ) / scale ).max()
+                ys    = ys_new
+
+                if error < _args[ 'tol' ]:
+                        return coeffs, iteration, True
+
+        return coeffs, _args[ 'max_iter' ], False
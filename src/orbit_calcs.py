@@ -3,12 +3,19 @@ Trajectory Calculation Tools
 '''
 
 # Python Standard Libraries
-
+from datetime  import datetime, timezone
+from functools import lru_cache
+import math
 
 # Third-party Libraries
-from astropy.time import Time
 import numpy as np
 
+# astropy is only needed for high-precision sidereal time
+try:
+    from astropy.time import Time, TimeDelta
+except ImportError:
+    Time = TimeDelta = None
+
 # Orbital-Mechanics Libraries
 import numerical_tools as nt
 from numerical_tools import norm
@@ -51,6 +58,44 @@ def sv_from_coe( coe, mu, deg = True ):
 
     return sv
 
+def sv_from_coes( coes, mu, deg = True ):
+    '''
+    Returns state vectors for many sets of classical orbital elements at once
+
+    Parameters:
+    - coes: [ sma, ecc, incl, raan, aop, ta ] rows (shape: [N, 6])
+
+    Returns:
+    - states: State vectors (shape: [N, 6])
+    '''
+    coes = np.atleast_2d( np.asarray( coes, dtype = float ) )
+    sma, ecc, incl, raan, aop, ta = coes.T
+
+    if deg:
+        incl, raan, aop, ta = incl * d2r, raan * d2r, aop * d2r, ta * d2r
+
+    p    = sma * ( 1 - ecc**2 )
+    rmag = p / ( 1 + ecc * np.cos( ta ) )
+    vmag = np.sqrt( mu / p )
+
+    # Perifocal position and velocity components
+    r_p = np.stack( ( rmag * np.cos( ta ), rmag * np.sin( ta ) ), axis = 1 )
+    v_p = np.stack( ( -vmag * np.sin( ta ), vmag * ( ecc + np.cos( ta ) ) ), axis = 1 )
+
+    # First two columns of the perifocal to inertial rotation
+    cO, sO = np.cos( raan ), np.sin( raan )
+    cw, sw = np.cos( aop ),  np.sin( aop )
+    ci, si = np.cos( incl ), np.sin( incl )
+
+    P = np.stack( ( cO * cw - sO * sw * ci, sO * cw + cO * sw * ci, sw * si ), axis = 1 )
+    Q = np.stack( ( -cO * sw - sO * cw * ci, -sO * sw + cO * cw * ci, cw * si ), axis = 1 )
+
+    states = np.empty( ( coes.shape[ 0 ], 6 ) )
+    states[ :, :3 ] = r_p[ :, :1 ] * P + r_p[ :, 1: ] * Q
+    states[ :, 3: ] = v_p[ :, :1 ] * P + v_p[ :, 1: ] * Q
+
+    return states
+
 def coe_from_sv( state, args = {} ):
     '''
     Returns the classical orbital elements when provided the state vector 
@@ -168,49 +213,381 @@ def period_from_sv( state, mu ):
 
     return 2 * np.pi * ( a** 3 / mu ) ** ( 0.5 )
 
-def cart2lat( r_ECI, times, reference_time = '2000-01-01T00:00:00' ):
+def ecc_anomaly_from_mean( M, e, args = {} ):
     '''
-    Converts Cartesian coordinates in ECI frame to lat and long coordinates
-    in the ECEF frame.
-    
+    Solves Kepler's equation M = E - e sin(E) for the eccentric anomaly
+    (radians), element-wise on arrays
+    '''
+    _args = {
+        'tol'      : 1e-12,
+        'max_iter' : 50
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    M = np.asarray( M, dtype = float )
+    e = np.asarray( e, dtype = float )
+
+    # Solve on [0, 2 pi) and restore whole revolutions afterwards
+    M_wrap = np.mod( M, 2 * np.pi )
+    E      = np.where( e < 0.8, M_wrap, np.pi )
+
+    for _ in range( _args[ 'max_iter' ] ):
+        step = ( E - e * np.sin( E ) - M_wrap ) / ( 1 - e * np.cos( E ) )
+        E    = E - step
+
+        if np.all( np.abs( step ) < _args[ 'tol' ] ):
+            break
+
+    return E + ( M - M_wrap )
+
+def true_anomaly_from_ecc( E, e ):
+    '''
+    Returns the true anomaly (radians) from the eccentric anomaly
+    '''
+    return 2 * np.arctan2( np.sqrt( 1 + e ) * np.sin( E / 2 ),
+                           np.sqrt( 1 - e ) * np.cos( E / 2 ) )
+
+def ecc_anomaly_from_true( ta, e ):
+    '''
+    Returns the eccentric anomaly (radians) from the true anomaly
+    '''
+    return 2 * np.arctan2( np.sqrt( 1 - e ) * np.sin( ta / 2 ),
+                           np.sqrt( 1 + e ) * np.cos( ta / 2 ) )
+
+def mean_anomaly_from_true( ta, e ):
+    '''
+    Returns the mean anomaly (radians) from the true anomaly
+    '''
+    E = ecc_anomaly_from_true( ta, e )
+    return E - e * np.sin( E )
+
+def true_anomaly_from_mean( M, e ):
+    '''
+    Returns the true anomaly (radians) from the mean anomaly
+    '''
+    return true_anomaly_from_ecc( ecc_anomaly_from_mean( M, e ), e )
+
+def specific_energy( states, mu ):
+    '''
+    Returns the specific mechanical energy of one or many state vectors
+    '''
+    states = np.asarray( states )
+    return np.sum( states[ ..., 3:6 ]**2, axis = -1 ) / 2 - \
+            mu / np.linalg.norm( states[ ..., :3 ], axis = -1 )
+
+def stumpff_C( z ):
+    '''
+    Returns the Stumpff function C(z), evaluated element-wise on arrays
+    '''
+    # Scalar fast path, used inside right-hand side functions
+    if np.ndim( z ) == 0:
+        z = float( z )
+        if z > 1e-6:
+            sz = math.sqrt( z )
+            return ( 1 - math.cos( sz ) ) / z
+        elif z < -1e-6:
+            sz = math.sqrt( -z )
+            return ( math.cosh( sz ) - 1 ) / -z
+        return 1 / 2 - z / 24 + z**2 / 720
+
+    z     = np.asarray( z, dtype = float )
+    C     = np.empty_like( z )
+    pos   = z >  1e-6
+    neg   = z < -1e-6
+    small = ~( pos | neg )
+
+    sz         = np.sqrt( z[ pos ] )
+    C[ pos ]   = ( 1 - np.cos( sz ) ) / z[ pos ]
+    sz         = np.sqrt( -z[ neg ] )
+    C[ neg ]   = ( np.cosh( sz ) - 1 ) / -z[ neg ]
+    C[ small ] = 1 / 2 - z[ small ] / 24 + z[ small ]**2 / 720
+
+    return C
+
+def stumpff_S( z ):
+    '''
+    Returns the Stumpff function S(z), evaluated element-wise on arrays
+    '''
+    # Scalar fast path, used inside right-hand side functions
+    if np.ndim( z ) == 0:
+        z = float( z )
+        if z > 1e-6:
+            sz = math.sqrt( z )
+            return ( sz - math.sin( sz ) ) / sz**3
+        elif z < -1e-6:
+            sz = math.sqrt( -z )
+            return ( math.sinh( sz ) - sz ) / sz**3
+        return 1 / 6 - z / 120 + z**2 / 5040
+
+    z     = np.asarray( z, dtype = float )
+    S     = np.empty_like( z )
+    pos   = z >  1e-6
+    neg   = z < -1e-6
+    small = ~( pos | neg )
+
+    sz         = np.sqrt( z[ pos ] )
+    S[ pos ]   = ( sz - np.sin( sz ) ) / sz**3
+    sz         = np.sqrt( -z[ neg ] )
+    S[ neg ]   = ( np.sinh( sz ) - sz ) / sz**3
+    S[ small ] = 1 / 6 - z[ small ] / 120 + z[ small ]**2 / 5040
+
+    return S
+
+def kepler_universal( state0, dts, mu, args = {} ):
+    '''
+    Propagates a two-body state by the times dts using the universal
+    variable formulation of Kepler's equation (Curtis Algorithm 3.4).
+
     Parameters:
-    - r_ECI: Array of Cartesian coordinates in the ECI frame (shape: [steps, 3]).
-    - times: Array of times corresponding to the Cartesian coordinates (shape: [steps]).
+    - state0: Initial state vector (shape: [6])
+    - dts   : Times since state0 in seconds (shape: [steps] or scalar)
+    - mu    : Gravitational parameter of the central body
 
     Returns:
-    - latlons: Array of latitude and longitude coordinates in the ECEF frame (shape: [steps, 2]).
+    - states: Propagated state vectors (shape: [steps, 6])
     '''
-    steps   = r_ECI.shape[ 0 ]
-    latlons = np.zeros( (steps, 2) )
+    _args = {
+        'tol'      : 1e-12,
+        'max_iter' : 50
+    }
 
-    # Ensure the reference time is a valid ISO format string
-    reference_time = reference_time.strip()
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    # Scalar times skip the array machinery, which dominates for single calls
+    if np.ndim( dts ) == 0:
+        dts = float( dts )
+    else:
+        dts = np.asarray( dts, dtype = float )
+
+    r0  = np.asarray( state0[ :3 ], dtype = float )
+    v0  = np.asarray( state0[ 3:6 ], dtype = float )
+    r0n = norm( r0 )
+    vr0 = np.dot( r0, v0 ) / r0n
+
+    sqrt_mu = np.sqrt( mu )
+    alpha   = 2 / r0n - np.dot( v0, v0 ) / mu
+
+    # Newton iterations on the universal anomaly, all times at once
+    chi = sqrt_mu * abs( alpha ) * dts
+
+    # Far along a hyperbola that guess overflows the Stumpff functions;
+    # start from the asymptotic guess instead (Vallado Algorithm 8)
+    if alpha < 0:
+        a    = 1 / alpha
+        sign = np.sign( dts )
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            chi_h = sign * np.sqrt( -a ) * np.log( -2 * mu * alpha * dts /
+                ( np.dot( r0, v0 ) + sign * np.sqrt( -mu * a ) * ( 1 - r0n * alpha ) ) )
+        chi = np.where( np.isfinite( chi_h ) & ( chi_h * dts > 0 ), chi_h, chi )
+        if np.ndim( dts ) == 0:
+            chi = float( chi )
+
+    for _ in range( _args[ 'max_iter' ] ):
+        z  = alpha * chi**2
+        C  = stumpff_C( z )
+        S  = stumpff_S( z )
+        F  = r0n * vr0 / sqrt_mu * chi**2 * C + ( 1 - alpha * r0n ) * chi**3 * S + \
+                r0n * chi - sqrt_mu * dts
+        dF = r0n * vr0 / sqrt_mu * chi * ( 1 - z * S ) + \
+                ( 1 - alpha * r0n ) * chi**2 * C + r0n
+        step = F / dF
+        chi -= step
+
+        if np.all( np.abs( step ) < _args[ 'tol' ] ):
+            break
+
+    z = alpha * chi**2
+    C = stumpff_C( z )
+    S = stumpff_S( z )
+
+    # Lagrange coefficients
+    f  = 1 - chi**2 / r0n * C
+    g  = dts - chi**3 * S / sqrt_mu
+    rs = np.outer( f, r0 ) + np.outer( g, v0 )
+    rn = np.linalg.norm( rs, axis = 1 )
+
+    fdot = sqrt_mu / ( rn * r0n ) * ( alpha * chi**3 * S - chi )
+    gdot = 1 - chi**2 / rn * C
+    vs   = np.outer( fdot, r0 ) + np.outer( gdot, v0 )
+
+    return np.hstack( ( rs, vs ) )
+
+def kepler_fg( state0, mu, args = {} ):
+    '''
+    Returns a function dt -> state (shape: [6]) on the two-body orbit
+    through state0, for many scalar evaluations on one reference orbit
+    (e.g. every right-hand side call of the Encke formulation).
+
+    Elliptical orbits solve Kepler's equation for the change in eccentric
+    anomaly in scalar arithmetic, warm-started from the previous call, and
+    use the closed-form Lagrange coefficients f, g (Vallado Sec. 2.3).
+    Other orbits fall back to kepler_universal.
+    '''
+    _args = {
+        'tol'      : 1e-12,
+        'max_iter' : 50
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    rx, ry, rz, vx, vy, vz = ( float( value ) for value in state0[ :6 ] )
+    r0    = math.sqrt( rx * rx + ry * ry + rz * rz )
+    alpha = 2 / r0 - ( vx * vx + vy * vy + vz * vz ) / mu
+
+    if alpha <= 0:
+        return lambda dt: kepler_universal( state0, dt, mu, _args )[ 0 ]
+
+    a     = 1 / alpha
+    n     = math.sqrt( mu * alpha**3 )
+    esinE = ( rx * vx + ry * vy + rz * vz ) / math.sqrt( mu * a )
+    ecosE = 1 - r0 / a
+
+    # ( dt, dE, r / a ) of the previous call
+    last = [ 0.0, 0.0, r0 / a ]
+
+    def state( dt ):
+        M  = n * dt
+        dE = last[ 1 ] + n * ( dt - last[ 0 ] ) / last[ 2 ]
+
+        # Newton iterations on dE - e cos E0 sin dE + e sin E0 ( 1 - cos dE ) = n dt
+        for _ in range( _args[ 'max_iter' ] ):
+            s    = math.sin( dE )
+            c    = math.cos( dE )
+            step = ( dE - ecosE * s + esinE * ( 1 - c ) - M ) / ( 1 - ecosE * c + esinE * s )
+            dE  -= step
+
+            if abs( step ) < _args[ 'tol' ]:
+                break
+
+        s = math.sin( dE )
+        c = math.cos( dE )
+        r = a * ( 1 - ecosE * c + esinE * s )
+
+        last[ 0 ], last[ 1 ], last[ 2 ] = dt, dE, r / a
+
+        f    = 1 - a / r0 * ( 1 - c )
+        g    = dt - ( dE - s ) / n
+        fdot = -math.sqrt( mu * a ) * s / ( r * r0 )
+        gdot = 1 - a / r * ( 1 - c )
+
+        return np.array( [
+            f * rx + g * vx, f * ry + g * vy, f * rz + g * vz,
+            fdot * rx + gdot * vx, fdot * ry + gdot * vy, fdot * rz + gdot * vz ] )
+
+    return state
+
+@lru_cache( maxsize = 128 )
+def julian_date( epoch ):
+    '''
+    Returns the Julian date of an ISO format epoch string, cached per
+    epoch. Epochs without an offset are UTC (e.g. '2000-01-01T12:00:00');
+    others are converted (e.g. '2024-01-01T00:00:00+02:00' or a trailing 'Z').
+    '''
+    dt = datetime.fromisoformat( epoch.strip().replace( 'Z', '+00:00' ) )
+
+    if dt.tzinfo is not None:
+        dt = dt.astimezone( timezone.utc ).replace( tzinfo = None )
+
+    # Days from the J2000 epoch (2000-01-01T12:00:00, JD 2451545.0)
+    delta = dt - datetime( 2000, 1, 1, 12 )
 
-    # Convert reference time to astropy Time object
-    t_ref = Time( reference_time, format = 'isot', scale='utc' )
+    return 2451545.0 + delta.days + ( delta.seconds + delta.microseconds * 1e-6 ) / 86400.0
 
-    # Compute the initial GST
-    initial_gst = t_ref.sidereal_time( 'mean', 'greenwich' ).deg
+def _days_since_J2000( times, epoch ):
+    '''
+    Returns whole and fractional days since J2000 at times seconds past
+    epoch, kept apart to preserve precision over long spans
+    '''
+    jd0   = julian_date( epoch ) - 2451545.0
+    days  = np.asarray( times, dtype = float ) / 86400.0
+    whole = np.floor( jd0 ) + np.floor( days )
+    frac  = ( jd0 - np.floor( jd0 ) ) + ( days - np.floor( days ) )
+
+    return whole, frac
+
+def era( times, epoch = '2000-01-01T00:00:00' ):
+    '''
+    Returns the Earth Rotation Angle (radians, IAU 2000) at times seconds
+    past epoch, element-wise on arrays
+    '''
+    whole, frac = _days_since_J2000( times, epoch )
+    turns       = 0.7790572732640 + frac + 0.00273781191135448 * ( whole + frac )
+
+    return 2 * np.pi * np.mod( turns, 1.0 )
+
+def gmst( times, epoch = '2000-01-01T00:00:00', model = 'IAU1982' ):
+    '''
+    Returns the Greenwich Mean Sidereal Time (radians) at times seconds past
+    epoch, element-wise on arrays.
+
+    model:
+    - 'IAU1982': closed-form IAU 1982 expression (default)
+    - 'ERA'    : Earth Rotation Angle
+    - 'astropy': astropy sidereal time (high precision, requires astropy)
+    '''
+    times = np.asarray( times, dtype = float )
+
+    if model == 'ERA':
+        return era( times, epoch )
+
+    if model == 'astropy':
+        if Time is None:
+            raise ImportError( 'astropy is required for model = astropy' )
+        t = Time( epoch.strip(), format = 'isot', scale = 'utc' ) + \
+            TimeDelta( times, format = 'sec' )
+        return np.asarray( t.sidereal_time( 'mean', 'greenwich' ).rad )
+
+    whole, frac = _days_since_J2000( times, epoch )
+    T           = ( whole + frac ) / 36525.0
 
-    # Earth's rotation rate in degrees per second (approximately 360 deg/86400 sec)
-    omega_earth = 360 / 86164.0905 # Use the sidereal day for more accuracy
+    # Vallado Eq. 3-47 in seconds; the 876600 h/century term is whole
+    # turns plus the fraction of the current day
+    gmst_sec = 67310.54841 + 86400.0 * frac + \
+        8640184.812866 * T + 0.093104 * T**2 - 6.2e-6 * T**3
 
-    for step in range( steps ):
-        # Compute the rotation angle based on Earth's rotation rate
-        theta = omega_earth * times[ step ]
-        theta = theta % 360 # ensure the angle is within [0,360] deg
+    return 2 * np.pi * np.mod( gmst_sec / 86400.0, 1.0 )
 
-        # Get rotation matrix (rotation about the z-axis)
-        R = nt.R3( theta * d2r )
+def eci2ecef( r_ECI, times, epoch = '2000-01-01T00:00:00', model = 'IAU1982' ):
+    '''
+    Rotates ECI position vectors into the ECEF frame about the z-axis by the
+    sidereal angle (shape: [..., steps, 3], times shape: [steps])
+    '''
+    r_ECI = np.asarray( r_ECI )
+    theta = gmst( times, epoch, model )
+    cos_t = np.cos( theta )
+    sin_t = np.sin( theta )
+
+    r_ECEF = np.empty( r_ECI.shape )
+    r_ECEF[ ..., 0 ] =  cos_t * r_ECI[ ..., 0 ] + sin_t * r_ECI[ ..., 1 ]
+    r_ECEF[ ..., 1 ] = -sin_t * r_ECI[ ..., 0 ] + cos_t * r_ECI[ ..., 1 ]
+    r_ECEF[ ..., 2 ] =  r_ECI[ ..., 2 ]
+
+    return r_ECEF
 
-        # Perform coordinate transformation 
-        r_ECEF = R @ r_ECI[ step ]
+def cart2lat( r_ECI, times, reference_time = '2000-01-01T00:00:00', model = 'IAU1982' ):
+    '''
+    Converts Cartesian coordinates in ECI frame to lat and long coordinates
+    in the ECEF frame.
+    
+    Parameters:
+    - r_ECI: Array of Cartesian coordinates in the ECI frame (shape: [steps, 3]).
+    - times: Array of times corresponding to the Cartesian coordinates (shape: [steps]).
+    - reference_time: ISO format UTC epoch of times = 0.
+    - model: Sidereal time model passed to gmst.
 
-        # Calculate latitude and longitude coords in ECEF frame
-        latlons[ step ] =  ra_and_dec_from_r( r_ECEF, deg = True )
+    Returns:
+    - latlons: Array of longitude and latitude coordinates (degrees) in the
+      ECEF frame (shape: [steps, 2]).
+    '''
+    r_ECEF = eci2ecef( r_ECI, times, reference_time, model )
 
-        # Ensure the longitude is within -180 to 180 degrees
-        latlons[ step, 0 ] = ( ( latlons[ step, 0 ] + 180 ) % 360 ) - 180
+    latlons = np.empty( ( r_ECEF.shape[ 0 ], 2 ) )
+    latlons[ :, 0 ] = np.arctan2( r_ECEF[ :, 1 ], r_ECEF[ :, 0 ] ) * r2d
+    latlons[ :, 1 ] = np.arcsin( r_ECEF[ :, 2 ] / np.linalg.norm( r_ECEF, axis = 1 ) ) * r2d
 
     return latlons
 
@@ -252,6 +629,9 @@ def get_gst():
     '''
     Calculate Greenwhich Sidereal Time (GST) using astropy.
     '''
+    if Time is None:
+        raise ImportError( 'astropy is required for get_gst' )
+
     # Get the current time in UTC
     t = Time.now()
 
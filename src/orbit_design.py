@@ -0,0 +1,317 @@
+'''
+Orbit Design
+
+Repeat-groundtrack and sun-synchronous orbit (SSO) design from the
+secular J2 rates of mean elements.
+
+An orbit repeats its groundtrack after N_rev nodal revolutions in N_day
+nodal days when
+
+    N_rev * 2 pi / ( M_dot + aop_dot ) = N_day * 2 pi / ( w_cb - raan_dot )
+
+and is sun-synchronous when raan_dot equals the mean motion of the
+central body about the Sun. Both conditions are evaluated on dense
+( sma, ecc, incl ) grids at once, exact solutions are found for every
+repeat ratio in the searched ranges, and candidates are verified by short
+numerical propagations run in parallel with batch.propagate_batch.
+'''
+
+# Python Standard Libraries
+from math import gcd
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from Spacecraft import REFERENCE_TIME
+import planetary_data as pd
+import orbit_calcs    as oc
+import mean_elements  as me
+import batch
+
+
+def check_body( cb ):
+    '''
+    Raises a ValueError unless cb carries the planetary_data constants
+    of orbit design: J2, rotation_rate and orbital_period
+    '''
+    missing = [ key for key in ( 'J2', 'rotation_rate', 'orbital_period' ) if key not in cb ]
+
+    if missing:
+        raise ValueError( 'Orbit design requires %s of central body: %s' % (
+            ', '.join( missing ), cb[ 'name' ] ) )
+
+def body_fixed( r, times, cb = pd.earth, epoch = REFERENCE_TIME ):
+    '''
+    Rotates positions (shape: [N, 3]) at times (shape: [N]) into the
+    body-fixed frame: by GMST for the Earth, else by the sidereal
+    rotation since t = 0
+    '''
+    if cb[ 'name' ] == pd.earth[ 'name' ]:
+        return oc.eci2ecef( r, times, epoch )
+
+    theta = cb[ 'rotation_rate' ] * np.asarray( times )
+    cos_t = np.cos( theta )
+    sin_t = np.sin( theta )
+
+    r_fixed = np.array( r, dtype = float )
+    r_fixed[ :, 0 ] =  cos_t * r[ :, 0 ] + sin_t * r[ :, 1 ]
+    r_fixed[ :, 1 ] = -sin_t * r[ :, 0 ] + cos_t * r[ :, 1 ]
+
+    return r_fixed
+
+def sso_raan_rate( cb = pd.earth ):
+    '''
+    Returns the RAAN rate (rad/s) of a sun-synchronous orbit
+    '''
+    check_body( cb )
+
+    return 2 * np.pi / cb[ 'orbital_period' ]
+
+def sso_inclination( sma, ecc, cb = pd.earth ):
+    '''
+    Returns the sun-synchronous inclination (deg) of mean sma and ecc
+    (arrays broadcast together), NaN where no inclination exists
+    '''
+    sma = np.asarray( sma, dtype = float )
+    ecc = np.asarray( ecc, dtype = float )
+
+    n    = np.sqrt( cb[ 'mu' ] / sma**3 )
+    k    = n * cb[ 'J2' ] * ( cb[ 'radius' ] / ( sma * ( 1 - ecc**2 ) ) )**2
+    cosi = sso_raan_rate( cb ) / ( -1.5 * k )
+
+    with np.errstate( invalid = 'ignore' ):
+        return np.where( np.abs( cosi ) <= 1, np.arccos( np.clip( cosi, -1, 1 ) ) * oc.r2d, np.nan )
+
+def repeat_ratio( coes, cb = pd.earth ):
+    '''
+    Returns nodal revolutions per nodal day of mean elements
+    (shape: [..., 6], degrees)
+    '''
+    check_body( cb )
+
+    raan_dot, aop_dot, M_dot = me.secular_J2_rates( coes, cb )
+
+    return ( M_dot + aop_dot ) / ( cb[ 'rotation_rate' ] - raan_dot )
+
+def design_grid( smas, eccs, incls, cb = pd.earth ):
+    '''
+    Evaluates the design conditions on the grid smas x eccs x incls.
+
+    Returns a dictionary of arrays (shape: [n_sma, n_ecc, n_incl]):
+    - 'revs_per_day': nodal revolutions per nodal day
+    - 'raan_dot'    : secular RAAN rate (deg/day)
+    - 'sso_error'   : raan_dot minus the sun-synchronous rate (deg/day)
+    - 'perigee_alt' : perigee altitude (km)
+    '''
+    check_body( cb )
+
+    sma, ecc, incl = np.meshgrid( smas, eccs, incls, indexing = 'ij' )
+
+    coes = np.zeros( sma.shape + ( 6, ) )
+    coes[ ..., 0 ] = sma
+    coes[ ..., 1 ] = ecc
+    coes[ ..., 2 ] = incl
+
+    raan_dot, aop_dot, M_dot = me.secular_J2_rates( coes, cb )
+    day = 86400.0 * oc.r2d
+
+    return {
+        'revs_per_day' : ( M_dot + aop_dot ) / ( cb[ 'rotation_rate' ] - raan_dot ),
+        'raan_dot'     : raan_dot * day,
+        'sso_error'    : ( raan_dot - sso_raan_rate( cb ) ) * day,
+        'perigee_alt'  : sma * ( 1 - ecc ) - cb[ 'radius' ]
+    }
+
+def repeat_orbits( args = {} ):
+    '''
+    Finds every repeat-groundtrack orbit in the given ranges.
+
+    Parameters:
+    - args: { 'altitude_range'  : ( min, max ) mean sma altitude (km),
+              'eccs'            : eccentricities to search,
+              'incls'           : inclinations to search (deg), or 'sso'
+                                  for the sun-synchronous inclination,
+              'max_days'        : longest repeat cycle (nodal days),
+              'min_perigee_alt' : lowest admissible perigee altitude (km),
+              'cb', 'max_iter', 'tol' (sma convergence, km) }
+
+    Returns a dictionary of arrays, one entry per solution, sorted by
+    repeat cycle then sma: 'revs', 'days', 'sma', 'ecc', 'incl',
+    'altitude' (sma altitude), 'revs_per_day'
+    '''
+    _args = {
+        'altitude_range'  : ( 400.0, 1500.0 ),
+        'eccs'            : [ 0.0 ],
+        'incls'           : 'sso',
+        'max_days'        : 5,
+        'min_perigee_alt' : 150.0,
+        'cb'              : pd.earth,
+        'max_iter'        : 50,
+        'tol'             : 1e-6
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    cb     = _args[ 'cb' ]
+    check_body( cb )
+
+    sso    = isinstance( _args[ 'incls' ], str ) and _args[ 'incls' ] == 'sso'
+    eccs   = np.atleast_1d( np.asarray( _args[ 'eccs' ], dtype = float ) )
+    incls  = np.array( [ np.nan ] ) if sso else np.atleast_1d( np.asarray( _args[ 'incls' ], dtype = float ) )
+    a_min, a_max = cb[ 'radius' ] + np.asarray( _args[ 'altitude_range' ], dtype = float )
+
+    # Candidate ratios bracket the two-body ratio at the range ends, with
+    # a margin for the J2 rates; solutions outside the range are dropped
+    ratio = lambda a: np.sqrt( cb[ 'mu' ] / a**3 ) / cb[ 'rotation_rate' ]
+    lo, hi = 0.95 * ratio( a_max ), 1.05 * ratio( a_min )
+
+    pairs = [ ( revs, days ) for days in range( 1, _args[ 'max_days' ] + 1 )
+              for revs in range( int( np.ceil( lo * days ) ), int( np.floor( hi * days ) ) + 1 )
+              if gcd( revs, days ) == 1 ]
+
+    if not pairs:
+        return { key : np.empty( 0 ) for key in
+                 ( 'revs', 'days', 'sma', 'ecc', 'incl', 'altitude', 'revs_per_day' ) }
+
+    revs, days = np.array( pairs ).T
+
+    # Every ( ratio, ecc, incl ) combination solved together
+    Q, ecc, incl = np.meshgrid( revs / days, eccs, incls, indexing = 'ij' )
+    revs = np.broadcast_to( revs[ :, None, None ], Q.shape )
+    days = np.broadcast_to( days[ :, None, None ], Q.shape )
+
+    # Fixed point on the Kepler mean motion: n = Q ( w - raan_dot ) - aop_dot - ( M_dot - n )
+    sma  = ( cb[ 'mu' ] / ( Q * cb[ 'rotation_rate' ] )**2 )**( 1 / 3 )
+    coes = np.zeros( Q.shape + ( 6, ) )
+    coes[ ..., 1 ] = ecc
+
+    for _ in range( _args[ 'max_iter' ] ):
+        coes[ ..., 0 ] = sma
+        coes[ ..., 2 ] = sso_inclination( sma, ecc, cb ) if sso else incl
+
+        raan_dot, aop_dot, M_dot = me.secular_J2_rates( coes, cb )
+        n_kepler = np.sqrt( cb[ 'mu' ] / sma**3 )
+        n        = Q * ( cb[ 'rotation_rate' ] - raan_dot ) - aop_dot - ( M_dot - n_kepler )
+
+        with np.errstate( invalid = 'ignore' ):
+            sma_new = ( cb[ 'mu' ] / n**2 )**( 1 / 3 )
+
+        converged = np.nanmax( np.abs( sma_new - sma ), initial = 0.0 ) < _args[ 'tol' ]
+        sma = sma_new
+
+        if converged:
+            break
+
+    incl = sso_inclination( sma, ecc, cb ) if sso else incl
+
+    valid = np.isfinite( sma ) & np.isfinite( incl ) & \
+            ( sma >= a_min ) & ( sma <= a_max ) & \
+            ( sma * ( 1 - ecc ) - cb[ 'radius' ] >= _args[ 'min_perigee_alt' ] )
+
+    order = np.lexsort( ( sma[ valid ], days[ valid ] ) )
+
+    return {
+        'revs'         : revs[ valid ][ order ],
+        'days'         : days[ valid ][ order ],
+        'sma'          : sma[ valid ][ order ],
+        'ecc'          : ecc[ valid ][ order ],
+        'incl'         : incl[ valid ][ order ],
+        'altitude'     : sma[ valid ][ order ] - cb[ 'radius' ],
+        'revs_per_day' : Q[ valid ][ order ]
+    }
+
+def verify_orbits( solutions, args = {} ):
+    '''
+    Propagates every candidate numerically with J2 over its repeat cycle,
+    in parallel, starting from the osculating elements of its mean
+    elements.
+
+    Parameters:
+    - solutions: Dictionary returned by repeat_orbits
+    - args     : { 'raan', 'aop', 'ta' : initial angles (deg),
+                   'cb', 'epoch', 'propagator', 'rtol', 'atol',
+                   'n_workers' : see batch.propagate_batch }
+
+    Returns a dictionary of arrays, one entry per candidate:
+    - 'repeat_period': repeat cycle length (s)
+    - 'closure_error': groundtrack closure, the surface distance (km)
+                       between the sub-satellite points at the start
+                       and end of the cycle
+    - 'raan_dot'     : mean RAAN rate measured over the cycle (deg/day)
+    - 'sso_error'    : raan_dot minus the sun-synchronous rate (deg/day)
+    '''
+    _args = {
+        'raan'       : 0.0,
+        'aop'        : 0.0,
+        'ta'         : 0.0,
+        'cb'         : pd.earth,
+        'epoch'      : REFERENCE_TIME,
+        'propagator' : 'DOP853',
+        'rtol'       : 1e-10,
+        'atol'       : 1e-10,
+        'n_workers'  : None
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    cb = _args[ 'cb' ]
+    N  = solutions[ 'sma' ].shape[ 0 ]
+
+    check_body( cb )
+
+    coes = np.zeros( ( N, 6 ) )
+    coes[ :, 0 ] = solutions[ 'sma' ]
+    coes[ :, 1 ] = solutions[ 'ecc' ]
+    coes[ :, 2 ] = solutions[ 'incl' ]
+    coes[ :, 3 ] = _args[ 'raan' ]
+    coes[ :, 4 ] = _args[ 'aop' ]
+    coes[ :, 5 ] = _args[ 'ta' ]
+
+    raan_dot, _, _ = me.secular_J2_rates( coes, cb )
+    periods = solutions[ 'days' ] * 2 * np.pi / ( cb[ 'rotation_rate' ] - raan_dot )
+
+    # One common grid holding every candidate's repeat period
+    times = np.union1d( [ 0.0 ], periods )
+    index = np.searchsorted( times, periods )
+
+    osculating = me.mean_to_osculating( coes, cb )
+    configs    = [ {
+        'cb'          : cb,
+        'coes'        : list( osculating[ k ] ),
+        'orbit_perts' : { 'J2' : True },
+        'propagator'  : _args[ 'propagator' ],
+        'rtol'        : _args[ 'rtol' ],
+        'atol'        : _args[ 'atol' ],
+        'epoch'       : _args[ 'epoch' ]
+    } for k in range( N ) ]
+
+    batch_args = {} if _args[ 'n_workers' ] is None else { 'n_workers' : _args[ 'n_workers' ] }
+    states     = batch.propagate_batch( configs, times, batch_args )
+
+    start = states[ :, 0 ]
+    end   = states[ np.arange( N ), index ]
+
+    # Sub-satellite directions in the rotating frame
+    u0 = body_fixed( start[ :, :3 ], np.zeros( N ), cb, _args[ 'epoch' ] )
+    u1 = body_fixed( end[ :, :3 ], times[ index ], cb, _args[ 'epoch' ] )
+    u0 /= np.linalg.norm( u0, axis = 1, keepdims = True )
+    u1 /= np.linalg.norm( u1, axis = 1, keepdims = True )
+    closure = cb[ 'radius' ] * np.arccos( np.clip( np.sum( u0 * u1, axis = 1 ), -1, 1 ) )
+
+    # Mean RAAN drift over the cycle
+    mean0 = me.osculating_to_mean(
+        np.array( [ oc.coe_from_sv( state, { 'mu' : cb[ 'mu' ] } ) for state in start ] ), cb )
+    mean1 = me.osculating_to_mean(
+        np.array( [ oc.coe_from_sv( state, { 'mu' : cb[ 'mu' ] } ) for state in end ] ), cb )
+    draan = np.mod( mean1[ :, 3 ] - mean0[ :, 3 ] + 180.0, 360.0 ) - 180.0
+    rate  = draan / periods * 86400.0
+
+    return {
+        'repeat_period' : periods,
+        'closure_error' : closure,
+        'raan_dot'      : rate,
+        'sso_error'     : rate - sso_raan_rate( cb ) * 86400.0 * oc.r2d
+    }
@@ -0,0 +1,287 @@
+'''
+Patched Conic Propagation
+
+Propagates a trajectory through a sequence of two-body legs, switching
+the central body whenever a sphere of influence boundary is crossed.
+
+Each leg is an analytic Kepler solution (universal variables), so the
+state at any time costs one Kepler solve. SOI entries, SOI exits and
+surface impacts are found as events: the boundary function is sampled
+on a grid fine enough not to step across an SOI, and the first sign
+change is refined with Brent's method on the analytic leg. The
+heliocentric states of a leg's central body are evaluated once per leg
+and reused to translate its states into the heliocentric frame.
+
+Planet states default to the analytic ephemeris; any function with the
+same signature (e.g. transfer_tools.circular_ephemeris, or a Chebyshev
+fit from ephemeris.chebyshev_ephemeris) can be used instead.
+
+All states are in the J2000 equatorial frame, the frame of Spacecraft
+planetocentric states (J2, GMST), so planet states are requested with
+'frame' : 'equatorial'. Custom ephemerides must return equatorial
+states too (fit Chebyshev ephemerides with 'frame' : 'equatorial').
+'''
+
+# Third-party Libraries
+import numpy as np
+from scipy.optimize import brentq
+
+# User-defined Libraries
+import planetary_data as pd
+import orbit_calcs    as oc
+import ephemeris      as ep
+
+# Planets whose spheres of influence are checked by default
+SOI_BODIES = [
+    pd.mercury, pd.venus, pd.earth, pd.mars,
+    pd.jupiter, pd.saturn, pd.uranus, pd.neptune
+]
+
+# Fractional band around a planet's sma that its orbit may reach
+ECC_MARGIN = 0.25
+
+
+def periapsis_speed( state, mu ):
+    '''
+    Returns the periapsis radius and speed of the conic through state
+    '''
+    r = np.linalg.norm( state[ :3 ] )
+    h = np.linalg.norm( np.cross( state[ :3 ], state[ 3: ] ) )
+    e = np.linalg.norm( np.cross( state[ 3: ], np.cross( state[ :3 ], state[ 3: ] ) ) / mu -
+                        state[ :3 ] / r )
+
+    rp = h**2 / mu / ( 1 + e )
+
+    return rp, h / rp
+
+def first_crossing( g, t0, t1, step, rising, args = {} ):
+    '''
+    Returns ( time, column ) of the first zero crossing of the vectorized
+    function g in ( t0, t1 ] (upwards if rising, else downwards), or None.
+
+    g( times ) returns shape [steps] or [steps, n] (n boundaries at once).
+    Sampling advances in blocks, so an early crossing ends the search
+    without evaluating the rest of the span.
+    '''
+    _args = {
+        'block' : 512,
+        'xtol'  : 1e-6
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    t_prev = t0
+    g_prev = np.atleast_1d( g( np.array( [ t0 ] ) )[ 0 ] )
+
+    while t_prev < t1:
+        times   = np.minimum( t_prev + step * np.arange( 1, _args[ 'block' ] + 1 ), t1 )
+        times   = times[ np.concatenate( ( [ True ], times[ 1: ] > times[ :-1 ] ) ) ]
+        samples = g( times ).reshape( times.shape[ 0 ], -1 )
+        values  = np.vstack( ( g_prev, samples ) )
+
+        if rising:
+            hits = ( values[ :-1 ] < 0 ) & ( values[ 1: ] >= 0 )
+        else:
+            hits = ( values[ :-1 ] > 0 ) & ( values[ 1: ] <= 0 )
+
+        if hits.any():
+            k, column = np.argwhere( hits )[ 0 ]
+            lo  = t_prev if k == 0 else times[ k - 1 ]
+            hi  = times[ k ]
+            fun = lambda t: g( np.array( [ t ] ) ).reshape( -1 )[ column ]
+
+            return brentq( fun, lo, hi, xtol = _args[ 'xtol' ] ), column
+
+        t_prev = times[ -1 ]
+        g_prev = samples[ -1 ]
+
+    return None
+
+def _leg_end( leg, bodies, t_end, ephemeris ):
+    '''
+    Finds how a leg ends: ( time, event, body ), where event is
+    'soi_entry', 'soi_exit', 'impact' or 'final'
+    '''
+    cb     = leg[ 'cb' ]
+    mu     = cb[ 'mu' ]
+    state0 = leg[ 'state0' ]
+    t0     = leg[ 't0' ]
+
+    rp, vp = periapsis_speed( state0, mu )
+    local  = lambda times: oc.kepler_universal( state0, times - t0, mu )
+
+    # Bounded orbits have a finite apoapsis
+    alpha    = 2 / np.linalg.norm( state0[ :3 ] ) - np.dot( state0[ 3: ], state0[ 3: ] ) / mu
+    apoapsis = 2 / alpha - rp if alpha > 0 else np.inf
+
+    if cb[ 'name' ] == pd.sun[ 'name' ]:
+        # Only planets whose orbits (with a margin for their eccentricity)
+        # overlap the radial range of the leg can be encountered
+        bodies = [ body for body in bodies
+                   if rp       < body[ 'sma' ] * ( 1 + ECC_MARGIN ) + body[ 'SOI' ] and
+                      apoapsis > body[ 'sma' ] * ( 1 - ECC_MARGIN ) - body[ 'SOI' ] ]
+
+        if not bodies:
+            return t_end, 'final', None
+
+        # Never step further than half an SOI radius relative to any planet
+        v_bodies = np.array( [ np.sqrt( mu / body[ 'sma' ] ) for body in bodies ] )
+        SOIs     = np.array( [ body[ 'SOI' ] for body in bodies ] )
+        step     = 0.5 * np.min( SOIs / ( vp + v_bodies ) )
+
+        def g( times ):
+            r = local( times )[ :, :3 ]
+            return np.stack( [ np.linalg.norm( r - ephemeris( body, times )[ :, :3 ], axis = 1 )
+                               for body in bodies ], axis = 1 ) - SOIs
+
+        hit = first_crossing( g, t0, t_end, step, rising = False )
+
+        if hit is None:
+            return t_end, 'final', None
+
+        return hit[ 0 ], 'soi_entry', bodies[ hit[ 1 ] ]
+
+    # Planetocentric leg: bounded orbits inside the SOI never leave it
+    bounds = []
+    if rp < cb[ 'radius' ]:
+        bounds.append( ( 'impact', cb[ 'radius' ] ) )
+    if apoapsis > cb[ 'SOI' ]:
+        bounds.append( ( 'soi_exit', cb[ 'SOI' ] ) )
+
+    if not bounds:
+        return t_end, 'final', None
+
+    radii = np.array( [ radius for _, radius in bounds ] )
+    step  = 0.5 * radii.min() / vp
+
+    # Impact crosses its radius downwards, the exit crosses upwards, so the
+    # exit function is negated to test both as downward crossings
+    signs = np.array( [ 1.0 if event == 'impact' else -1.0 for event, _ in bounds ] )
+    g     = lambda times: signs * ( np.linalg.norm( local( times )[ :, :3 ], axis = 1 )[ :, None ] - radii )
+
+    hit = first_crossing( g, t0, t_end, step, rising = False )
+
+    if hit is None:
+        return t_end, 'final', None
+
+    return hit[ 0 ], bounds[ hit[ 1 ] ][ 0 ], None
+
+def check_central_body( cb ):
+    '''
+    Raises a ValueError unless cb can start a patched conic trajectory:
+    the Sun, or a body with a sphere of influence
+    '''
+    if cb[ 'name' ] != pd.sun[ 'name' ] and 'SOI' not in cb:
+        raise ValueError( 'Patched conics require the SOI of central body: %s' % cb[ 'name' ] )
+
+def propagate( state0, cb, tspan, args = {} ):
+    '''
+    Propagates a patched conic trajectory.
+
+    Parameters:
+    - state0: Initial state relative to cb (shape: [6])
+    - cb    : Initial central body (planetary_data dictionary)
+    - tspan : Duration in seconds
+    - args  : { 'bodies'         : planets whose SOIs are checked,
+                'ephemeris'      : function( body, times, ephemeris_args )
+                                   returning heliocentric states [steps, 6],
+                'ephemeris_args' : extra ephemeris arguments (e.g. the
+                                   'epoch' of t = 0; 'frame' defaults to
+                                   'equatorial'),
+                't_eval'         : output times (default: 'leg_samples'
+                                   evenly spaced samples per leg),
+                'max_legs'       : most legs allowed; a RuntimeError is
+                                   raised if the trajectory needs more }
+
+    Returns a dictionary:
+    - 'legs'        : one dictionary per leg (cb, t0, t1, state0 relative
+                      to cb, end event and the body entered)
+    - 'times'       : output times (shape: [steps])
+    - 'states'      : heliocentric J2000 equatorial states (shape: [steps, 6])
+    - 'local_states': states relative to each leg's central body
+    - 'leg_index'   : leg of every output sample (shape: [steps])
+    '''
+    _args = {
+        'bodies'         : SOI_BODIES,
+        'ephemeris'      : ep.analytic_ephemeris,
+        'ephemeris_args' : {},
+        't_eval'         : None,
+        'leg_samples'    : 100,
+        'max_legs'       : 100
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    check_central_body( cb )
+
+    ephem_args = dict( { 'frame' : 'equatorial' }, **_args[ 'ephemeris_args' ] )
+    ephemeris  = lambda body, times: _args[ 'ephemeris' ]( body, times, ephem_args )
+    bodies     = [ body for body in _args[ 'bodies' ] if body[ 'name' ] != cb[ 'name' ] ]
+
+    legs = [ {
+        'cb'     : cb,
+        't0'     : 0.0,
+        'state0' : np.asarray( state0, dtype = float )
+    } ]
+
+    while True:
+        leg = legs[ -1 ]
+        t1, event, body = _leg_end( leg, bodies, tspan, ephemeris )
+
+        leg[ 't1' ]     = t1
+        leg[ 'end' ]    = event
+        leg[ 'body' ]   = body
+        leg[ 'state1' ] = oc.kepler_universal( leg[ 'state0' ], t1 - leg[ 't0' ], leg[ 'cb' ][ 'mu' ] )[ 0 ]
+
+        if event in ( 'final', 'impact' ):
+            break
+
+        if len( legs ) == _args[ 'max_legs' ]:
+            raise RuntimeError( 'Patched conic trajectory reached max_legs = %d at t = %.6g s (%s)'
+                                % ( _args[ 'max_legs' ], t1, event ) )
+
+        # Translate the crossing state into the new central body's frame
+        if event == 'soi_entry':
+            new_cb = body
+            state  = leg[ 'state1' ] - ephemeris( body, np.array( [ t1 ] ) )[ 0 ]
+        else:
+            new_cb = pd.sun
+            state  = leg[ 'state1' ] + ephemeris( leg[ 'cb' ], np.array( [ t1 ] ) )[ 0 ]
+            bodies = _args[ 'bodies' ]
+
+        legs.append( { 'cb' : new_cb, 't0' : t1, 'state0' : state } )
+
+    # Sample every leg, translating with the leg's body states evaluated once
+    times, local_states, states, leg_index = [], [], [], []
+
+    for index, leg in enumerate( legs ):
+        if _args[ 't_eval' ] is not None:
+            t_eval = np.asarray( _args[ 't_eval' ], dtype = float )
+            last   = index == len( legs ) - 1
+            upper  = ( t_eval <= leg[ 't1' ] ) if last else ( t_eval < leg[ 't1' ] )
+            t_leg  = t_eval[ ( t_eval >= leg[ 't0' ] ) & upper ]
+        else:
+            t_leg = np.linspace( leg[ 't0' ], leg[ 't1' ], _args[ 'leg_samples' ] )
+
+        local = oc.kepler_universal( leg[ 'state0' ], t_leg - leg[ 't0' ], leg[ 'cb' ][ 'mu' ] )
+        if leg[ 'cb' ][ 'name' ] == pd.sun[ 'name' ]:
+            frame = np.zeros_like( local )
+        else:
+            frame = ephemeris( leg[ 'cb' ], t_leg )
+
+        leg[ 'frame_states' ] = frame
+
+        times.append( t_leg )
+        local_states.append( local )
+        states.append( local + frame )
+        leg_index.append( np.full( t_leg.shape[ 0 ], index ) )
+
+    return {
+        'legs'         : legs,
+        'times'        : np.concatenate( times ),
+        'states'       : np.vstack( states ),
+        'local_states' : np.vstack( local_states ),
+        'leg_index'    : np.concatenate( leg_index )
+    }
@@ -8,6 +8,29 @@ Note: Units are in KM-S for each planet dictionary.
 G_meters = 6.67430e-11       # m**3 / kg / s**2
 G        = G_meters * 10**-9 # km**3/ kg / s**2
 
+# astronomical unit
+AU = 149597870.7 # km
+
+# exponential atmosphere model: [ base altitude (km), base density (kg/m^3),
+# scale height (km) ] per altitude band (Vallado, Fundamentals of
+# Astrodynamics and Applications, Table 8-4)
+earth_atmosphere = [
+		[    0.0, 1.225,     7.249 ], [   25.0, 3.899e-2,  6.349 ],
+		[   30.0, 1.774e-2,  6.682 ], [   40.0, 3.972e-3,  7.554 ],
+		[   50.0, 1.057e-3,  8.382 ], [   60.0, 3.206e-4,  7.714 ],
+		[   70.0, 8.770e-5,  6.549 ], [   80.0, 1.905e-5,  5.799 ],
+		[   90.0, 3.396e-6,  5.382 ], [  100.0, 5.297e-7,  5.877 ],
+		[  110.0, 9.661e-8,  7.263 ], [  120.0, 2.438e-8,  9.473 ],
+		[  130.0, 8.484e-9, 12.636 ], [  140.0, 3.845e-9, 16.149 ],
+		[  150.0, 2.070e-9, 22.523 ], [  180.0, 5.464e-10, 29.740 ],
+		[  200.0, 2.789e-10, 37.105 ], [  250.0, 7.248e-11, 45.546 ],
+		[  300.0, 2.418e-11, 53.628 ], [  350.0, 9.518e-12, 53.298 ],
+		[  400.0, 3.725e-12, 58.515 ], [  450.0, 1.585e-12, 60.828 ],
+		[  500.0, 6.967e-13, 63.822 ], [  600.0, 1.454e-13, 71.835 ],
+		[  700.0, 3.614e-14, 88.667 ], [  800.0, 1.170e-14, 124.64 ],
+		[  900.0, 5.245e-15, 181.05 ], [ 1000.0, 3.019e-15, 268.00 ]
+]
+
 # planet dictionaries
 
 mercury = {
@@ -17,7 +40,9 @@ mercury = {
 		'mu'              : 0.330103e24 * G,
 		'radius'          : 2440.53,
 		'J2'     		  : 50.3e-6,
+		'rotation_rate'   : 1.2399326883e-06, # rad/s, sidereal
 		'sma'             : 57.91e6,  
+		'orbital_period'  : 87.969 * 86400.0, # s, sidereal orbit
 		'SOI'             : 1.1241e5, 
 		'cmap'            : 'Wistia',
 		'traj_color'      : 'y'
@@ -30,7 +55,9 @@ venus = {
 		'mu'              : 3.2485859200000006E+05,
 		'radius'          : 6051.8,
 		'J2'			  : 4.458e-6,
+		'rotation_rate'   : -2.9923691870e-07, # rad/s, sidereal, retrograde
 		'sma'             : 108.209e6,  
+		'orbital_period'  : 224.701 * 86400.0, # s, sidereal orbit
 		'SOI'             : 617183.2511,
 		'cmap'            : 'Wistia',
 		'traj_color'      : 'y'
@@ -43,8 +70,11 @@ earth = {
 		'mu'              : 5.972e24 * G,
 		'radius'          : 6378.0,
 		'J2'              : 1.082626683e-3, # WGS84
+		'rotation_rate'   : 7.2921158553e-5, # rad/s, sidereal
 		'sma'             : 149.596e6,
+		'orbital_period'  : 365.256363004 * 86400.0, # s, sidereal year
 		'SOI'             : 926006.6608,
+		'atmosphere'      : earth_atmosphere,
 		'cmap'            : 'Blues',
 		'traj_color'      : 'b'
 		}
@@ -56,7 +86,9 @@ mars = {
 		'mu'              : 4.282837362069909E+04,
 		'radius'          : 3397.0,
 		'J2'			  : 1960.45e-6,
+		'rotation_rate'   : 7.0882359592e-05, # rad/s, sidereal
 		'sma'             : 227.923e6,
+		'orbital_period'  : 686.980 * 86400.0, # s, sidereal orbit
 		'SOI'             : 0.578e6,  
 		'cmap'            : 'Reds',
 		'traj_color'      : 'r'
@@ -69,7 +101,9 @@ jupiter = {
 		'mu'              : 1.26686e8,
 		'radius'          : 71490.0,
 		'J2'              : 14736e-6,
+		'rotation_rate'   : 1.7585181380e-04, # rad/s, sidereal, System III
 		'sma'             : 778.570e6, 
+		'orbital_period'  : 4332.589 * 86400.0, # s, sidereal orbit
 		'SOI'             : 48.2e6,  
 		'traj_color'      : 'C3'
 }
@@ -81,7 +115,9 @@ saturn = {
 		'mu'              : 1.8981e26 * G,
 		'radius'          : 60270,
 		'J2'			  : 16298e-6,
+		'rotation_rate'   : 1.6378840578e-04, # rad/s, sidereal
 		'sma'             : 778.6e6,
+		'orbital_period'  : 10759.22 * 86400.0, # s, sidereal orbit
 		'SOI'             : 54.787e6,
 		'traj_color'      : 'C3'
 }
@@ -93,7 +129,9 @@ uranus = {
 		'mu'              : 8.6811e24 * G,
 		'radius'          : 25560,
 		'J2'		      : 3343.43e-6, 
+		'rotation_rate'   : -1.0123719559e-04, # rad/s, sidereal, retrograde
 		'sma'             : 2872e6, 
+		'orbital_period'  : 30685.4 * 86400.0, # s, sidereal orbit
 		'SOI'             : 5.1785e7, 
 		'traj_color'      : 'C3'
 }
@@ -105,7 +143,9 @@ neptune = {
 		'mu'              : 1.0241e25 * G,
 		'radius'          : 24760,   
 		'J2'			  : 3411e-6,
+		'rotation_rate'   : 1.0833825276e-04, # rad/s, sidereal
 		'sma'             : 4495e6, 
+		'orbital_period'  : 60189.0 * 86400.0, # s, sidereal orbit
 		'SOI'             : 8.6589e7, 
 		'traj_color'      : 'C3'
 }
@@ -116,7 +156,9 @@ pluto = {
 		'mass'            : 1.3029e21,
 		'mu'              : 1.3029e21 * G,
 		'radius'          : 1188,   # km
+		'rotation_rate'   : -1.1385591835e-05, # rad/s, sidereal, retrograde
 		'sma'             : 5.90638e9, # km
+		'orbital_period'  : 90560.0 * 86400.0, # s, sidereal orbit
 		'traj_color'      : 'C3'
 } 
 
@@ -127,7 +169,9 @@ moon = {
 		'mu'              : 5.972e24 * G,
 		'radius'          : 1737.4,
 		'J2'              : 1.081874e-3,
+		'rotation_rate'   : 2.6616665020e-06, # rad/s, sidereal, synchronous
 		'sma'             : 149.596e6, # km
+		'orbital_period'  : 365.256363004 * 86400.0, # s, about the Sun with the Earth
 		'SOI'             : 926006.6608, # km
 		'cmap'            : 'Blues',
 		'traj_color'      : 'b'
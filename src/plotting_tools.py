@@ -4,12 +4,17 @@ Plotting tools
 
 import os
 import csv
+import logging
+from   functools            import lru_cache
 import numpy                as     np 
 import matplotlib.pyplot    as     plt
 from   matplotlib           import cm
+from   matplotlib           import animation
 from   planetary_data       import earth
 plt.style.use( 'dark_background' )
 
+logger = logging.getLogger( __name__ )
+
 time_handler = {
 	'seconds': { 'coeff': 1.0,        'xlabel': 'Time (seconds)' },
 	'hours'  : { 'coeff': 3600.0,     'xlabel': 'Time (hours)'   },
@@ -18,6 +23,7 @@ time_handler = {
 }
 
 dist_handler = {
+	'm'     : 1000.0,
 	'km'    : 1.0,
 	'ER'    : 1 / 6378.0,
 	'JR'    : 1 / 71490.0,
@@ -35,6 +41,22 @@ EARTH_COASTLINES = os.path.join(
 )
 
 
+@lru_cache( maxsize = 32 )
+def sphere_mesh( radius, resolution = 100 ):
+    '''
+    Returns read-only x, y, z surface grids of a sphere, cached per
+    radius and resolution
+    '''
+    _u, _v = np.mgrid[ 0:2*np.pi:resolution * 1j, 0:np.pi:resolution * 1j ]
+    _x = radius * np.cos( _u ) * np.sin( _v )
+    _y = radius * np.sin( _u ) * np.sin( _v )
+    _z = radius * np.cos( _v )
+
+    for grid in ( _x, _y, _z ):
+        grid.setflags( write = False )
+
+    return _x, _y, _z
+
 def plot_3d( rs, args, vectors = [] ):
     _args = {
         'figsize'       : ( 10, 8 ),
@@ -43,6 +65,7 @@ def plot_3d( rs, args, vectors = [] ):
         'traj_lws'      : 3,
         'dist_unit'     : 'km',
         'cb_radius'     : earth[ 'radius' ],
+        'cb_resolution' : 100,
         'cb_SOI'        : None,
         'cb_SOI_color'  : 'c',
         'cb_SOI_alpha'  : 0.7,
@@ -76,10 +99,7 @@ def plot_3d( rs, args, vectors = [] ):
     # Plot central body
     _args[ 'cb_radius' ] *= dist_handler[ _args[ 'dist_unit' ] ]
 
-    _u, _v = np.mgrid[ 0:2*np.pi:100j, 0:np.pi:100j  ]
-    _x = _args[ 'cb_radius' ] * np.cos( _u ) * np.sin( _v ) 
-    _y = _args[ 'cb_radius' ] * np.sin( _u ) * np.sin( _v ) 
-    _z = _args[ 'cb_radius' ] * np.cos( _v )
+    _x, _y, _z = sphere_mesh( _args[ 'cb_radius' ], _args[ 'cb_resolution' ] )
 
     ax.plot_surface( _x, _y, _z, rstride = 5, cstride = 5, cmap = cm.Blues, zorder = 0 )
 
@@ -187,14 +207,134 @@ def plot_3d( rs, args, vectors = [] ):
     
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
-        print( 'Saved', _args[ 'filename' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
     if _args[ 'show' ]:
         plt.show()
     
     plt.close()
 
-def plot_groundtracks( coords ):
+def animate_3d( rs, args = {} ):
+    '''
+    Animates trajectories sharing a common time index (each of shape
+    [steps, 3]). Only the trajectory heads and trails are redrawn each
+    frame (blitting), and 'trail_length' limits the trails to a fixed
+    number of samples so every frame costs the same. With 'filename'
+    set, frames are streamed to a movie writer ('ffmpeg' for video,
+    'pillow' for .gif).
+    '''
+    _args = {
+        'figsize'       : ( 10, 8 ),
+        'labels'        : [ '' ] * len( rs ),
+        'colors'        : COLORS[ : ],
+        'traj_lws'      : 2,
+        'dist_unit'     : 'km',
+        'cb_radius'     : earth[ 'radius' ],
+        'cb_resolution' : 50,
+        'cb_cmap'       : cm.Blues,
+        'axes_mag'      : 0.8,
+        'axes_custom'   : None,
+        'title'         : 'Trajectories',
+        'legend'        : True,
+        'hide_axes'     : False,
+        'azimuth'       : False,
+        'elevation'     : False,
+        'trail_length'  : None,
+        'frame_step'    : 1,
+        'interval'      : 30,
+        'fps'           : 30,
+        'writer'        : None,
+        'show'          : False,
+        'filename'      : False,
+        'dpi'           : 100
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    scale = dist_handler[ _args[ 'dist_unit' ] ]
+    rs    = [ np.asarray( r ) * scale for r in rs ]
+    steps = min( r.shape[ 0 ] for r in rs )
+
+    fig = plt.figure( figsize = _args[ 'figsize' ] )
+    ax  = fig.add_subplot( 111, projection = '3d' )
+
+    # Static scene: central body and axes limits are drawn once
+    _x, _y, _z = sphere_mesh( _args[ 'cb_radius' ] * scale, _args[ 'cb_resolution' ] )
+    ax.plot_surface( _x, _y, _z, rstride = 2, cstride = 2, cmap = _args[ 'cb_cmap' ], zorder = 0 )
+
+    if _args[ 'axes_custom' ] is not None:
+        max_val = _args[ 'axes_custom' ]
+    else:
+        max_val = max( np.abs( r[ :steps ] ).max() for r in rs ) * _args[ 'axes_mag' ]
+
+    ax.set_xlim( [ -max_val, max_val ] )
+    ax.set_ylim( [ -max_val, max_val ] )
+    ax.set_zlim( [ -max_val, max_val ] )
+    ax.set_box_aspect( [ 1, 1, 1 ] )
+    ax.set_xlabel( 'X (%s)' % _args[ 'dist_unit' ] )
+    ax.set_ylabel( 'Y (%s)' % _args[ 'dist_unit' ] )
+    ax.set_zlabel( 'Z (%s)' % _args[ 'dist_unit' ] )
+    ax.set_title( _args[ 'title' ] )
+
+    if _args[ 'azimuth' ] is not False:
+        ax.view_init( elev = _args[ 'elevation' ], azim = _args[ 'azimuth' ] )
+
+    if _args[ 'hide_axes' ]:
+        ax.set_axis_off()
+
+    # Moving artists: one trail line and one head marker per trajectory
+    trails = []
+    heads  = []
+
+    for n in range( len( rs ) ):
+        trail, = ax.plot( [], [], [], color = _args[ 'colors' ][ n ],
+            label = _args[ 'labels' ][ n ], linewidth = _args[ 'traj_lws' ], zorder = 10 )
+        head,  = ax.plot( [], [], [], 'o', color = _args[ 'colors' ][ n ], zorder = 11 )
+        trails.append( trail )
+        heads.append( head )
+
+    if _args[ 'legend' ]:
+        plt.legend()
+
+    trail_length = _args[ 'trail_length' ] or steps
+
+    def update( k ):
+        start = max( 0, k - trail_length + 1 )
+
+        for r, trail, head in zip( rs, trails, heads ):
+            trail.set_data_3d( r[ start:k + 1, 0 ], r[ start:k + 1, 1 ], r[ start:k + 1, 2 ] )
+            head.set_data_3d( r[ k:k + 1, 0 ], r[ k:k + 1, 1 ], r[ k:k + 1, 2 ] )
+
+        return trails + heads
+
+    anim = animation.FuncAnimation( fig, update,
+        frames   = range( 0, steps, _args[ 'frame_step' ] ),
+        interval = _args[ 'interval' ],
+        blit     = True )
+
+    if _args[ 'filename' ]:
+        writer = _args[ 'writer' ]
+        if writer is None:
+            writer = 'pillow' if _args[ 'filename' ].endswith( '.gif' ) else 'ffmpeg'
+
+        anim.save( _args[ 'filename' ], writer = writer, fps = _args[ 'fps' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
+
+    if _args[ 'show' ]:
+        plt.show()
+
+    # A shown animation keeps its figure open (non-blocking backends,
+    # notebooks); the returned anim must be kept referenced to run
+    if _args[ 'filename' ] or not _args[ 'show' ]:
+        plt.close( fig )
+
+    return anim
+
+def load_coastlines():
+    '''
+    Returns the Earth coastline longitudes and latitudes (degrees)
+    '''
     # List to hold latitude and longitude data
     coast_latitudes = []
     coast_longitudes = []
@@ -207,6 +347,20 @@ def plot_groundtracks( coords ):
             coast_longitudes.append(longitude)
             coast_latitudes.append(latitude)
 
+    return coast_longitudes, coast_latitudes
+
+def plot_groundtracks( coords, args = { 'show' : True } ):
+    _args = {
+        'show'     : False,
+        'filename' : False,
+        'dpi'      : 300
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    coast_longitudes, coast_latitudes = load_coastlines()
+
     # Set figure size
     fig = plt.figure( figsize=(18, 9) )
     ax = fig.add_subplot()
@@ -253,7 +407,15 @@ def plot_groundtracks( coords ):
     ax.set_title( 'Spacecraft groundtrack', fontsize = 14 )
 
     plt.legend()
-    plt.show()
+
+    if _args[ 'filename' ]:
+        plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
+
+    if _args[ 'show' ]:
+        plt.show()
+
+    plt.close()
 
 def plot_states( times, states, args = {} ):
     _args = {
@@ -351,7 +513,7 @@ def plot_states( times, states, args = {} ):
 
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
-        print( 'Saved', _args[ 'filename' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
     if _args[ 'show' ]:
         plt.show()
@@ -427,7 +589,7 @@ def plot_pos( times, pos, args = {} ):
     
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
-        print( 'Saved', _args[ 'filename' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
     if _args[ 'show' ]:
         plt.show()
@@ -503,7 +665,7 @@ def plot_velocities( times, velocities, args = {} ):
     
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
-        print( 'Saved', _args[ 'filename' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
     if _args[ 'show' ]:
         plt.show()
@@ -581,7 +743,7 @@ def plot_altitudes( times, alts, args = {} ):
     
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
-        print( 'Saved', _args[ 'filename' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
     if _args[ 'show' ]:
         plt.show()
@@ -690,5 +852,195 @@ def plot_coes( times, coes, args = {} ):
     
     if _args[ 'filename' ]:
         plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
+
+    plt.close()
+
+def plot_porkchop( dep_times, arr_times, c3s, vinfs, args = {} ):
+    _args = {
+        'figsize'      : ( 16, 10 ),
+        'time_unit'    : 'days',
+        'c3_levels'    : np.arange( 0, 100, 5 ),
+        'vinf_levels'  : np.arange( 0, 15, 1 ),
+        'tof_levels'   : None,
+        'c3_cmap'      : 'plasma',
+        'vinf_color'   : 'w',
+        'tof_color'    : 'c',
+        'lw'           : 1,
+        'labelsize'    : 15,
+        'title'        : 'Porkchop Plot',
+        'show'         : False,
+        'filename'     : False,
+        'dpi'          : 300
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    _args[ 'time_coeff' ] = time_handler[ _args[ 'time_unit' ] ][ 'coeff' ]
+
+    # Rows of c3s / vinfs are departure times, columns arrival times
+    deps = np.asarray( dep_times ) / _args[ 'time_coeff' ]
+    arrs = np.asarray( arr_times ) / _args[ 'time_coeff' ]
+    X, Y = np.meshgrid( deps, arrs, indexing = 'ij' )
+
+    fig, ax0 = plt.subplots( 1, 1, figsize = _args[ 'figsize' ] )
+
+    c3_plot = ax0.contour(
+        X, Y, c3s, levels = _args[ 'c3_levels' ],
+        cmap = _args[ 'c3_cmap' ], linewidths = _args[ 'lw' ]
+    )
+    vinf_plot = ax0.contour(
+        X, Y, vinfs, levels = _args[ 'vinf_levels' ],
+        colors = _args[ 'vinf_color' ], linewidths = _args[ 'lw' ] * 0.6
+    )
+    ax0.clabel( vinf_plot, fontsize = 8, fmt = '%.0f' )
+
+    if _args[ 'tof_levels' ] is not None:
+        tof_plot = ax0.contour(
+            X, Y, Y - X, levels = _args[ 'tof_levels' ],
+            colors = _args[ 'tof_color' ], linewidths = _args[ 'lw' ] * 0.6,
+            linestyles = 'dotted'
+        )
+        ax0.clabel( tof_plot, fontsize = 8, fmt = '%.0f' )
+
+    cbar = fig.colorbar( c3_plot, ax = ax0 )
+    cbar.set_label( r'C3 $(\dfrac{km^2}{s^2})$', size = _args[ 'labelsize' ] )
+
+    unit = _args[ 'time_unit' ]
+    ax0.grid( linestyle = 'dotted' )
+    ax0.set_xlabel( 'Departure (%s)' % unit, size = _args[ 'labelsize' ] )
+    ax0.set_ylabel( 'Arrival (%s)'   % unit, size = _args[ 'labelsize' ] )
+
+    plt.suptitle( _args[ 'title' ] )
+    plt.tight_layout()
+
+    if _args[ 'filename' ]:
+        plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
+
+    if _args[ 'show' ]:
+        plt.show()
+
+    plt.close()
+
+def plot_coverage_map( lats, lons, values, args = {} ):
+    _args = {
+        'figsize'     : ( 18, 9 ),
+        'cmap'        : 'viridis',
+        'vmin'        : None,
+        'vmax'        : None,
+        'coastlines'  : True,
+        'coast_color' : 'w',
+        'cbar_label'  : '',
+        'labelsize'   : 14,
+        'title'       : 'Coverage',
+        'show'        : False,
+        'filename'    : False,
+        'dpi'         : 300
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    fig, ax0 = plt.subplots( 1, 1, figsize = _args[ 'figsize' ] )
+
+    # Cell centers to cell edges
+    dlat = lats[ 1 ] - lats[ 0 ]
+    dlon = lons[ 1 ] - lons[ 0 ]
+    image = ax0.imshow(
+        values, origin = 'lower', aspect = 'auto', interpolation = 'nearest',
+        extent = [ lons[ 0 ] - dlon / 2, lons[ -1 ] + dlon / 2,
+                   lats[ 0 ] - dlat / 2, lats[ -1 ] + dlat / 2 ],
+        cmap = _args[ 'cmap' ], vmin = _args[ 'vmin' ], vmax = _args[ 'vmax' ]
+    )
+
+    if _args[ 'coastlines' ]:
+        coast_longitudes, coast_latitudes = load_coastlines()
+        ax0.scatter( coast_longitudes, coast_latitudes, s = 0.1, color = _args[ 'coast_color' ] )
+
+    cbar = fig.colorbar( image, ax = ax0 )
+    cbar.set_label( _args[ 'cbar_label' ], size = _args[ 'labelsize' ] )
+
+    ax0.set_xlim( ( -180, 180 ) )
+    ax0.set_ylim( ( -90, 90 ) )
+    ax0.set_xticks( range( -180, 200, 20 ) )
+    ax0.set_yticks( range( -90, 100, 10 ) )
+    ax0.grid( True, 'major', linestyle = 'dotted' )
+    ax0.set_xlabel( r'Longitude (degrees $^\circ$)', fontsize = _args[ 'labelsize' ] )
+    ax0.set_ylabel( r'Latitude (degrees $^\circ$)',  fontsize = _args[ 'labelsize' ] )
+    ax0.set_title( _args[ 'title' ], fontsize = _args[ 'labelsize' ] )
+
+    if _args[ 'filename' ]:
+        plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
+
+    if _args[ 'show' ]:
+        plt.show()
+
+    plt.close()
+
+def plot_lvlh( rs, args = {} ):
+    '''
+    Plots relative trajectories in the LVLH frame: radial versus
+    along-track (V-bar to the left of the chief, R-bar up) and
+    cross-track versus along-track.
+
+    rs: Relative positions (km) (shape: [N, steps, 3], x radial,
+        y along-track, z cross-track)
+    '''
+    _args = {
+        'figsize'   : ( 16, 8 ),
+        'dist_unit' : 'km',
+        'colors'    : COLORS[ : ],
+        'lw'        : 1,
+        'labels'    : None,
+        'start'     : True,
+        'labelsize' : 15,
+        'title'     : 'Relative Motion (LVLH)',
+        'show'      : False,
+        'filename'  : False,
+        'dpi'       : 300
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    coeff = dist_handler[ _args[ 'dist_unit' ] ]
+    fig, ( ax0, ax1 ) = plt.subplots( 2, 1, figsize = _args[ 'figsize' ], sharex = True )
+
+    for n, r in enumerate( rs ):
+        r     = r * coeff
+        color = _args[ 'colors' ][ n % len( _args[ 'colors' ] ) ]
+        label = _args[ 'labels' ][ n ] if _args[ 'labels' ] else None
+
+        ax0.plot( r[ :, 1 ], r[ :, 0 ], color = color, linewidth = _args[ 'lw' ], label = label )
+        ax1.plot( r[ :, 1 ], r[ :, 2 ], color = color, linewidth = _args[ 'lw' ] )
+
+        if _args[ 'start' ]:
+            ax0.plot( r[ 0, 1 ], r[ 0, 0 ], 'o', color = color )
+            ax1.plot( r[ 0, 1 ], r[ 0, 2 ], 'o', color = color )
+
+    for ax in ( ax0, ax1 ):
+        ax.plot( 0, 0, 'w+', markersize = 12 )
+        ax.grid( linestyle = 'dotted' )
+
+    ax1.invert_xaxis()
+    ax0.set_ylabel( 'Radial (%s)' % _args[ 'dist_unit' ], size = _args[ 'labelsize' ] )
+    ax1.set_ylabel( 'Cross-track (%s)' % _args[ 'dist_unit' ], size = _args[ 'labelsize' ] )
+    ax1.set_xlabel( 'Along-track (%s)' % _args[ 'dist_unit' ], size = _args[ 'labelsize' ] )
+
+    if _args[ 'labels' ]:
+        ax0.legend()
+
+    plt.suptitle( _args[ 'title' ] )
+    plt.tight_layout()
+
+    if _args[ 'filename' ]:
+        plt.savefig( _args[ 'filename' ], dpi = _args[ 'dpi' ] )
+        logger.info( 'Saved %s', _args[ 'filename' ] )
 
-    plt.close()
\ No newline at end of file
+    if _args[ 'show' ]:
+        plt.show()
+
+    plt.close()
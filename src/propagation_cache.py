@@ -0,0 +1,190 @@
+'''
+Propagation Cache
+
+Content-addressed on-disk cache of propagation results. Entries are keyed
+by a hash of the normalized Spacecraft configuration and the package
+version, stored as uncompressed .npz files (times, states) and evicted
+least-recently-used first once the cache exceeds its size limit.
+
+Writes go to a temporary file that is atomically renamed into place, so
+several processes can share one cache directory.
+'''
+
+# Python Standard Libraries
+import hashlib
+import json
+import os
+import tempfile
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from version import __version__
+
+DEFAULT_CACHE_DIR = os.path.join( os.path.expanduser( '~' ), '.cache', 'orbital-mechanics' )
+
+# Configuration keys that change the propagation result
+KEY_CONFIG = [
+    'tspan', 'propagator', 'formulation', 'rectify_tol', 'sundman_power',
+    'atol', 'rtol', 'dt', 't_eval', 'epoch', 'maneuvers', 'patched_conic_args',
+    'mcpi_args', 'mass', 'Cd', 'area'
+]
+
+
+def _normalize( value ):
+    '''
+    Converts config values into JSON-serializable, order-stable objects
+    '''
+    if isinstance( value, dict ):
+        return { str( key ): _normalize( value[ key ] ) for key in sorted( value ) }
+    if isinstance( value, ( list, tuple, np.ndarray ) ):
+        return [ _normalize( item ) for item in value ]
+    if isinstance( value, ( np.floating, float ) ):
+        # Hex representation is exact, so no two distinct floats collide
+        return float( value ).hex()
+    if isinstance( value, ( np.integer, int, bool, np.bool_ ) ):
+        return int( value )
+    if value is None or isinstance( value, str ):
+        return value
+    if callable( value ):
+        # Functions are identified by their import path. Closures, lambdas
+        # and bound methods carry state their name does not capture.
+        name   = getattr( value, '__qualname__', getattr( value, '__name__', '' ) )
+        module = getattr( value, '__module__', None )
+        owner  = getattr( value, '__self__', None )
+
+        if not module or not name or '<' in name or \
+                ( owner is not None and not isinstance( owner, type ) ):
+            raise ValueError( 'Configurations holding %r cannot be cached' % value )
+
+        return '%s.%s' % ( module, name )
+
+    # Default reprs hold memory addresses, which differ in every process
+    text = repr( value )
+    if ' at 0x' in text:
+        raise ValueError( 'Configurations holding %s cannot be cached' % text )
+
+    return text
+
+def config_key( config, state0 ):
+    '''
+    Returns a stable hex digest of everything that determines the
+    propagation result of a Spacecraft configuration. Raises a ValueError
+    for configurations without a stable key (e.g. holding closures).
+    '''
+    cb = { key: value for key, value in config[ 'cb' ].items()
+           if isinstance( value, ( int, float, str ) ) }
+
+    normalized = {
+        'version'     : __version__,
+        'cb'          : cb,
+        'state0'      : state0,
+        'orbit_perts' : sorted( key for key, value in config[ 'orbit_perts' ].items() if value ),
+
+        # The storage cadence sets the solver output times
+        'cadence'     : config.get( 'storage', {} ).get( 'cadence' )
+    }
+
+    for key in KEY_CONFIG:
+        normalized[ key ] = config.get( key )
+
+    text = json.dumps( _normalize( normalized ), sort_keys = True )
+
+    return hashlib.sha256( text.encode() ).hexdigest()
+
+def save_npz( filename, compressed = False, **arrays ):
+    '''
+    Writes arrays to a .npz file through a temporary file that is
+    atomically renamed into place, so readers never see a partial file
+    '''
+    savez = np.savez_compressed if compressed else np.savez
+    fd, tmp = tempfile.mkstemp( dir = os.path.dirname( os.path.abspath( filename ) ), suffix = '.tmp' )
+
+    try:
+        with os.fdopen( fd, 'wb' ) as f:
+            savez( f, **arrays )
+        os.replace( tmp, filename )
+    except BaseException:
+        if os.path.exists( tmp ):
+            os.remove( tmp )
+        raise
+
+class PropagationCache:
+
+    def __init__( self, path = DEFAULT_CACHE_DIR, max_bytes = 2**30 ):
+        self.path      = path
+        self.max_bytes = max_bytes
+        os.makedirs( self.path, exist_ok = True )
+
+    def filename( self, key ):
+        return os.path.join( self.path, key + '.npz' )
+
+    def load( self, key ):
+        '''
+        Returns ( times, states ) for key, or None on a miss
+        '''
+        filename = self.filename( key )
+
+        try:
+            with np.load( filename ) as data:
+                times  = data[ 'times' ]
+                states = data[ 'states' ]
+        except ( FileNotFoundError, OSError, KeyError, ValueError ):
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime( filename )
+        except OSError:
+            pass
+
+        return times, states
+
+    def store( self, key, times, states ):
+        '''
+        Atomically writes an entry, then evicts old entries if needed
+        '''
+        save_npz( self.filename( key ), times = times, states = np.ascontiguousarray( states ) )
+        self.evict()
+
+    def entries( self ):
+        '''
+        Returns a list of ( mtime, size, filename ) for every entry
+        '''
+        entries = []
+
+        for name in os.listdir( self.path ):
+            if not name.endswith( '.npz' ):
+                continue
+            filename = os.path.join( self.path, name )
+            try:
+                stat = os.stat( filename )
+            except FileNotFoundError:
+                continue
+            entries.append( ( stat.st_mtime, stat.st_size, filename ) )
+
+        return entries
+
+    def evict( self ):
+        '''
+        Removes least-recently-used entries until the cache fits in max_bytes
+        '''
+        entries = sorted( self.entries() )
+        total   = sum( entry[ 1 ] for entry in entries )
+
+        for mtime, size, filename in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove( filename )
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear( self ):
+        for mtime, size, filename in self.entries():
+            try:
+                os.remove( filename )
+            except FileNotFoundError:
+                pass
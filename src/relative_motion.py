@@ -0,0 +1,262 @@
+'''
+Relative Motion
+
+Relative states of deputies with respect to a chief (target) in the
+chief's local-vertical local-horizontal (LVLH, Hill) frame:
+
+- x: radial, along the chief's position vector
+- y: along-track, completing the right-handed frame
+- z: cross-track, along the chief's angular momentum
+
+and their closed-form linearized propagation: Hill-Clohessy-Wiltshire
+(HCW) for circular chief orbits and Yamanaka-Ankersen for elliptical
+ones. Both are state transition matrices that depend on time only, so a
+whole set of deputies is propagated over a time grid with one matrix
+product.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import orbit_calcs    as oc
+import plotting_tools as pt
+
+
+def lvlh_frame( states ):
+    '''
+    Returns the rotation matrices from inertial to LVLH axes of one or
+    many chief states (shape: [..., 3, 3], rows x, y, z of the frame)
+    '''
+    states = np.asarray( states, dtype = float )
+    r      = states[ ..., :3 ]
+    h      = np.cross( r, states[ ..., 3:6 ] )
+
+    x = r / np.linalg.norm( r, axis = -1, keepdims = True )
+    z = h / np.linalg.norm( h, axis = -1, keepdims = True )
+    y = np.cross( z, x )
+
+    return np.stack( ( x, y, z ), axis = -2 )
+
+def _frame_rate( states ):
+    '''
+    Returns the rotation rate of the LVLH frame, h / r^2, about its z-axis
+    '''
+    r2 = np.sum( states[ ..., :3 ]**2, axis = -1 )
+    h  = np.linalg.norm( np.cross( states[ ..., :3 ], states[ ..., 3:6 ] ), axis = -1 )
+
+    return h / r2
+
+def eci2lvlh( chief_states, deputy_states ):
+    '''
+    Returns the relative states of deputies in the chief's LVLH frame,
+    with velocities as seen in the rotating frame.
+
+    Parameters:
+    - chief_states : Chief state history (shape: [steps, 6])
+    - deputy_states: Deputy state histories (shape: [..., steps, 6])
+
+    Returns:
+    - rel_states: Relative states (shape: [..., steps, 6])
+    '''
+    chief_states  = np.asarray( chief_states,  dtype = float )
+    deputy_states = np.asarray( deputy_states, dtype = float )
+
+    C     = lvlh_frame( chief_states )
+    omega = _frame_rate( chief_states )
+    d     = deputy_states - chief_states
+
+    rel = np.empty( np.broadcast( d, chief_states ).shape )
+    rel[ ..., :3 ] = np.einsum( '...ij,...j->...i', C, d[ ..., :3 ] )
+    rel[ ..., 3: ] = np.einsum( '...ij,...j->...i', C, d[ ..., 3: ] )
+
+    # Transport theorem: subtract omega x rho, omega = [ 0, 0, h / r^2 ]
+    rel[ ..., 3 ] += omega * rel[ ..., 1 ]
+    rel[ ..., 4 ] -= omega * rel[ ..., 0 ]
+
+    return rel
+
+def lvlh2eci( chief_states, rel_states ):
+    '''
+    Inverse of eci2lvlh: returns inertial deputy states (shape: [..., steps, 6])
+    '''
+    chief_states = np.asarray( chief_states, dtype = float )
+    rel_states   = np.array( rel_states, dtype = float )
+
+    C     = lvlh_frame( chief_states )
+    omega = _frame_rate( chief_states )
+
+    rel_states[ ..., 3 ] -= omega * rel_states[ ..., 1 ]
+    rel_states[ ..., 4 ] += omega * rel_states[ ..., 0 ]
+
+    states = np.empty( rel_states.shape )
+    states[ ..., :3 ] = np.einsum( '...ji,...j->...i', C, rel_states[ ..., :3 ] )
+    states[ ..., 3: ] = np.einsum( '...ji,...j->...i', C, rel_states[ ..., 3: ] )
+
+    return states + chief_states
+
+def hcw_stm( n, times ):
+    '''
+    Returns the Hill-Clohessy-Wiltshire state transition matrices from
+    t = 0 for a circular chief orbit with mean motion n (rad/s)
+    (shape: [steps, 6, 6])
+    '''
+    nt = n * np.asarray( times, dtype = float )
+    s  = np.sin( nt )
+    c  = np.cos( nt )
+
+    stm = np.zeros( nt.shape + ( 6, 6 ) )
+
+    stm[ :, 0, 0 ] = 4 - 3 * c
+    stm[ :, 0, 3 ] = s / n
+    stm[ :, 0, 4 ] = 2 * ( 1 - c ) / n
+    stm[ :, 1, 0 ] = 6 * ( s - nt )
+    stm[ :, 1, 1 ] = 1
+    stm[ :, 1, 3 ] = -2 * ( 1 - c ) / n
+    stm[ :, 1, 4 ] = ( 4 * s - 3 * nt ) / n
+    stm[ :, 2, 2 ] = c
+    stm[ :, 2, 5 ] = s / n
+
+    stm[ :, 3, 0 ] = 3 * n * s
+    stm[ :, 3, 3 ] = c
+    stm[ :, 3, 4 ] = 2 * s
+    stm[ :, 4, 0 ] = -6 * n * ( 1 - c )
+    stm[ :, 4, 3 ] = -2 * s
+    stm[ :, 4, 4 ] = 4 * c - 3
+    stm[ :, 5, 2 ] = -n * s
+    stm[ :, 5, 5 ] = c
+
+    return stm
+
+# Hill [ x, y, z, vx, vy, vz ] to the Yamanaka-Ankersen frame (x along-track,
+# y = -h, z = -r) ordered as [ x, z, vx, vz, y, vy ]
+_YA_AXES = np.zeros( ( 6, 6 ) )
+_YA_AXES[ 0, 1 ] = _YA_AXES[ 2, 4 ] = 1
+_YA_AXES[ 1, 0 ] = _YA_AXES[ 3, 3 ] = -1
+_YA_AXES[ 4, 2 ] = _YA_AXES[ 5, 5 ] = -1
+
+def _ya_transform( ta, e, k2 ):
+    '''
+    Matrices from YA-ordered states to the transformed variables
+    ( rho q, d( rho q ) / d ta ) at true anomalies ta, and their inverses
+    '''
+    rho = 1 + e * np.cos( ta )
+    esn = e * np.sin( ta )
+
+    T     = np.zeros( ta.shape + ( 6, 6 ) )
+    T_inv = np.zeros( ta.shape + ( 6, 6 ) )
+
+    for q, dq in ( ( 0, 2 ), ( 1, 3 ), ( 4, 5 ) ):
+        T[ :, q, q ]       = rho
+        T[ :, dq, q ]      = -esn
+        T[ :, dq, dq ]     = 1 / ( k2 * rho )
+        T_inv[ :, q, q ]   = 1 / rho
+        T_inv[ :, dq, q ]  = k2 * esn
+        T_inv[ :, dq, dq ] = k2 * rho
+
+    return T, T_inv
+
+def yamanaka_ankersen_stm( chief_state0, times, mu ):
+    '''
+    Returns the Yamanaka-Ankersen state transition matrices in the LVLH
+    frame from t = 0 for an elliptical chief orbit (shape: [steps, 6, 6])
+    (K. Yamanaka, F. Ankersen, "New State Transition Matrix for Relative
+    Motion on an Arbitrary Elliptical Orbit", JGCD 25(1), 2002).
+
+    Parameters:
+    - chief_state0: Chief state at t = 0 (shape: [6])
+    - times       : Times in seconds (shape: [steps])
+    - mu          : Gravitational parameter of the central body
+    '''
+    a, e, _, _, _, ta0 = oc.coe_from_sv( chief_state0, args = { 'mu' : mu, 'deg' : False } )
+    times = np.asarray( times, dtype = float )
+
+    if e >= 1:
+        raise ValueError( 'Yamanaka-Ankersen requires an elliptical chief orbit' )
+
+    p  = a * ( 1 - e**2 )
+    k2 = np.sqrt( mu / p**3 )
+    n  = np.sqrt( mu / a**3 )
+
+    E0 = 2 * np.arctan( np.sqrt( ( 1 - e ) / ( 1 + e ) ) * np.tan( ta0 / 2 ) )
+    M  = E0 - e * np.sin( E0 ) + n * times
+    ta = oc.true_anomaly_from_mean( M, e )
+    J  = k2 * times
+
+    # In-plane solution at ta and its inverse at ta0 (pseudo-initial values)
+    rho = 1 + e * np.cos( ta )
+    s   = rho * np.sin( ta )
+    c   = rho * np.cos( ta )
+    ds  = np.cos( ta ) + e * np.cos( 2 * ta )
+    dc  = -( np.sin( ta ) + e * np.sin( 2 * ta ) )
+
+    phi = np.zeros( ta.shape + ( 4, 4 ) )
+    phi[ :, 0, 0 ] = 1
+    phi[ :, 0, 1 ] = -c * ( 1 + 1 / rho )
+    phi[ :, 0, 2 ] = s * ( 1 + 1 / rho )
+    phi[ :, 0, 3 ] = 3 * rho**2 * J
+    phi[ :, 1, 1 ] = s
+    phi[ :, 1, 2 ] = c
+    phi[ :, 1, 3 ] = 2 - 3 * e * s * J
+    phi[ :, 2, 1 ] = 2 * s
+    phi[ :, 2, 2 ] = 2 * c - e
+    phi[ :, 2, 3 ] = 3 * ( 1 - 2 * e * s * J )
+    phi[ :, 3, 1 ] = ds
+    phi[ :, 3, 2 ] = dc
+    phi[ :, 3, 3 ] = -3 * e * ( ds * J + s / rho**2 )
+
+    rho0 = 1 + e * np.cos( ta0 )
+    s0   = rho0 * np.sin( ta0 )
+    c0   = rho0 * np.cos( ta0 )
+
+    phi0_inv = np.array( [
+        [ 1 - e**2, 3 * e * s0 * ( 1 / rho0 + 1 / rho0**2 ), -e * s0 * ( 1 + 1 / rho0 ), -e * c0 + 2 ],
+        [ 0, -3 * s0 * ( 1 / rho0 + e**2 / rho0**2 ),  s0 * ( 1 + 1 / rho0 ),      c0 - 2 * e ],
+        [ 0, -3 * ( c0 / rho0 + e ),                  c0 * ( 1 + 1 / rho0 ) + e, -s0 ],
+        [ 0,  3 * rho0 + e**2 - 1,                    -rho0**2,                   e * s0 ]
+    ] ) / ( 1 - e**2 )
+
+    # Out-of-plane, the transformed motion is harmonic in ta - ta0
+    dta  = ta - ta0
+    core = np.zeros( ta.shape + ( 6, 6 ) )
+    core[ :, :4, :4 ] = phi @ phi0_inv
+    core[ :, 4, 4 ] = core[ :, 5, 5 ] = np.cos( dta )
+    core[ :, 4, 5 ] = np.sin( dta )
+    core[ :, 5, 4 ] = -np.sin( dta )
+
+    _, T_inv = _ya_transform( ta, e, k2 )
+    T0, _    = _ya_transform( np.array( [ ta0 ] ), e, k2 )
+
+    return _YA_AXES.T @ T_inv @ core @ T0[ 0 ] @ _YA_AXES
+
+def propagate_stm( stm, rel_states0 ):
+    '''
+    Applies state transition matrices (shape: [steps, 6, 6]) to many
+    initial relative states (shape: [N, 6] or [6]), returning shape
+    [N, steps, 6] (or [steps, 6])
+    '''
+    return np.einsum( 'tij,...j->...ti', stm, np.asarray( rel_states0, dtype = float ) )
+
+def propagate_hcw( rel_states0, times, n ):
+    '''
+    Propagates LVLH relative states from t = 0 about a circular chief
+    orbit with mean motion n (shape: [N, steps, 6])
+    '''
+    return propagate_stm( hcw_stm( n, times ), rel_states0 )
+
+def propagate_yamanaka_ankersen( rel_states0, times, chief_state0, mu ):
+    '''
+    Propagates LVLH relative states from t = 0 about an elliptical chief
+    orbit through chief_state0 (shape: [N, steps, 6])
+    '''
+    return propagate_stm( yamanaka_ankersen_stm( chief_state0, times, mu ), rel_states0 )
+
+def plot_lvlh( rel_states, args = {} ):
+    '''
+    Plots relative trajectories in the LVLH frame (see pt.plot_lvlh)
+    '''
+    rel_states = np.asarray( rel_states )
+    if rel_states.ndim == 2:
+        rel_states = rel_states[ None ]
+
+    pt.plot_lvlh( rel_states[ ..., :3 ], args )
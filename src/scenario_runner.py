@@ -0,0 +1,311 @@
+'''
+Scenario Runner
+
+Command-line batch runner for declarative scenario files. A scenario
+lists Spacecraft configurations (the keys of Spacecraft.null_config)
+plus what to produce for each of them:
+
+    {
+        "defaults"   : { "tspan" : "3", "orbit_perts" : { "J2" : true } },
+        "spacecraft" : [
+            { "name" : "iss",     "coes" : [ 6778, 0.0005, 51.6, 0, 0, 0 ] },
+            { "name" : "molniya", "coes" : [ 26600, 0.74, 63.4, 0, 270, 0 ],
+              "propagator" : "DOP853" }
+        ],
+        "outputs" : [ "states", "coes", "latlons" ],
+        "format"  : "npz",
+        "plots"   : [ "3d", "groundtrack" ]
+    }
+
+Central bodies are given by planetary_data name ("cb" : "mars"). YAML
+files with the same structure are read when PyYAML is installed.
+
+Jobs run on a process pool, longest estimated first; every worker
+writes its own results and figures (rendered headlessly), so only the
+configurations and a summary travel between processes.
+
+Usage:
+    python scenario_runner.py scenario.json -o results -w 4 --plots
+'''
+
+# Python Standard Libraries
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Figures are rendered headlessly, so select a non-interactive backend
+# before plotting_tools imports pyplot
+import matplotlib
+matplotlib.use( 'Agg' )
+
+# Third-party Libraries
+import numpy as np
+
+# YAML scenarios are optional
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import planetary_data as pd
+import batch
+
+logger = logging.getLogger( __name__ )
+
+OUTPUTS = [ 'states', 'coes', 'latlons' ]
+FORMATS = [ 'npz', 'csv' ]
+
+# Figure name -> Spacecraft plot method
+PLOTS = {
+    '3d'          : 'plot_3d',
+    'coes'        : 'plot_coes',
+    'altitudes'   : 'plot_altitudes',
+    'states'      : 'plot_states',
+    'positions'   : 'plot_positions',
+    'velocities'  : 'plot_velocities',
+    'groundtrack' : 'plot_groundtrack'
+}
+
+
+def null_scenario():
+    return {
+        'defaults'   : {},
+        'spacecraft' : [],
+        'outputs'    : [ 'states' ],
+        'format'     : 'npz',
+        'plots'      : []
+    }
+
+def load_scenario( filename ):
+    '''
+    Reads a JSON or YAML scenario file, with defaults filled in
+    '''
+    with open( filename ) as f:
+        if filename.endswith( ( '.yaml', '.yml' ) ):
+            if yaml is None:
+                raise ValueError( 'Reading YAML scenarios requires PyYAML' )
+            scenario = yaml.safe_load( f )
+        else:
+            scenario = json.load( f )
+
+    _scenario = null_scenario()
+
+    for key in scenario.keys():
+        _scenario[ key ] = scenario[ key ]
+
+    for key in _scenario[ 'outputs' ]:
+        if key not in OUTPUTS:
+            raise ValueError( 'Unknown output: %s' % key )
+
+    if _scenario[ 'format' ] not in FORMATS:
+        raise ValueError( 'Unknown output format: %s' % _scenario[ 'format' ] )
+
+    for key in _scenario[ 'plots' ]:
+        if key not in PLOTS:
+            raise ValueError( 'Unknown plot: %s' % key )
+
+    return _scenario
+
+def resolve_config( config ):
+    '''
+    Returns a Spacecraft configuration with planetary_data names replaced
+    by their dictionaries
+    '''
+    config = dict( config )
+
+    if isinstance( config.get( 'cb' ), str ):
+        name = config[ 'cb' ].lower()
+        if not isinstance( getattr( pd, name, None ), dict ):
+            raise ValueError( 'Unknown central body: %s' % config[ 'cb' ] )
+        config[ 'cb' ] = getattr( pd, name )
+
+    return config
+
+def scenario_jobs( scenario, output_dir ):
+    '''
+    Returns one job dictionary per spacecraft of a scenario
+    '''
+    jobs = []
+
+    for index, entry in enumerate( scenario[ 'spacecraft' ] ):
+        config = dict( scenario[ 'defaults' ], **entry )
+        name   = str( config.pop( 'name', 'spacecraft_%d' % index ) )
+
+        jobs.append( {
+            'name'       : name,
+            'config'     : resolve_config( config ),
+            'outputs'    : scenario[ 'outputs' ],
+            'format'     : scenario[ 'format' ],
+            'plots'      : scenario[ 'plots' ],
+            'output_dir' : output_dir
+        } )
+
+    names = [ job[ 'name' ] for job in jobs ]
+    if len( set( names ) ) < len( names ):
+        raise ValueError( 'Spacecraft names must be unique' )
+
+    return jobs
+
+def write_results( sc, job ):
+    '''
+    Writes the requested outputs of a propagated Spacecraft, returning
+    the files written
+    '''
+    arrays = { 'times' : np.asarray( sc.times ) }
+
+    if 'states' in job[ 'outputs' ]:
+        arrays[ 'states' ] = np.asarray( sc.states )
+    if 'coes' in job[ 'outputs' ]:
+        sc.calc_coes()
+        arrays[ 'coes' ] = sc.coes
+    if 'latlons' in job[ 'outputs' ]:
+        sc.calc_latlons()
+        arrays[ 'latlons' ] = sc.latlons
+
+    base = os.path.join( job[ 'output_dir' ], job[ 'name' ] )
+
+    if job[ 'format' ] == 'npz':
+        np.savez( base + '.npz', **arrays )
+        return [ base + '.npz' ]
+
+    # One CSV per output, with the times as first column
+    files = []
+    for key, values in arrays.items():
+        if key == 'times':
+            continue
+
+        filename = '%s_%s.csv' % ( base, key )
+        np.savetxt( filename, np.column_stack( ( arrays[ 'times' ], values ) ),
+                    delimiter = ',', header = 'time,' + ','.join(
+                        '%s_%d' % ( key, n ) for n in range( values.shape[ 1 ] ) ),
+                    comments = '' )
+        files.append( filename )
+
+    return files
+
+def run_job( job ):
+    '''
+    Propagates one spacecraft and writes its results and figures.
+    Returns a summary: name, n_steps, elapsed (s) and files.
+    '''
+    start = time.perf_counter()
+    sc    = Spacecraft( dict( job[ 'config' ], propagate = True ) )
+    files = write_results( sc, job )
+
+    for key in job[ 'plots' ]:
+        filename = os.path.join( job[ 'output_dir' ], '%s_%s.png' % ( job[ 'name' ], key ) )
+        plot     = getattr( sc, PLOTS[ key ] )
+
+        if key == '3d':
+            plot( label = [ job[ 'name' ] ], args = { 'show' : False, 'filename' : filename } )
+        else:
+            plot( args = { 'show' : False, 'filename' : filename } )
+
+        files.append( filename )
+
+    return {
+        'name'    : job[ 'name' ],
+        'n_steps' : int( sc.n_steps ),
+        'elapsed' : time.perf_counter() - start,
+        'files'   : files
+    }
+
+def run_jobs( jobs, n_workers = 1 ):
+    '''
+    Runs jobs on a process pool (in process for n_workers = 1), longest
+    estimated first, logging progress and per-job timing. Returns the
+    job summaries in completion order; failed jobs carry an 'error'.
+    '''
+    costs = []
+    for job in jobs:
+        try:
+            costs.append( batch.estimate_cost( job[ 'config' ] ) )
+        except Exception:
+            costs.append( 0.0 )
+
+    order   = np.argsort( -np.array( costs ), kind = 'stable' )
+    jobs    = [ jobs[ index ] for index in order ]
+    results = []
+
+    def finished( job, result = None, error = None ):
+        if error is None:
+            logger.info( '[%d/%d] %s: %d steps in %.2f s', len( results ) + 1, len( jobs ),
+                         job[ 'name' ], result[ 'n_steps' ], result[ 'elapsed' ] )
+        else:
+            result = { 'name' : job[ 'name' ], 'error' : repr( error ) }
+            logger.error( '[%d/%d] %s failed: %r', len( results ) + 1, len( jobs ), job[ 'name' ], error )
+
+        results.append( result )
+
+    if n_workers <= 1:
+        for job in jobs:
+            try:
+                finished( job, run_job( job ) )
+            except Exception as error:
+                finished( job, error = error )
+        return results
+
+    with ProcessPoolExecutor( max_workers = n_workers ) as executor:
+        futures = { executor.submit( run_job, job ) : job for job in jobs }
+
+        for future in as_completed( futures ):
+            try:
+                finished( futures[ future ], future.result() )
+            except Exception as error:
+                finished( futures[ future ], error = error )
+
+    return results
+
+def main( argv = None ):
+    parser = argparse.ArgumentParser( description = 'Propagate the spacecraft of scenario files' )
+    parser.add_argument( 'scenarios', nargs = '+', help = 'JSON or YAML scenario files' )
+    parser.add_argument( '-o', '--output-dir', default = 'results',
+                         help = 'directory for results and figures (default: results)' )
+    parser.add_argument( '-w', '--workers', type = int, default = os.cpu_count(),
+                         help = 'number of worker processes (default: CPU count)' )
+    parser.add_argument( '-f', '--format', choices = FORMATS,
+                         help = 'output format, overriding the scenario files' )
+    parser.add_argument( '--plots', action = 'store_true',
+                         help = 'render the figures listed in the scenario files' )
+    parser.add_argument( '--log-level', default = 'INFO',
+                         choices = [ 'DEBUG', 'INFO', 'WARNING', 'ERROR' ] )
+    args = parser.parse_args( argv )
+
+    logging.basicConfig( level = args.log_level,
+                         format = '%(asctime)s %(levelname)s %(name)s: %(message)s' )
+
+    jobs = []
+    for filename in args.scenarios:
+        scenario = load_scenario( filename )
+
+        if args.format:
+            scenario[ 'format' ] = args.format
+        if not args.plots:
+            scenario[ 'plots' ] = []
+
+        # Each scenario writes into its own subdirectory
+        name       = os.path.splitext( os.path.basename( filename ) )[ 0 ]
+        output_dir = os.path.join( args.output_dir, name )
+        os.makedirs( output_dir, exist_ok = True )
+
+        jobs += scenario_jobs( scenario, output_dir )
+
+    logger.info( 'Running %d jobs on %d workers', len( jobs ), args.workers )
+
+    start   = time.perf_counter()
+    results = run_jobs( jobs, args.workers )
+    failed  = [ result for result in results if 'error' in result ]
+
+    logger.info( 'Finished %d jobs in %.2f s (%d failed)',
+                 len( results ), time.perf_counter() - start, len( failed ) )
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit( main() )
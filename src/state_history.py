@@ -0,0 +1,103 @@
+'''
+State History
+
+Growable, preallocated storage of a trajectory's times and states.
+Appending amortizes reallocation by doubling the capacity, and times /
+states are exposed as views over the filled part of the buffers, so
+trajectories assembled from many segments are never concatenated by
+copying.
+
+States may be stored at reduced precision (e.g. float32). The last state
+of every append is also kept at float64, so integration restarted from
+the end of the history (chunks, segments) does not start from a rounded
+state.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+
+class StateHistory:
+
+    def __init__( self, capacity = 1024, n_states = 6, dtype = np.float64 ):
+        self.size    = 0
+        self._times  = np.empty( capacity )
+        self._states = np.empty( ( capacity, n_states ), dtype = dtype )
+
+        # Index of the last sample of each append -> its float64 state
+        self.end_states = {}
+
+    @property
+    def capacity( self ):
+        return self._times.shape[ 0 ]
+
+    @property
+    def times( self ):
+        '''
+        View of the stored times (shape: [size])
+        '''
+        return self._times[ :self.size ]
+
+    @property
+    def states( self ):
+        '''
+        View of the stored states (shape: [size, n_states])
+        '''
+        return self._states[ :self.size ]
+
+    def reserve( self, capacity ):
+        '''
+        Grows the buffers to hold at least capacity samples
+        '''
+        if capacity <= self.capacity:
+            return
+
+        capacity = max( capacity, 2 * self.capacity )
+        times    = np.empty( capacity )
+        states   = np.empty( ( capacity, ) + self._states.shape[ 1: ], dtype = self._states.dtype )
+
+        times[ :self.size ]  = self._times[ :self.size ]
+        states[ :self.size ] = self._states[ :self.size ]
+
+        self._times  = times
+        self._states = states
+
+    @property
+    def last_state( self ):
+        '''
+        Float64 copy of the last state, to restart integration from
+        '''
+        state = self.end_states.get( self.size - 1 )
+
+        if state is None:
+            return self.states[ -1 ].astype( np.float64 )
+
+        return state.copy()
+
+    def append( self, times, states, end_state = None ):
+        '''
+        Appends samples and returns the slice of the history they occupy.
+        end_state is the full precision last state, if states were
+        already rounded.
+        '''
+        n     = len( times )
+        start = self.size
+        self.reserve( start + n )
+
+        self._times[ start:start + n ]  = times
+        self._states[ start:start + n ] = states
+        self.size = start + n
+
+        if n:
+            if end_state is None:
+                end_state = states[ -1 ]
+            self.end_states[ self.size - 1 ] = np.array( end_state, dtype = np.float64 )
+
+        return slice( start, self.size )
+
+    def truncate( self, size ):
+        '''
+        Discards every sample from index size on (the buffers are kept)
+        '''
+        self.size       = min( self.size, size )
+        self.end_states = { index : state for index, state in self.end_states.items() if index < self.size }
@@ -0,0 +1,184 @@
+'''
+State History Storage
+
+Storage policies for propagated state histories, shared by Spacecraft
+and the batch runners:
+
+- 'contiguous': store states as a C-contiguous (steps, 6) array and
+                release the solver output they were taken from
+- 'dtype'     : storage precision, e.g. 'float32' to halve memory
+- 'cadence'   : keep outputs at a fixed cadence (s) only
+
+plus a compact archive format, where states are quantized to a fixed
+resolution, delta-encoded along time and compressed.
+'''
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import propagation_cache as pc
+
+ARCHIVE_VERSION = 1
+
+# Default quantization of archived [ rx, ry, rz, vx, vy, vz ]: 1 mm, 1 um/s
+DEFAULT_RESOLUTION = [ 1e-6 ] * 3 + [ 1e-9 ] * 3
+
+
+def null_policy():
+    return {
+        'contiguous' : False,
+        'dtype'      : 'float64',
+        'cadence'    : None
+    }
+
+def storage_policy( policy = {} ):
+    '''
+    Returns a complete storage policy with defaults filled in
+    '''
+    _policy = null_policy()
+
+    for key in policy.keys():
+        _policy[ key ] = policy[ key ]
+
+    return _policy
+
+def cadence_times( t0, t1, cadence ):
+    '''
+    Returns the multiples of cadence within [ t0, t1 ], plus t1
+    '''
+    times = cadence * np.arange( np.ceil( t0 / cadence ), np.floor( t1 / cadence ) + 1 )
+
+    return np.union1d( times[ times >= t0 ], [ t1 ] )
+
+def decimate( times, cadence ):
+    '''
+    Returns the indices of the samples kept when decimating an irregular
+    time history to one sample per cadence interval (the first sample
+    in each interval, plus the final sample)
+    '''
+    times = np.asarray( times )
+
+    # Tolerance keeps samples already on the cadence in separate bins
+    bins  = np.floor( ( times - times[ 0 ] ) / cadence + 1e-9 ).astype( np.int64 )
+    keep  = np.ones( times.shape[ 0 ], dtype = bool )
+    keep[ 1: ] = bins[ 1: ] != bins[ :-1 ]
+    keep[ -1 ] = True
+
+    return np.flatnonzero( keep )
+
+def apply_policy( times, states, policy = {}, axis = 0 ):
+    '''
+    Returns ( times, states ) stored according to a storage policy.
+    states may carry leading batch dimensions, with time along axis.
+    '''
+    policy = storage_policy( policy )
+    times  = np.asarray( times )
+
+    if policy[ 'cadence' ] is not None:
+        index = decimate( times, policy[ 'cadence' ] )
+
+        if index.shape[ 0 ] < times.shape[ 0 ]:
+            times  = times[ index ]
+            states = np.take( states, index, axis = axis )
+
+    if policy[ 'contiguous' ] or np.dtype( policy[ 'dtype' ] ) != states.dtype:
+        states = np.ascontiguousarray( states, dtype = policy[ 'dtype' ] )
+
+    return times, states
+
+def _smallest_int( values ):
+    '''
+    Casts integer values to the narrowest signed type holding them
+    '''
+    if values.size == 0:
+        return values.astype( np.int8 )
+
+    bound = max( -int( values.min() ), int( values.max() ) )
+
+    for dtype in ( np.int8, np.int16, np.int32 ):
+        if bound <= np.iinfo( dtype ).max:
+            return values.astype( dtype )
+
+    return values
+
+def encode_deltas( values, resolution, order = 2 ):
+    '''
+    Quantizes values (shape: [steps, ...]) to resolution and takes order
+    successive differences along time. The first sample of each difference
+    level is kept, so the encoding is invertible by decode_deltas.
+    '''
+    q     = np.round( np.asarray( values, dtype = float ) / resolution ).astype( np.int64 )
+    heads = []
+
+    for _ in range( order ):
+        heads.append( q[ :1 ] )
+        q = np.diff( q, axis = 0 )
+
+    return np.concatenate( heads + [ q ] )
+
+def decode_deltas( encoded, resolution, order = 2 ):
+    '''
+    Inverts encode_deltas (exact up to the quantization resolution)
+    '''
+    q = np.asarray( encoded, dtype = np.int64 )
+
+    # Integrate from the highest difference level down
+    for level in range( order - 1, -1, -1 ):
+        q = np.concatenate( ( q[ :level ], np.cumsum( q[ level: ], axis = 0 ) ) )
+
+    return q * resolution
+
+def save_archive( filename, times, states, args = {} ):
+    '''
+    Writes a compressed, delta-encoded archive of a state history.
+
+    Parameters:
+    - times : Times in seconds (shape: [steps])
+    - states: States (shape: [steps, 6])
+    - args  : { 'resolution'      : per-component quantization (km, km/s),
+                'time_resolution' : time quantization (s),
+                'order'           : order of the time differences }
+    '''
+    _args = {
+        'resolution'      : DEFAULT_RESOLUTION,
+        'time_resolution' : 1e-6,
+        'order'           : 2
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    resolution = np.asarray( _args[ 'resolution' ], dtype = float )
+    order      = min( _args[ 'order' ], len( times ) )
+
+    encoded_states = encode_deltas( states, resolution, order )
+    encoded_times  = encode_deltas( times, _args[ 'time_resolution' ], order )
+
+    pc.save_npz( filename, compressed = True,
+        version         = ARCHIVE_VERSION,
+        order           = order,
+        resolution      = resolution,
+        time_resolution = _args[ 'time_resolution' ],
+        heads           = encoded_states[ :order ],
+        deltas          = _smallest_int( encoded_states[ order: ] ),
+        time_heads      = encoded_times[ :order ],
+        time_deltas     = _smallest_int( encoded_times[ order: ] )
+    )
+
+def load_archive( filename ):
+    '''
+    Returns ( times, states ) from an archive written by save_archive
+    '''
+    with np.load( filename ) as data:
+        if int( data[ 'version' ] ) != ARCHIVE_VERSION:
+            raise ValueError( 'Unsupported archive version: %d' % data[ 'version' ] )
+
+        order  = int( data[ 'order' ] )
+        states = decode_deltas(
+            np.concatenate( ( data[ 'heads' ], data[ 'deltas' ] ) ), data[ 'resolution' ], order )
+        times  = decode_deltas(
+            np.concatenate( ( data[ 'time_heads' ], data[ 'time_deltas' ] ) ),
+            float( data[ 'time_resolution' ] ), order )
+
+    return times, states
@@ -0,0 +1,236 @@
+'''
+Transfer Design Tools
+
+Vectorized Lambert solver and porkchop plot grid generation
+'''
+
+# Python Standard Libraries
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data as pd
+import orbit_calcs    as oc
+import plotting_tools as pt
+
+
+def lambert_universal_variables( r0s, r1s, tofs, mu, args = {} ):
+    '''
+    Solves Lambert's problem for arrays of boundary value problems at once
+    using universal variables (Curtis Algorithm 5.2).
+
+    Parameters:
+    - r0s : Initial position vectors (shape: [N, 3] or [3])
+    - r1s : Final position vectors (shape: [N, 3] or [3])
+    - tofs: Times of flight in seconds (shape: [N] or scalar)
+    - mu  : Gravitational parameter of the central body
+
+    Returns:
+    - v0s, v1s: Departure and arrival velocity vectors (shape: [N, 3]).
+      Entries that could not be solved (non-positive tof, 180 deg transfer)
+      are returned as NaN.
+    '''
+    _args = {
+        'prograde' : True,
+        'max_iter' : 100,
+        'z_min'    : -4 * np.pi**2 * 100,
+        'tol'      : 1e-10
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    r0s  = np.atleast_2d( np.asarray( r0s, dtype = float ) )
+    r1s  = np.atleast_2d( np.asarray( r1s, dtype = float ) )
+    tofs = np.atleast_1d( np.asarray( tofs, dtype = float ) )
+    r0s, r1s = np.broadcast_arrays( r0s, r1s )
+    tofs     = np.broadcast_to( tofs, r0s.shape[ :1 ] )
+
+    r0 = np.linalg.norm( r0s, axis = 1 )
+    r1 = np.linalg.norm( r1s, axis = 1 )
+
+    # Change in true anomaly, selecting the transfer direction
+    cos_dta = np.clip( np.sum( r0s * r1s, axis = 1 ) / ( r0 * r1 ), -1.0, 1.0 )
+    cross_z = r0s[ :, 0 ] * r1s[ :, 1 ] - r0s[ :, 1 ] * r1s[ :, 0 ]
+    dta     = np.arccos( cos_dta )
+
+    if _args[ 'prograde' ]:
+        dta = np.where( cross_z < 0, 2 * np.pi - dta, dta )
+    else:
+        dta = np.where( cross_z >= 0, 2 * np.pi - dta, dta )
+
+    with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+        A = np.sin( dta ) * np.sqrt( r0 * r1 / ( 1 - np.cos( dta ) ) )
+
+    sqrt_mu = np.sqrt( mu )
+
+    def y_func( z ):
+        C = oc.stumpff_C( z )
+        S = oc.stumpff_S( z )
+        return r0 + r1 + A * ( z * S - 1 ) / np.sqrt( C ), C, S
+
+    # Time of flight is monotonically increasing in z, so bracket the root
+    # between z_min and the single revolution limit (4 pi^2) and bisect all
+    # problems simultaneously
+    z_lo = np.full( r0.shape, _args[ 'z_min' ] )
+    z_hi = np.full( r0.shape, 4 * np.pi**2 - 1e-9 )
+
+    for _ in range( _args[ 'max_iter' ] ):
+        z       = 0.5 * ( z_lo + z_hi )
+        y, C, S = y_func( z )
+        with np.errstate( invalid = 'ignore' ):
+            t = ( ( y / C )**1.5 * S + A * np.sqrt( y ) ) / sqrt_mu
+
+        # Negative y means z is too small
+        too_small = ( y < 0 ) | ( t < tofs )
+        z_lo      = np.where( too_small, z, z_lo )
+        z_hi      = np.where( too_small, z_hi, z )
+
+        if np.all( ( z_hi - z_lo ) < _args[ 'tol' ] ):
+            break
+
+    z       = 0.5 * ( z_lo + z_hi )
+    y, C, S = y_func( z )
+
+    # Lagrange coefficients
+    with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+        f    = 1 - y / r0
+        g    = A * np.sqrt( y / mu )
+        gdot = 1 - y / r1
+
+        v0s = ( r1s - f[ :, None ] * r0s ) / g[ :, None ]
+        v1s = ( gdot[ :, None ] * r1s - r0s ) / g[ :, None ]
+
+    invalid = ( tofs <= 0 ) | ~np.isfinite( A ) | ( np.abs( A ) < 1e-12 ) | ( y < 0 )
+    v0s[ invalid ] = np.nan
+    v1s[ invalid ] = np.nan
+
+    return v0s, v1s
+
+def circular_ephemeris( body, times, args = {} ):
+    '''
+    Returns heliocentric states of a body on a circular, coplanar orbit
+    of radius body[ 'sma' ] (shape: [steps, 6]).
+
+    The mean longitude at t = 0 is taken from args[ 'phases' ][ body[ 'name' ] ],
+    defaulting to zero.
+    '''
+    _args = {
+        'mu'     : pd.sun[ 'mu' ],
+        'phases' : {}
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    times = np.atleast_1d( np.asarray( times, dtype = float ) )
+    sma   = body[ 'sma' ]
+    n     = np.sqrt( _args[ 'mu' ] / sma**3 )
+    theta = _args[ 'phases' ].get( body[ 'name' ], 0.0 ) + n * times
+    v     = n * sma
+
+    states = np.zeros( ( times.shape[ 0 ], 6 ) )
+    states[ :, 0 ] =  sma * np.cos( theta )
+    states[ :, 1 ] =  sma * np.sin( theta )
+    states[ :, 3 ] = -v   * np.sin( theta )
+    states[ :, 4 ] =  v   * np.cos( theta )
+
+    return states
+
+def _porkchop_block( states_dep, states_arr, dep_times, arr_times, mu, lambert_args ):
+    '''
+    Computes C3 and arrival v-infinity for a block of departure rows
+    against every arrival time. Module level so it can run in a worker process.
+    '''
+    n_dep = states_dep.shape[ 0 ]
+    n_arr = states_arr.shape[ 0 ]
+
+    r0s  = np.repeat( states_dep[ :, :3 ], n_arr, axis = 0 )
+    r1s  = np.tile(   states_arr[ :, :3 ], ( n_dep, 1 ) )
+    tofs = ( arr_times[ None, : ] - dep_times[ :, None ] ).ravel()
+
+    v0s, v1s = lambert_universal_variables( r0s, r1s, tofs, mu, lambert_args )
+
+    vinf_dep = v0s - np.repeat( states_dep[ :, 3: ], n_arr, axis = 0 )
+    vinf_arr = v1s - np.tile(   states_arr[ :, 3: ], ( n_dep, 1 ) )
+
+    c3s   = np.sum( vinf_dep**2, axis = 1 ).reshape( n_dep, n_arr )
+    vinfs = np.linalg.norm( vinf_arr, axis = 1 ).reshape( n_dep, n_arr )
+
+    return c3s, vinfs
+
+def porkchop_grid( body0, body1, dep_times, arr_times, args = {} ):
+    '''
+    Computes departure C3 and arrival v-infinity over a grid of departure
+    and arrival times (seconds).
+
+    The departure rows are split into chunks that are solved in a process
+    pool, each chunk being a single vectorized Lambert call.
+
+    Returns:
+    - c3s  : Departure C3 in km^2/s^2 (shape: [n_dep, n_arr])
+    - vinfs: Arrival v-infinity in km/s (shape: [n_dep, n_arr])
+    '''
+    _args = {
+        'mu'             : pd.sun[ 'mu' ],
+        'ephemeris'      : circular_ephemeris,
+        'ephemeris_args' : {},
+        'lambert_args'   : {},
+        'n_workers'      : os.cpu_count(),
+        'chunk_size'     : None
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    dep_times = np.asarray( dep_times, dtype = float )
+    arr_times = np.asarray( arr_times, dtype = float )
+
+    states_dep = _args[ 'ephemeris' ]( body0, dep_times, _args[ 'ephemeris_args' ] )
+    states_arr = _args[ 'ephemeris' ]( body1, arr_times, _args[ 'ephemeris_args' ] )
+
+    n_workers = max( 1, _args[ 'n_workers' ] or 1 )
+    n_dep     = dep_times.shape[ 0 ]
+
+    if _args[ 'chunk_size' ] is None:
+        chunk_size = max( 1, int( np.ceil( n_dep / ( 4 * n_workers ) ) ) )
+    else:
+        chunk_size = _args[ 'chunk_size' ]
+
+    slices = [ slice( i, i + chunk_size ) for i in range( 0, n_dep, chunk_size ) ]
+    blocks = [
+        ( states_dep[ s ], states_arr, dep_times[ s ], arr_times,
+          _args[ 'mu' ], _args[ 'lambert_args' ] )
+        for s in slices
+    ]
+
+    if n_workers == 1 or len( blocks ) == 1:
+        results = [ _porkchop_block( *block ) for block in blocks ]
+    else:
+        with ProcessPoolExecutor( max_workers = n_workers ) as executor:
+            results = list( executor.map( _porkchop_block, *zip( *blocks ) ) )
+
+    c3s   = np.vstack( [ result[ 0 ] for result in results ] )
+    vinfs = np.vstack( [ result[ 1 ] for result in results ] )
+
+    return c3s, vinfs
+
+def plot_porkchop( body0, body1, dep_times, arr_times, args = {} ):
+    '''
+    Computes the porkchop grid and plots the C3 / v-infinity contours
+    '''
+    c3s, vinfs = porkchop_grid( body0, body1, dep_times, arr_times, args )
+
+    plot_args = {
+        'title' : '%s to %s' % ( body0[ 'name' ], body1[ 'name' ] )
+    }
+
+    for key in args.get( 'plot_args', {} ).keys():
+        plot_args[ key ] = args[ 'plot_args' ][ key ]
+
+    pt.plot_porkchop( dep_times, arr_times, c3s, vinfs, plot_args )
+
+    return c3s, vinfs
@@ -0,0 +1,220 @@
+'''
+Integrator Tolerance Tuning
+
+Runs a propagation scenario across integrators and a sweep of
+tolerances, measures the position error of each run against an analytic
+Kepler solution (two-body scenarios) or a tight-tolerance DOP853
+reference, and reports the Pareto front of wall time versus error
+together with the cheapest configuration meeting a target accuracy.
+
+The recommendation can be saved as JSON and merged into a Spacecraft
+configuration:
+
+    tuned = tuning.load_recommendation( 'tuned.json' )
+    sc    = Spacecraft( dict( config, **tuned ) )
+'''
+
+# Python Standard Libraries
+import json
+import logging
+import time
+
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import orbit_calcs as oc
+
+logger = logging.getLogger( __name__ )
+
+
+def _run( config, t_eval ):
+    '''
+    Propagates a configuration on t_eval, returning ( states, seconds, nfev ).
+    Raises RuntimeError if the integration stopped before the last sample.
+    '''
+    sc    = Spacecraft( dict( config, t_eval = t_eval, propagate = False, cache = False ) )
+    start = time.perf_counter()
+    sc.propagate_orbit()
+    elapsed = time.perf_counter() - start
+
+    if sc.times[ -1 ] < t_eval[ -1 ]:
+        message = sc.ode_sol.message if sc.ode_sol is not None else 'no solver message'
+        raise RuntimeError( 'Integration stopped early at t = %.6g s: %s' % ( sc.times[ -1 ], message ) )
+
+    nfev = sc.ode_sol.nfev if sc.ode_sol is not None else -1
+
+    # Maneuver plans also store the segment ends (each maneuver time
+    # twice); keep the last sample at each t_eval time, after any burn
+    k = np.searchsorted( sc.times, t_eval, side = 'right' ) - 1
+
+    return sc.states[ k ], elapsed, nfev
+
+def reference_states( config, t_eval, args = {} ):
+    '''
+    Returns the reference trajectory on t_eval and its kind: the analytic
+    Kepler solution for unperturbed coasts, otherwise DOP853 at
+    args[ 'reference_tol' ]
+    '''
+    _args = {
+        'reference'     : 'auto',
+        'reference_tol' : 1e-13
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    sc = Spacecraft( dict( config, propagate = False ) )
+
+    two_body = not any( sc.orbit_perts.values() ) and not sc.maneuvers
+
+    if _args[ 'reference' ] == 'kepler' or ( _args[ 'reference' ] == 'auto' and two_body ):
+        if not two_body:
+            raise ValueError( 'A Kepler reference requires an unperturbed coast' )
+        return oc.kepler_universal( sc.state0, t_eval, sc.cb.mu ), 'kepler'
+
+    tol = _args[ 'reference_tol' ]
+    states, _, _ = _run( dict( config, propagator = 'DOP853', rtol = tol, atol = tol ), t_eval )
+
+    return states, 'DOP853 %.0e' % tol
+
+def pareto_front( results ):
+    '''
+    Returns the runs not beaten in both wall time and error, fastest first
+    '''
+    front = []
+    best  = np.inf
+
+    for result in sorted( results, key = lambda result: result[ 'time' ] ):
+        if result[ 'error' ] < best:
+            front.append( result )
+            best = result[ 'error' ]
+
+    return front
+
+def tune_tolerances( config, args = {} ):
+    '''
+    Sweeps integrators and tolerances for a Spacecraft configuration.
+
+    Parameters:
+    - config: Spacecraft configuration of the scenario
+    - args  : { 'methods'      : solve_ivp methods to try,
+                'tolerances'   : rtol values to sweep,
+                'atol_ratio'   : atol = atol_ratio * rtol,
+                'target_error' : required max position error (km),
+                'n_samples'    : comparison points over tspan,
+                'repeats'      : timing repeats (the fastest is kept),
+                'reference', 'reference_tol' : see reference_states }
+
+    Returns a dictionary:
+    - 'results'    : one dictionary per run (method, rtol, atol, time,
+                     error, nfev, and the error message of failed runs)
+    - 'pareto'     : Pareto front of time versus error
+    - 'recommended': cheapest run with error <= target_error, or None
+    - 'config'     : { 'propagator', 'rtol', 'atol' } of the recommendation
+    - 'reference'  : kind of reference used
+    '''
+    _args = {
+        'methods'       : [ 'RK45', 'DOP853', 'Radau', 'LSODA' ],
+        'tolerances'    : np.logspace( -4, -12, 9 ),
+        'atol_ratio'    : 1.0,
+        'target_error'  : 1e-3,
+        'n_samples'     : 200,
+        'repeats'       : 1,
+        'reference'     : 'auto',
+        'reference_tol' : 1e-13
+    }
+
+    for key in args.keys():
+        _args[ key ] = args[ key ]
+
+    sc = Spacecraft( dict( config, propagate = False ) )
+
+    if sc.config[ 'formulation' ] != 'cowell' or sc.config[ 'stm' ]:
+        raise ValueError( 'Tolerance tuning requires the cowell formulation without STM' )
+
+    config = dict( config, tspan = sc.config[ 'tspan' ] )
+    t_eval = np.linspace( 0, config[ 'tspan' ], _args[ 'n_samples' ] )
+
+    reference, kind = reference_states( config, t_eval, _args )
+    results = []
+
+    for method in _args[ 'methods' ]:
+        for rtol in _args[ 'tolerances' ]:
+            atol = rtol * _args[ 'atol_ratio' ]
+            run  = dict( config, propagator = method, rtol = rtol, atol = atol )
+
+            message = None
+
+            # Runs that stop early (e.g. step size too small at tight
+            # tolerances) are kept with infinite time and error
+            try:
+                timings = [ _run( run, t_eval ) for _ in range( _args[ 'repeats' ] ) ]
+                states, _, nfev = timings[ 0 ]
+                elapsed = min( timing[ 1 ] for timing in timings )
+                error   = np.linalg.norm( states[ :, :3 ] - reference[ :, :3 ], axis = 1 ).max()
+            except RuntimeError as exc:
+                elapsed, error, nfev = np.inf, np.inf, -1
+                message = str( exc )
+                logger.warning( '%s at rtol %.1e: %s', method, rtol, message )
+
+            results.append( {
+                'method'  : method,
+                'rtol'    : float( rtol ),
+                'atol'    : float( atol ),
+                'time'    : elapsed,
+                'error'   : float( error ),
+                'nfev'    : nfev,
+                'message' : message
+            } )
+
+    meeting     = [ result for result in results if result[ 'error' ] <= _args[ 'target_error' ] ]
+    recommended = min( meeting, key = lambda result: result[ 'time' ] ) if meeting else None
+
+    return {
+        'results'     : results,
+        'pareto'      : pareto_front( results ),
+        'recommended' : recommended,
+        'config'      : None if recommended is None else {
+            'propagator' : recommended[ 'method' ],
+            'rtol'       : recommended[ 'rtol' ],
+            'atol'       : recommended[ 'atol' ]
+        },
+        'reference'   : kind
+    }
+
+def print_tuning_report( tuning ):
+    '''
+    Prints the Pareto front and the recommended configuration
+    '''
+    print( 'Reference: %s' % tuning[ 'reference' ] )
+    print( '%-8s %9s %9s %11s %12s %8s' % ( 'method', 'rtol', 'atol', 'time (s)', 'error (km)', 'nfev' ) )
+
+    for result in tuning[ 'pareto' ]:
+        print( '%-8s %9.1e %9.1e %11.4f %12.3e %8d' % (
+            result[ 'method' ], result[ 'rtol' ], result[ 'atol' ],
+            result[ 'time' ], result[ 'error' ], result[ 'nfev' ] ) )
+
+    if tuning[ 'recommended' ] is None:
+        print( 'No configuration met the target error' )
+    else:
+        print( 'Recommended:', tuning[ 'config' ] )
+
+def save_recommendation( filename, tuning ):
+    '''
+    Writes the recommended { 'propagator', 'rtol', 'atol' } as JSON
+    '''
+    if tuning[ 'config' ] is None:
+        raise ValueError( 'No configuration met the target error' )
+
+    with open( filename, 'w' ) as f:
+        json.dump( tuning[ 'config' ], f, indent = 4 )
+
+def load_recommendation( filename ):
+    '''
+    Reads a recommendation written by save_recommendation, ready to be
+    merged into a Spacecraft configuration
+    '''
+    with open( filename ) as f:
+        return json.load( f )
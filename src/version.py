@@ -0,0 +1,5 @@
+'''
+Package version
+'''
+
+__version__ = '0.2.0'
@@ -0,0 +1,32 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import batch
+
+
+BASE = {
+    'coes'  : [ 7000.0, 0.3, 30.0, 0.0, 0.0, 0.0 ],
+    'rtol'  : 1e-10,
+    'atol'  : 1e-10
+}
+
+@pytest.mark.parametrize( 'formulation', [ 'encke', 'sundman' ] )
+def test_formulations_fill_the_grid( formulation ):
+    times   = np.linspace( 0, 20000.0, 41 )
+    configs = [ dict( BASE, formulation = 'cowell' ), dict( BASE, formulation = formulation ) ]
+    states  = batch.propagate_batch( configs, times, { 'n_workers' : 1 } )
+
+    assert not np.isnan( states ).any()
+    assert np.abs( states[ 1, :, :3 ] - states[ 0, :, :3 ] ).max() < 1e-3
+
+def test_workers_match_in_process():
+    times   = np.linspace( 0, 10000.0, 21 )
+    configs = [ dict( BASE, coes = [ 7000.0 + 500 * k, 0.01, 45.0, 0.0, 0.0, 0.0 ] )
+                for k in range( 3 ) ]
+
+    serial   = batch.propagate_batch( configs, times, { 'n_workers' : 1 } )
+    parallel = batch.propagate_batch( configs, times, { 'n_workers' : 2 } )
+
+    assert np.array_equal( serial, parallel )
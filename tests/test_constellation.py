@@ -0,0 +1,44 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import constellation as cs
+
+
+def test_walker_delta_pattern():
+    coes = cs.walker_elements( 6, 3, 1, 7000.0, 55.0 )
+
+    assert np.array_equal( coes[ :, 3 ], [ 0, 0, 120, 120, 240, 240 ] )
+    assert np.array_equal( coes[ :, 5 ], [ 0, 180, 60, 240, 120, 300 ] )
+
+    with pytest.raises( ValueError ):
+        cs.walker_elements( 7, 3, 1, 7000.0, 55.0 )
+
+@pytest.mark.parametrize( 'args, tolerance', [
+    ( { 'propagator' : 'DOP853', 'rtol' : 1e-10, 'atol' : 1e-10 }, 1e-5 ),
+    ( { 'propagator' : 'yoshida6', 'dt' : 10.0 }, 1e-4 ) ] )
+def test_batch_propagation_matches_single_spacecraft( args, tolerance ):
+    coes   = cs.walker_elements( 4, 2, 1, 7000.0, 55.0 )
+    times  = np.linspace( 0, 6000.0, 31 )
+    states = cs.propagate_constellation( coes, times, dict( args, orbit_perts = { 'J2' : True } ) )
+
+    single = Spacecraft( { 'coes' : list( coes[ 3 ] ), 'tspan' : times[ -1 ], 't_eval' : times,
+                           'orbit_perts' : { 'J2' : True }, 'propagator' : 'DOP853',
+                           'rtol' : 1e-12, 'atol' : 1e-12, 'cache' : False } )
+
+    assert states.shape == ( 4, 31, 6 )
+    assert np.abs( states[ 3, :, :3 ] - single.states[ :, :3 ] ).max() < tolerance
+
+def test_visibility_counts_overhead_satellites():
+    times  = np.array( [ 0.0 ] )
+    coes   = cs.walker_elements( 2, 1, 0, 7000.0, 0.0 )
+    states = cs.propagate_constellation( coes, times, { 'method' : 'mean' } )
+
+    # Both satellites are on the equator, 180 deg apart: no point sees both
+    counts = cs.visibility( states, times, *cs.latlon_grid( 10.0, 10.0 ) )
+
+    assert counts.max() == 1
+    assert counts[ :, 0 ].max() == 0
+    assert 0 < ( counts > 0 ).mean() < 0.5
@@ -0,0 +1,36 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import covariance as cov
+
+
+CONFIG = {
+    'coes'       : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+    'propagator' : 'DOP853',
+    'rtol'       : 1e-11,
+    'atol'       : 1e-11
+}
+
+def test_linear_and_unscented_agree_on_a_two_body_arc():
+    cov0   = np.diag( [ 1e-3 ] * 3 + [ 1e-9 ] * 3 )
+    epochs = np.linspace( 0, 1800.0, 7 )
+
+    means_lin, covs_lin = cov.propagate_covariance( CONFIG, cov0, epochs, { 'method' : 'linear' } )
+    means_ut,  covs_ut  = cov.propagate_covariance( CONFIG, cov0, epochs, { 'method' : 'unscented' } )
+
+    assert np.allclose( covs_lin[ 0 ], cov0 )
+    assert np.abs( means_ut[ :, :3 ] - means_lin[ :, :3 ] ).max() < 1e-4
+    assert np.allclose( covs_ut, covs_lin, rtol = 1e-4, atol = 1e-12 )
+    assert np.trace( covs_lin[ -1, :3, :3 ] ) > np.trace( cov0[ :3, :3 ] )
+
+def test_linear_method_requires_analytic_partials():
+    drag = dict( CONFIG, orbit_perts = { 'J2' : True, 'ATM' : True } )
+
+    with pytest.raises( ValueError, match = 'ATM' ):
+        cov.propagate_covariance( drag, np.eye( 6 ), [ 0.0, 60.0 ], { 'method' : 'linear' } )
+
+def test_unknown_method_is_rejected():
+    with pytest.raises( ValueError, match = 'Unknown covariance method' ):
+        cov.propagate_covariance( CONFIG, np.eye( 6 ), [ 0.0, 60.0 ], { 'method' : 'ukf' } )
@@ -0,0 +1,66 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import coverage      as cv
+import constellation as cs
+
+
+STEPS = np.array( [ 1, 1, 0, 0, 0, 1, 0, 1, 1, 0 ], dtype = bool )
+
+@pytest.fixture
+def grid():
+    '''
+    One satellite over ( 5, 5 ) deg at the steps in STEPS and over
+    ( 5, -175 ) deg otherwise, on a 10 deg grid with narrow footprints
+    '''
+    times = 60.0 * np.arange( STEPS.shape[ 0 ] )
+    grid  = cv.CoverageGrid( { 'resolution' : 10.0, 'half_angle' : 5.0 } )
+    lons  = np.where( STEPS, 5.0, -175.0 )
+
+    grid.accumulate( times, np.full( ( 1, STEPS.shape[ 0 ] ), 5.0 ), lons[ None ],
+                     np.full( ( 1, STEPS.shape[ 0 ] ), 7000.0 ) )
+
+    return times, grid.results()
+
+def cell( results, lat, lon ):
+    row = np.searchsorted( results[ 'lats' ], lat )
+    col = np.searchsorted( results[ 'lons' ], lon )
+    return { key : results[ key ][ row, col ] for key in ( 'percent_covered', 'max_gap', 'mean_revisit' ) }
+
+def test_engines_agree_on_intermittent_coverage( grid ):
+    times, results = grid
+    stats          = cs.coverage_statistics( STEPS.astype( int ), times )
+
+    grid_cell = cell( results, 5.0, 5.0 )
+
+    assert grid_cell[ 'percent_covered' ] == pytest.approx( stats[ 'percent_covered' ] ) == 50.0
+    assert grid_cell[ 'max_gap' ]         == pytest.approx( stats[ 'max_gap' ] )         == 180.0
+    assert grid_cell[ 'mean_revisit' ]    == pytest.approx( stats[ 'mean_revisit' ] )    == 120.0
+
+def test_engines_agree_on_always_and_never_visible_points( grid ):
+    times, results = grid
+    counts         = np.zeros( ( STEPS.shape[ 0 ], 2 ), dtype = int )
+    counts[ :, 0 ] = 2
+    stats          = cs.coverage_statistics( counts, times )
+
+    # Over the equator at 5 deg: no satellite ever covers ( -55, 95 )
+    never = cell( results, -55.0, 95.0 )
+
+    assert stats[ 'percent_covered' ][ 0 ] == 100.0
+    assert stats[ 'max_gap' ][ 0 ]         == 0.0
+    assert stats[ 'mean_revisit' ][ 0 ]    == 0.0
+
+    assert never[ 'percent_covered' ] == stats[ 'percent_covered' ][ 1 ] == 0.0
+    assert never[ 'max_gap' ]         == stats[ 'max_gap' ][ 1 ]         == 600.0
+    assert np.isnan( never[ 'mean_revisit' ] ) and np.isnan( stats[ 'mean_revisit' ][ 1 ] )
+
+def test_always_visible_grid_cell():
+    times = 60.0 * np.arange( 5 )
+    grid  = cv.CoverageGrid( { 'resolution' : 10.0, 'half_angle' : 5.0 } )
+    grid.accumulate( times, np.full( ( 1, 5 ), 5.0 ), np.full( ( 1, 5 ), 5.0 ), np.full( ( 1, 5 ), 7000.0 ) )
+
+    always = cell( grid.results(), 5.0, 5.0 )
+
+    assert always == { 'percent_covered' : 100.0, 'max_gap' : 0.0, 'mean_revisit' : 0.0 }
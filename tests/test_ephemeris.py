@@ -0,0 +1,25 @@
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data as pd
+import ephemeris      as ep
+
+
+def test_cache_hits_and_stays_within_its_bound( monkeypatch ):
+    monkeypatch.setattr( ep, 'CACHE_BYTES', 100 * 6 * 8 * 3 )
+    ep.clear_cache()
+
+    times = np.linspace( 0, 86400.0, 100 )
+    first = ep.analytic_ephemeris( pd.mars, times )
+
+    assert ep.analytic_ephemeris( pd.mars, times.copy() ) is first
+
+    for body in ( pd.venus, pd.earth, pd.jupiter ):
+        ep.analytic_ephemeris( body, times )
+
+    assert ep._cache[ 'bytes' ] <= ep.CACHE_BYTES
+    assert len( ep._cache[ 'entries' ] ) == 3
+    assert np.array_equal( ep.analytic_ephemeris( pd.mars, times ), first )
+
+    ep.clear_cache()
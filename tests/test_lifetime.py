@@ -0,0 +1,23 @@
+# Third-party Libraries
+import numpy  as np
+
+# User-defined Libraries
+import lifetime
+
+
+COES = np.array( [
+    [ 6678.0, 0.001, 51.6, 0.0, 0.0, 0.0 ],
+    [ 6778.0, 0.001, 51.6, 0.0, 0.0, 0.0 ] ] )
+
+def test_estimated_decay_matches_numerical_drag():
+    validation = lifetime.validate_lifetime( COES, { 'days' : 1.0, 'samples' : 50, 'rtol' : 1e-9, 'atol' : 1e-9 } )
+
+    assert ( validation[ 'decay_numerical' ] < 0 ).all()
+    assert np.abs( validation[ 'relative_error' ] ).max() < 0.2
+
+def test_lower_orbits_decay_first():
+    results = lifetime.estimate_lifetime( COES )
+
+    assert results[ 'decayed' ].all()
+    assert results[ 'lifetime' ][ 0 ] < results[ 'lifetime' ][ 1 ]
+    assert 86400.0 < results[ 'lifetime' ][ 0 ] < 365 * 86400.0
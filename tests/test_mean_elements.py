@@ -0,0 +1,40 @@
+# Third-party Libraries
+import numpy  as np
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import planetary_data as pd
+import orbit_calcs    as oc
+import mean_elements  as me
+
+
+MEAN = np.array( [ 7000.0, 0.01, 50.0, 30.0, 40.0, 0.0 ] )
+
+def test_brouwer_lyddane_round_trip():
+    osculating = me.mean_to_osculating( MEAN )
+
+    error = me.osculating_to_mean( osculating ) - MEAN
+    error[ 2: ] = ( error[ 2: ] + 180.0 ) % 360.0 - 180.0
+
+    # The first-order map inverts up to second-order terms in J2
+    assert np.abs( osculating[ 0 ] - MEAN[ 0 ] ) > 0.1
+    assert np.abs( error ).max() < 1e-2
+
+def test_secular_rates_match_numerical_J2():
+    days   = 2.0
+    times  = np.linspace( 0, days * 86400.0, 2001 )
+    state0 = oc.sv_from_coes( [ me.mean_to_osculating( MEAN ) ], pd.earth[ 'mu' ] )[ 0 ]
+
+    sc = Spacecraft( { 'state' : state0, 'tspan' : times[ -1 ], 't_eval' : times,
+                       'orbit_perts' : { 'J2' : True }, 'propagator' : 'DOP853',
+                       'rtol' : 1e-10, 'atol' : 1e-10, 'cache' : False } )
+    sc.calc_coes()
+
+    mean  = me.propagate_mean_elements( MEAN, times )
+    drift = np.unwrap( ( sc.coes[ :, 3 ] - mean[ :, 3 ] ) * oc.d2r ) * oc.r2d
+
+    # The numerical RAAN follows the secular drift (several deg over two
+    # days) up to short-period terms
+    assert abs( mean[ -1, 3 ] - MEAN[ 3 ] ) > 5.0
+    assert np.abs( drift ).max() < 0.05
+    assert abs( np.polyfit( times, drift, 1 )[ 0 ] * times[ -1 ] ) < 0.01
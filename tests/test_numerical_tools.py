@@ -0,0 +1,49 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import planetary_data  as pd
+import orbit_calcs     as oc
+import numerical_tools as nt
+
+
+MU = pd.earth[ 'mu' ]
+
+def kepler_accel( r ):
+    r2 = np.sum( r * r, axis = -1, keepdims = True )
+    return -MU * r / ( r2 * np.sqrt( r2 ) )
+
+def energy_errors( method, orbits = 20, steps = 200 ):
+    state0 = oc.sv_from_coes( [ [ 8000.0, 0.2, 30.0, 0.0, 0.0, 0.0 ] ], MU )[ 0 ]
+    period = oc.period_from_sv( state0, MU )
+    times  = np.linspace( 0, orbits * period, 40 * orbits + 1 )
+
+    states = nt.symplectic_integrate( kepler_accel, state0[ :3 ], state0[ 3: ], times,
+                                      period / steps, { 'method' : method } )
+
+    return np.abs( oc.specific_energy( states, MU ) / oc.specific_energy( state0, MU ) - 1 )
+
+@pytest.mark.parametrize( 'method', [ 'leapfrog', 'yoshida4', 'yoshida6' ] )
+def test_symplectic_energy_error_is_bounded( method ):
+    errors = energy_errors( method )
+    half   = errors.shape[ 0 ] // 2
+
+    # No secular drift: the last ten orbits are no worse than the first ten
+    assert errors[ half: ].max() < 1.5 * errors[ :half ].max()
+
+def test_yoshida_orders():
+    leapfrog = energy_errors( 'leapfrog', orbits = 2 ).max()
+    yoshida4 = energy_errors( 'yoshida4', orbits = 2 ).max()
+    yoshida6 = energy_errors( 'yoshida6', orbits = 2 ).max()
+
+    assert yoshida6 < yoshida4 < 1e-2 * leapfrog
+
+def test_symplectic_outputs_off_the_step_grid():
+    state0 = np.array( [ 7000.0, 0.0, 0.0, 0.0, np.sqrt( MU / 7000.0 ), 0.0 ] )
+    times  = np.array( [ 0.0, 35.0, 100.0, 1234.5 ] )
+
+    states = nt.symplectic_integrate( kepler_accel, state0[ :3 ], state0[ 3: ], times, 10.0,
+                                      { 'method' : 'yoshida6' } )
+
+    assert np.abs( states - oc.kepler_universal( state0, times, MU ) )[ :, :3 ].max() < 1e-6
@@ -0,0 +1,15 @@
+# Third-party Libraries
+import pytest
+
+# User-defined Libraries
+import orbit_calcs as oc
+
+
+@pytest.mark.parametrize( 'epoch', [
+    '2024-01-01T00:00:00',
+    '2024-01-01T00:00:00Z',
+    '2024-01-01T00:00:00+00:00',
+    '2024-01-01T02:30:00+02:30',
+    '2023-12-31T19:00:00-05:00' ] )
+def test_julian_date_converts_offsets_to_utc( epoch ):
+    assert oc.julian_date( epoch ) == 2460310.5
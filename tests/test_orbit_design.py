@@ -0,0 +1,30 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import planetary_data as pd
+import orbit_design   as od
+
+
+def test_earth_sso_repeat_orbits():
+    solutions = od.repeat_orbits( { 'altitude_range' : ( 400.0, 1000.0 ), 'max_days' : 1 } )
+
+    assert list( solutions[ 'revs' ] ) == [ 15, 14 ]
+    assert np.allclose( solutions[ 'altitude' ], [ 561.1, 888.4 ], atol = 0.5 )
+
+@pytest.mark.parametrize( 'cb', [ pd.mars, pd.jupiter, pd.moon ] )
+def test_other_bodies_have_design_constants( cb ):
+    assert np.isfinite( od.sso_raan_rate( cb ) )
+    assert od.repeat_ratio( np.array( [ 2 * cb[ 'radius' ], 0.0, 90.0, 0.0, 0.0, 0.0 ] ), cb ) > 0
+
+def test_mars_repeat_orbits_close():
+    solutions = od.repeat_orbits( { 'cb' : pd.mars, 'altitude_range' : ( 200.0, 800.0 ), 'max_days' : 1 } )
+    verified  = od.verify_orbits( solutions, { 'cb' : pd.mars, 'n_workers' : 1 } )
+
+    assert solutions[ 'sma' ].shape[ 0 ] > 0
+    assert ( verified[ 'closure_error' ] < 1.0 ).all()
+
+def test_missing_constants_raise_value_error():
+    with pytest.raises( ValueError, match = 'J2' ):
+        od.repeat_orbits( { 'cb' : pd.pluto } )
@@ -0,0 +1,34 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import planetary_data as pd
+import patched_conics as pcs
+import ephemeris      as ep
+
+
+def test_planetocentric_legs_use_equatorial_planet_states():
+    # Hyperbolic departure from a 400 km Earth orbit
+    r0     = pd.earth[ 'radius' ] + 400.0
+    v0     = np.sqrt( 2 * pd.earth[ 'mu' ] / r0 ) + 1.0
+    state0 = np.array( [ r0, 0.0, 0.0, 0.0, 0.0, v0 ] )
+
+    results = pcs.propagate( state0, pd.earth, 30 * 86400.0, { 't_eval' : [ 0.0 ] } )
+    earth   = ep.analytic_ephemeris( pd.earth, [ 0.0 ], { 'frame' : 'equatorial' } )[ 0 ]
+
+    assert results[ 'legs' ][ 0 ][ 'end' ] == 'soi_exit'
+    assert np.allclose( results[ 'states' ][ 0 ], state0 + earth )
+
+def test_max_legs_is_reported():
+    r0     = pd.earth[ 'radius' ] + 400.0
+    v0     = np.sqrt( 2 * pd.earth[ 'mu' ] / r0 ) + 1.0
+    state0 = np.array( [ r0, 0.0, 0.0, 0.0, 0.0, v0 ] )
+
+    with pytest.raises( RuntimeError, match = 'max_legs = 1' ):
+        pcs.propagate( state0, pd.earth, 30 * 86400.0, { 'max_legs' : 1 } )
+
+    results = pcs.propagate( state0, pd.earth, 30 * 86400.0, { 'max_legs' : 2 } )
+
+    assert len( results[ 'legs' ] ) == 2
+    assert results[ 'legs' ][ -1 ][ 'end' ] == 'final'
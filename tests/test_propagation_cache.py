@@ -0,0 +1,109 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import planetary_data    as pd
+import propagation_cache as pc
+import transfer_tools    as tt
+import storage           as st
+
+
+def leo_config( **config ):
+    return dict( {
+        'coes'  : [ pd.earth[ 'radius' ] + 500.0, 0.01, 51.6, 0.0, 0.0, 0.0 ],
+        'tspan' : '1',
+        'rtol'  : 1e-9,
+        'atol'  : 1e-9
+    }, **config )
+
+def key_of( **config ):
+    sc = Spacecraft( leo_config( propagate = False, **config ) )
+    return pc.config_key( sc.config, sc.state0 )
+
+def test_cadence_changes_cache_key( tmp_path ):
+    cache = { 'cache' : True, 'cache_dir' : str( tmp_path ) }
+
+    decimated = Spacecraft( leo_config( storage = { 'cadence' : 600.0 }, **cache ) )
+    full      = Spacecraft( leo_config( **cache ) )
+    uncached  = Spacecraft( leo_config() )
+
+    assert decimated.n_steps != full.n_steps
+    assert full.n_steps == uncached.n_steps
+    assert np.array_equal( full.times, uncached.times )
+
+@pytest.mark.parametrize( 'change', [
+    { 'rtol' : 1e-10 },
+    { 'propagator' : 'DOP853' },
+    { 'orbit_perts' : { 'J2' : True } },
+    { 'coes' : [ pd.earth[ 'radius' ] + 501.0, 0.01, 51.6, 0.0, 0.0, 0.0 ] },
+    { 'cb' : pd.mars, 'coes' : [ 4000.0, 0.01, 51.6, 0.0, 0.0, 0.0 ] },
+    { 'maneuvers' : [ { 'time' : 100.0, 'dv' : [ 0.01, 0.0, 0.0 ] } ] }
+] )
+def test_key_sensitivity( change ):
+    assert key_of( **change ) != key_of()
+
+def test_key_ignores_unrelated_settings():
+    assert key_of( orbit_perts = { 'J2' : False } ) == key_of()
+    assert key_of( cache_size = 2**20 ) == key_of()
+
+def test_functions_are_keyed_by_import_path():
+    args = { 'ephemeris' : tt.circular_ephemeris }
+
+    assert key_of( patched_conic_args = args ) == key_of( patched_conic_args = dict( args ) )
+    assert key_of( patched_conic_args = args ) != key_of()
+
+    with pytest.raises( ValueError, match = 'cannot be cached' ):
+        key_of( patched_conic_args = { 'ephemeris' : lambda body, times, args: None } )
+
+def test_uncacheable_configs_propagate_without_caching( tmp_path ):
+    sc = Spacecraft( leo_config( cache = True, cache_dir = str( tmp_path ),
+        patched_conic_args = { 'ephemeris' : lambda body, times, args: None } ) )
+
+    assert sc.n_steps > 1
+    assert not list( tmp_path.iterdir() )
+
+def test_round_trip_and_eviction( tmp_path ):
+    cache  = pc.PropagationCache( str( tmp_path ), max_bytes = 10**9 )
+    times  = np.linspace( 0, 100.0, 11 )
+    states = np.random.default_rng( 0 ).normal( size = ( 11, 6 ) )
+
+    assert cache.load( 'missing' ) is None
+
+    cache.store( 'a', times, states )
+    loaded_times, loaded_states = cache.load( 'a' )
+
+    assert np.array_equal( loaded_times, times )
+    assert np.array_equal( loaded_states, states )
+
+    cache.max_bytes = sum( entry[ 1 ] for entry in cache.entries() )
+    cache.store( 'b', times, states )
+
+    assert cache.load( 'a' ) is None
+    assert cache.load( 'b' ) is not None
+
+def test_cache_hit_matches_propagation( tmp_path ):
+    cache = { 'cache' : True, 'cache_dir' : str( tmp_path ) }
+    first = Spacecraft( leo_config( **cache ) )
+    hit   = Spacecraft( leo_config( **cache ) )
+
+    assert hit.ode_sol is None
+    assert np.array_equal( hit.states, first.states )
+
+def test_archive_round_trip( tmp_path ):
+    sc       = Spacecraft( leo_config() )
+    filename = str( tmp_path / 'archive.npz' )
+
+    st.save_archive( filename, sc.times, sc.states )
+    times, states = st.load_archive( filename )
+
+    resolution = np.array( st.DEFAULT_RESOLUTION )
+    assert np.abs( times - sc.times ).max() <= 1e-6
+    assert ( np.abs( states - sc.states ) <= resolution ).all()
+
+def test_delta_codec_is_exact_on_the_grid():
+    values  = np.random.default_rng( 1 ).integers( -10**6, 10**6, size = ( 50, 3 ) ) * 1e-3
+    decoded = st.decode_deltas( st.encode_deltas( values, 1e-3, 3 ), 1e-3, 3 )
+
+    assert np.allclose( decoded, values, rtol = 0, atol = 1e-9 )
@@ -0,0 +1,55 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import planetary_data  as pd
+import orbit_calcs     as oc
+import relative_motion as rm
+
+
+MU    = pd.earth[ 'mu' ]
+DELTA = np.array( [ 0.1, -0.3, 0.2, 1e-4, -2e-4, 1e-4 ] )
+
+def linearization_errors( chief_coes, propagate, scales = ( 1.0, 2.0, 4.0 ) ):
+    '''
+    Max position error of a linear propagation against differenced
+    two-body propagation, for deputies offset by scale * DELTA (LVLH)
+    '''
+    chief0 = oc.sv_from_coes( [ chief_coes ], MU )[ 0 ]
+    period = oc.period_from_sv( chief0, MU )
+    times  = np.linspace( 0, period, 50 )
+    chief  = oc.kepler_universal( chief0, times, MU )
+    errors = []
+
+    for scale in scales:
+        rel0   = scale * DELTA
+        deputy = oc.kepler_universal( rm.lvlh2eci( chief0, rel0 ), times, MU )
+        exact  = rm.eci2lvlh( chief, deputy )
+        linear = propagate( rel0, times, chief0 )
+
+        errors.append( np.abs( linear - exact )[ :, :3 ].max() )
+
+    return np.array( errors )
+
+def test_lvlh_round_trip():
+    chief  = oc.sv_from_coes( [ [ 7000.0, 0.1, 40.0, 10.0, 20.0, 30.0 ] ], MU )[ 0 ]
+    deputy = chief + DELTA
+
+    assert np.allclose( rm.lvlh2eci( chief, rm.eci2lvlh( chief, deputy ) ), deputy, rtol = 0, atol = 1e-9 )
+
+def test_hcw_error_is_second_order_in_separation():
+    n      = np.sqrt( MU / 7000.0**3 )
+    errors = linearization_errors( [ 7000.0, 0.0, 30.0, 0.0, 0.0, 0.0 ],
+                                   lambda rel0, times, chief0: rm.propagate_hcw( rel0, times, n ) )
+
+    assert errors[ 1 ] / errors[ 0 ] == pytest.approx( 4.0, rel = 0.05 )
+    assert errors[ 2 ] / errors[ 1 ] == pytest.approx( 4.0, rel = 0.05 )
+
+def test_yamanaka_ankersen_error_is_second_order_in_separation():
+    errors = linearization_errors( [ 9000.0, 0.2, 30.0, 0.0, 0.0, 20.0 ],
+                                   lambda rel0, times, chief0:
+                                       rm.propagate_yamanaka_ankersen( rel0, times, chief0, MU ) )
+
+    assert errors[ 1 ] / errors[ 0 ] == pytest.approx( 4.0, rel = 0.05 )
+    assert errors[ 2 ] / errors[ 1 ] == pytest.approx( 4.0, rel = 0.05 )
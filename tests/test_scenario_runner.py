@@ -0,0 +1,38 @@
+# Python Standard Libraries
+import json
+
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import scenario_runner
+
+
+def test_main_runs_a_scenario_file( tmp_path ):
+    scenario = {
+        'defaults'   : { 'tspan' : 3000.0, 'cache' : False },
+        'spacecraft' : [
+            { 'name' : 'leo',  'coes' : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ] },
+            { 'name' : 'mars', 'coes' : [ 4000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ], 'cb' : 'mars' }
+        ],
+        'outputs'    : [ 'states', 'coes' ]
+    }
+    filename = tmp_path / 'tiny.json'
+    filename.write_text( json.dumps( scenario ) )
+
+    status = scenario_runner.main( [ str( filename ), '-o', str( tmp_path / 'out' ), '-w', '1' ] )
+
+    assert status == 0
+
+    for name in ( 'leo', 'mars' ):
+        with np.load( tmp_path / 'out' / 'tiny' / ( name + '.npz' ) ) as data:
+            assert data[ 'times' ][ -1 ] == 3000.0
+            assert data[ 'states' ].shape == data[ 'coes' ].shape[ :1 ] + ( 6, )
+
+def test_unknown_outputs_are_rejected( tmp_path ):
+    filename = tmp_path / 'bad.json'
+    filename.write_text( json.dumps( { 'outputs' : [ 'everything' ] } ) )
+
+    with pytest.raises( ValueError, match = 'Unknown output' ):
+        scenario_runner.load_scenario( str( filename ) )
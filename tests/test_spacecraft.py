@@ -0,0 +1,189 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+from Spacecraft import Spacecraft
+import planetary_data as pd
+import orbit_calcs    as oc
+
+
+LEO = {
+    'coes'        : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+    'tspan'       : '1',
+    'orbit_perts' : { 'J2' : True }
+}
+
+def test_final_stm_releases_solver_output():
+    sc = Spacecraft( dict( LEO, stm = 'final' ) )
+
+    assert sc.states.base is None
+    assert sc.stm.base is None
+    assert sc.ode_sol.y is None
+
+    full = Spacecraft( dict( LEO, stm = 'history' ) )
+
+    assert np.array_equal( sc.states, full.states )
+    assert np.array_equal( sc.stm, full.stms[ -1 ] )
+
+def test_kepler_fg_matches_universal_variables():
+    state0 = oc.sv_from_coes( [ [ 24400.0, 0.72, 28.0, 10.0, 20.0, 30.0 ] ], pd.earth[ 'mu' ] )[ 0 ]
+    dts    = np.linspace( 0, 5 * 86400.0, 97 )
+    ref    = oc.kepler_fg( state0, pd.earth[ 'mu' ] )
+
+    expected = oc.kepler_universal( state0, dts, pd.earth[ 'mu' ] )
+    for dt in np.concatenate( ( dts, dts[ ::-1 ] ) ):
+        assert np.allclose( ref( dt ), expected[ np.searchsorted( dts, dt ) ], rtol = 0, atol = 1e-6 )
+
+def test_encke_matches_cowell():
+    GTO   = dict( LEO, coes = [ 24400.0, 0.72, 28.0, 0.0, 0.0, 0.0 ], t_eval = np.linspace( 0, 86400.0, 50 ) )
+    encke = Spacecraft( dict( GTO, formulation = 'encke', rtol = 1e-10, atol = 1e-10 ) )
+    ref   = Spacecraft( dict( GTO, rtol = 1e-12, atol = 1e-12 ) )
+
+    assert encke.n_rectifications > 0
+    assert np.abs( encke.states[ :, :3 ] - ref.states[ :, :3 ] ).max() < 1e-2
+
+def test_patched_conic_elements_are_taken_per_leg():
+    r0 = pd.earth[ 'radius' ] + 400.0
+    v0 = np.sqrt( 2 * pd.earth[ 'mu' ] / r0 ) + 1.0
+    sc = Spacecraft( {
+        'state'       : [ r0, 0.0, 0.0, 0.0, 0.0, v0 ],
+        'tspan'       : 30 * 86400.0,
+        'formulation' : 'patched_conic'
+    } )
+
+    assert [ leg[ 'cb' ][ 'name' ] for leg in sc.legs ] == [ 'Earth', 'Sun' ]
+
+    sc.calc_altitudes()
+    sc.calc_coes()
+    first = sc.leg_index == 0
+
+    assert np.isclose( sc.altitudes[ 0 ], 400.0 )
+    assert np.allclose( sc.coes[ first, 0 ], sc.coes[ 0, 0 ] )
+    assert ( sc.coes[ ~first, 0 ] > 0.9 * pd.AU ).all()
+
+    with pytest.raises( ValueError ):
+        sc.calc_latlons()
+
+def test_patched_conic_requires_an_soi():
+    with pytest.raises( ValueError, match = 'SOI' ):
+        Spacecraft( {
+            'cb'          : pd.pluto,
+            'coes'        : [ 2000.0, 0.0, 0.0, 0.0, 0.0, 0.0 ],
+            'formulation' : 'patched_conic'
+        } )
+
+def checkpoint_config( filename, **config ):
+    return dict( {
+        'coes'                : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+        'tspan'               : '2',
+        'checkpoint_file'     : str( filename ),
+        'checkpoint_interval' : 1000.0
+    }, **config )
+
+def test_existing_checkpoint_is_resumed( tmp_path ):
+    filename = tmp_path / 'run.npz'
+    first    = Spacecraft( checkpoint_config( filename ) )
+    longer   = Spacecraft( checkpoint_config( filename, tspan = '3' ) )
+
+    assert longer.times[ -1 ] > first.times[ -1 ]
+    assert np.array_equal( longer.states[ :first.n_steps ], first.states )
+
+    with pytest.raises( ValueError, match = 'different configuration' ):
+        Spacecraft( checkpoint_config( filename, rtol = 1e-8 ) )
+
+def test_edited_maneuvers_start_a_new_checkpoint_sample_file( tmp_path ):
+    filename = tmp_path / 'run.npz'
+    maneuver = { 'time' : 3000.0, 'dv' : [ 0.01, 0.0, 0.0 ], 'frame' : 'VNC' }
+    sc       = Spacecraft( checkpoint_config( filename, maneuvers = [ maneuver ] ) )
+    samples  = set( tmp_path.glob( '*.bin' ) )
+
+    sc.set_maneuver( 0, dv = [ 0.02, 0.0, 0.0 ] )
+
+    assert len( set( tmp_path.glob( '*.bin' ) ) ) == 1
+    assert set( tmp_path.glob( '*.bin' ) ) != samples
+
+    restored = Spacecraft( checkpoint_config( filename, propagate = False,
+        maneuvers = [ dict( maneuver, dv = [ 0.02, 0.0, 0.0 ] ) ] ) )
+    restored.load_checkpoint()
+
+    assert np.array_equal( restored.states, sc.states )
+
+def test_node_rates_in_worker_processes_match():
+    from concurrent.futures import ProcessPoolExecutor
+
+    drag   = dict( LEO, coes = [ 6778.0, 0.01, 51.6, 0.0, 0.0, 0.0 ],
+                   orbit_perts = { 'J2' : True, 'ATM' : True }, propagate = False )
+    states = Spacecraft( dict( drag, tspan = 3000.0, propagate = True ) ).states
+    times  = np.zeros( states.shape[ 0 ] )
+    sc     = Spacecraft( drag )
+
+    with ProcessPoolExecutor( max_workers = 2 ) as executor:
+        sc.config[ 'executor' ]  = executor
+        sc.config[ 'mcpi_args' ] = { 'n_chunks' : 3 }
+        rates = sc.node_rates( times, states )
+
+    assert np.allclose( rates, sc.diffy_q_batch( times, states ).reshape( -1, 6 ), rtol = 1e-14, atol = 0 )
+
+@pytest.mark.parametrize( 'dtype', [ 'float64', 'float32' ] )
+def test_chunked_float32_history_restarts_at_full_precision( dtype ):
+    config = {
+        'coes'       : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+        'propagator' : 'DOP853',
+        'rtol'       : 1e-12,
+        'atol'       : 1e-12,
+        'storage'    : { 'dtype' : dtype },
+        'cache'      : False
+    }
+    continuous = Spacecraft( dict( config, tspan = 12 * 3600.0 ) )
+    chunked    = Spacecraft( dict( config, tspan = 3600.0 ) )
+
+    for _ in range( 11 ):
+        chunked.extend( 3600.0 )
+
+    assert chunked.states.dtype == np.dtype( dtype )
+    assert np.abs( chunked.history.last_state - continuous.end_state )[ :3 ].max() < 1e-5
+
+def test_float32_checkpoint_chunks_restart_at_full_precision( tmp_path ):
+    config = {
+        'coes'       : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+        'tspan'      : 12 * 3600.0,
+        'propagator' : 'DOP853',
+        'rtol'       : 1e-12,
+        'atol'       : 1e-12,
+        'storage'    : { 'dtype' : 'float32' },
+        'cache'      : False
+    }
+    continuous = Spacecraft( config )
+    chunked    = Spacecraft( dict( config, checkpoint_file = str( tmp_path / 'run.npz' ),
+                                   checkpoint_interval = 3600.0, tspan = 6 * 3600.0 ) )
+    resumed    = Spacecraft( dict( chunked.config, tspan = 12 * 3600.0 ) )
+
+    assert np.abs( resumed.history.last_state - continuous.end_state )[ :3 ].max() < 1e-5
+
+def test_failed_encke_run_keeps_its_samples_and_warns( monkeypatch, caplog ):
+    rates = Spacecraft.diffy_q_encke
+
+    def fail_late( self, t, dstates ):
+        return rates( self, t, dstates ) if t < 3000.0 else np.full( 6, np.nan )
+
+    monkeypatch.setattr( Spacecraft, 'diffy_q_encke', fail_late )
+
+    with caplog.at_level( 'WARNING' ):
+        sc = Spacecraft( dict( LEO, formulation = 'encke', cache = False ) )
+
+    assert sc.ode_sol.status == -1
+    assert 2000.0 < sc.times[ -1 ] < 3000.0
+    assert sc.states.shape[ 0 ] == sc.times.shape[ 0 ]
+    assert 'Encke propagation stopped' in caplog.text
+
+@pytest.mark.parametrize( 'power', [ 1.0, 1.5 ] )
+def test_sundman_matches_kepler( power ):
+    coes  = [ 20000.0, 0.7, 30.0, 0.0, 0.0, 0.0 ]
+    times = np.linspace( 0, 86400.0, 25 )
+    sc    = Spacecraft( { 'coes' : coes, 'tspan' : times[ -1 ], 't_eval' : times,
+                          'formulation' : 'sundman', 'sundman_power' : power,
+                          'propagator' : 'DOP853', 'rtol' : 1e-11, 'atol' : 1e-11, 'cache' : False } )
+
+    assert np.array_equal( sc.times, times )
+    assert np.abs( sc.states - oc.kepler_universal( sc.state0, times, sc.cb.mu ) )[ :, :3 ].max() < 1e-4
@@ -0,0 +1,45 @@
+# Third-party Libraries
+import numpy as np
+
+# User-defined Libraries
+import planetary_data as pd
+import orbit_calcs    as oc
+import transfer_tools as tt
+
+
+def test_lambert_recovers_kepler_velocities():
+    mu     = pd.earth[ 'mu' ]
+    state0 = oc.sv_from_coes( [ [ 12000.0, 0.3, 20.0, 40.0, 10.0, 30.0 ] ], mu )[ 0 ]
+    period = oc.period_from_sv( state0, mu )
+    tofs   = np.array( [ 0.05, 0.2, 0.35, 0.45 ] ) * period
+    states = oc.kepler_universal( state0, tofs, mu )
+
+    v0s, v1s = tt.lambert_universal_variables( state0[ :3 ], states[ :, :3 ], tofs, mu )
+
+    assert np.abs( v0s - state0[ 3: ] ).max() < 1e-8
+    assert np.abs( v1s - states[ :, 3: ] ).max() < 1e-8
+
+def test_lambert_flags_unsolvable_problems():
+    v0s, v1s = tt.lambert_universal_variables(
+        [ 7000.0, 0.0, 0.0 ], [ [ 0.0, 7000.0, 0.0 ], [ -7000.0, 0.0, 0.0 ] ], [ -60.0, 3000.0 ],
+        pd.earth[ 'mu' ] )
+
+    assert np.isnan( v0s ).all() and np.isnan( v1s ).all()
+
+def test_porkchop_grid_matches_single_lambert_solves():
+    day       = 86400.0
+    dep_times = np.linspace( 0, 60, 4 ) * day
+    arr_times = np.linspace( 200, 300, 5 ) * day
+    args      = { 'n_workers' : 1, 'chunk_size' : 2,
+                  'ephemeris_args' : { 'phases' : { 'Mars' : 0.8 } } }
+
+    c3s, vinfs = tt.porkchop_grid( pd.earth, pd.mars, dep_times, arr_times, args )
+
+    earth = tt.circular_ephemeris( pd.earth, dep_times[ 1 ], args[ 'ephemeris_args' ] )[ 0 ]
+    mars  = tt.circular_ephemeris( pd.mars,  arr_times[ 3 ], args[ 'ephemeris_args' ] )[ 0 ]
+    v0, v1 = tt.lambert_universal_variables(
+        earth[ :3 ], mars[ :3 ], arr_times[ 3 ] - dep_times[ 1 ], pd.sun[ 'mu' ] )
+
+    assert c3s.shape == vinfs.shape == ( 4, 5 )
+    assert c3s[ 1, 3 ] == np.sum( ( v0[ 0 ] - earth[ 3: ] )**2 )
+    assert vinfs[ 1, 3 ] == np.linalg.norm( v1[ 0 ] - mars[ 3: ] )
@@ -0,0 +1,45 @@
+# Third-party Libraries
+import numpy  as np
+import pytest
+
+# User-defined Libraries
+import tuning
+
+
+CONFIG = {
+    'coes'  : [ 7000.0, 0.01, 30.0, 0.0, 0.0, 0.0 ],
+    'tspan' : 3000.0
+}
+
+def test_failed_runs_record_their_message( monkeypatch ):
+    run = tuning._run
+
+    def stop_rk45( config, t_eval ):
+        if config[ 'propagator' ] == 'RK45':
+            raise RuntimeError( 'Integration stopped early: step size too small' )
+        return run( config, t_eval )
+
+    monkeypatch.setattr( tuning, '_run', stop_rk45 )
+
+    results = tuning.tune_tolerances( CONFIG, {
+        'methods' : [ 'RK45', 'DOP853' ], 'tolerances' : [ 1e-8 ], 'n_samples' : 20 } )[ 'results' ]
+
+    assert results[ 0 ][ 'error' ] == np.inf
+    assert 'step size too small' in results[ 0 ][ 'message' ]
+    assert results[ 1 ][ 'error' ] < 1e-3
+    assert results[ 1 ][ 'message' ] is None
+
+def test_configuration_errors_are_raised():
+    with pytest.raises( ValueError ):
+        tuning.tune_tolerances( CONFIG, {
+            'methods' : [ 'NotAMethod' ], 'tolerances' : [ 1e-8 ], 'n_samples' : 20 } )
+
+def test_maneuver_plans_are_tuned():
+    # The burn time is one of the 21 samples, stored twice by the segments
+    burn  = dict( CONFIG, maneuvers = [ { 'time' : 1500.0, 'dv' : [ 0, 0.01, 0 ], 'frame' : 'VNC' } ] )
+    tuned = tuning.tune_tolerances( burn, {
+        'methods' : [ 'DOP853' ], 'tolerances' : [ 1e-6, 1e-9 ], 'n_samples' : 21 } )
+
+    assert tuned[ 'reference' ].startswith( 'DOP853' )
+    assert all( result[ 'message' ] is None for result in tuned[ 'results' ] )
+    assert tuned[ 'results' ][ 1 ][ 'error' ] < tuned[ 'results' ][ 0 ][ 'error' ] < 1e-2